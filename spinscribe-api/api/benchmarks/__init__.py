@@ -0,0 +1,12 @@
+# api/benchmarks/__init__.py
+"""
+Load benchmark for the execution lifecycle.
+
+Scripted scenarios (execution starts, webhook storms, SSE fan-out,
+checkpoint cycles) against api.main:app with JSON baselines for
+regression diffs. Run with python -m api.benchmarks; see harness.py.
+
+Query plan check: python -m api.benchmarks.query_plans EXPLAINs the
+hot-path queries on seeded data and fails on sequential scans of large
+tables; see query_plans.py.
+"""
@@ -0,0 +1,181 @@
+# api/benchmarks/__main__.py
+"""
+Run the load benchmark.
+
+Usage:
+    # against a running API
+    python -m api.benchmarks --base-url http://127.0.0.1:8000
+
+    # spawn api.main:app (and the CrewAI simulator) for the run
+    python -m api.benchmarks --spawn --simulator --output baseline.json
+
+    # compare with a saved baseline (exit code 1 on regression)
+    python -m api.benchmarks --spawn --baseline baseline.json --threshold 15
+
+Select scenarios with --scenarios (comma separated, default: all).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from api.benchmarks.harness import SCENARIOS, compare_results, create_fixture
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn(module_args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *module_args], env=env)
+
+
+def _wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def run(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    """Create fixtures and run the selected scenarios in order."""
+    names = list(SCENARIOS) if args.scenarios == "all" else [n.strip() for n in args.scenarios.split(",")]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    fixture = await create_fixture(projects=args.projects, executions=args.executions)
+
+    params = {
+        "start_executions": {"requests": args.requests, "concurrency": args.concurrency},
+        "webhook_storm": {"batches": args.batches, "batch_size": args.batch_size, "concurrency": args.concurrency},
+        "sse_fanout": {"executions": args.sse_executions, "subscribers": args.subscribers, "batches": args.sse_batches, "batch_size": args.batch_size},
+        "checkpoint_cycles": {"executions": args.executions, "cycles": args.cycles, "concurrency": args.concurrency},
+    }
+
+    max_connections = args.concurrency + args.sse_executions * args.subscribers + 10
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    ) as http:
+        for name in names:
+            print(f"▶ {name} {params[name]}", flush=True)
+            results[name] = await SCENARIOS[name](http, fixture, **params[name])
+            print(json.dumps(results[name], indent=2), flush=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "params": params,
+        },
+        "scenarios": results
+    }
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> bool:
+    """Print a baseline diff; returns True if anything regressed."""
+    if not rows:
+        print("No comparable metrics in baseline")
+        return False
+
+    print(f"\n{'scenario':<20} {'metric':<24} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        change = f"{row['change_pct']:+.1f}%" if row["change_pct"] is not None else "n/a"
+        flag = "  ❌" if row["regression"] else ""
+        print(f"{row['scenario']:<20} {row['metric']:<24} {row['baseline']:>12} {row['current']:>12} {change:>9}{flag}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} metrics regressed by more than {threshold:g}%")
+    else:
+        print(f"\n✅ No regressions beyond {threshold:g}%")
+    return bool(regressions)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Spinscribe API load benchmark")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start api.main:app with uvicorn for the run")
+    parser.add_argument("--simulator", action="store_true", help="with --spawn: also start the CrewAI simulator")
+    parser.add_argument("--scenarios", default="all")
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--executions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100, help="start_executions requests")
+    parser.add_argument("--batches", type=int, default=500, help="webhook_storm batches")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--sse-executions", type=int, default=10)
+    parser.add_argument("--subscribers", type=int, default=3, help="SSE subscribers per execution")
+    parser.add_argument("--sse-batches", type=int, default=20, help="batches per execution in sse_fanout")
+    parser.add_argument("--cycles", type=int, default=3, help="checkpoint cycles per execution")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a saved JSON result")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    processes: List[subprocess.Popen] = []
+    base_url = args.base_url
+    try:
+        if args.spawn:
+            env = dict(os.environ)
+            # One benchmark user owns every subscribed execution
+            env.setdefault("SSE_MAX_CONNECTIONS_PER_USER", str(args.sse_executions * args.subscribers + 5))
+
+            if args.simulator:
+                sim_port = _free_port()
+                env["CREWAI_API_URL"] = f"http://127.0.0.1:{sim_port}"
+                env.setdefault("CREWAI_SIM_BEARER_TOKEN", env.get("CREWAI_BEARER_TOKEN", ""))
+                processes.append(_spawn(["api.simulator", "--port", str(sim_port), "--log-level", "warning"], env))
+                _wait_until_up(f"http://127.0.0.1:{sim_port}/stats")
+
+            api_port = _free_port()
+            base_url = f"http://127.0.0.1:{api_port}"
+            env["API_BASE_URL"] = base_url  # webhook URLs handed to CrewAI
+            processes.append(_spawn([
+                "uvicorn", "api.main:app", "--port", str(api_port),
+                "--log-level", "warning", "--no-access-log"
+            ], env))
+            _wait_until_up(f"{base_url}/health/live")
+
+        result = asyncio.run(run(args, base_url))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if print_comparison(compare_results(baseline, result, args.threshold), args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
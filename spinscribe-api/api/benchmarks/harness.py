@@ -0,0 +1,533 @@
+# api/benchmarks/harness.py
+"""
+Benchmark Harness - Scripted load scenarios against a running API
+
+Scenarios:
+- start_executions: concurrent POST /executions/start
+- webhook_storm: event batches to /webhook/stream at a fixed concurrency
+- sse_fanout: N subscribers per execution on /executions/{id}/stream while
+  webhooks are posted; measures event-to-SSE delivery lag
+- checkpoint_cycles: HITL webhook -> approve/reject through /checkpoints
+
+Each scenario reports request counts, errors, throughput and p50/p95/p99
+latency. Results are plain dicts so a run can be saved as a JSON baseline
+and diffed against later runs (compare_results).
+
+Fixtures (user, client, projects, RUNNING executions with a synthetic
+crewai_execution_id) are written straight to the configured database, so
+point DATABASE_URL at a disposable database. The harness reads the same
+settings as the API (DATABASE_URL, JWT_SECRET, WEBHOOK_SECRET_TOKEN,
+WEBHOOK_INGEST_MODE), so run both with the same environment.
+
+Webhook and checkpoint scenarios don't need CrewAI; start_executions and
+checkpoint resumes reach whatever CREWAI_API_URL points at (see
+api.simulator).
+"""
+
+import asyncio
+import json
+import math
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+
+from api.config import settings
+from api.database import AsyncSessionLocal
+from api.models.client import Client
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.project import Project
+from api.models.user import User
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no samples)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class Recorder:
+    """Latency samples and error count for one scenario."""
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    error_samples: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: Optional[float] = None
+
+    def error(self, message: str):
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(message)
+
+    async def timed(self, call: Awaitable[httpx.Response], expect: int = 200) -> Optional[httpx.Response]:
+        """Await a request, recording latency (or an error)."""
+        start = time.perf_counter()
+        try:
+            response = await call
+        except httpx.HTTPError as e:
+            self.error(f"{type(e).__name__}: {e}")
+            return None
+        self.latencies_ms.append((time.perf_counter() - start) * 1000)
+        if response.status_code != expect:
+            self.error(f"{response.status_code}: {response.text[:200]}")
+            return None
+        return response
+
+    def summary(self, **extra: Any) -> Dict[str, Any]:
+        """Throughput and latency percentiles."""
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "requests": len(self.latencies_ms) + self.errors,
+            "errors": self.errors,
+            "duration_s": round(elapsed, 3),
+            "requests_per_sec": round(len(self.latencies_ms) / elapsed, 1) if elapsed else None,
+            **latency_summary(self.latencies_ms),
+            **extra,
+            **({"error_samples": self.error_samples} if self.error_samples else {})
+        }
+
+
+def latency_summary(samples_ms: List[float], prefix: str = "latency") -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max of a sample list, rounded to 0.01 ms."""
+    def r(value):
+        return round(value, 2) if value is not None else None
+    return {
+        f"{prefix}_p50_ms": r(percentile(samples_ms, 50)),
+        f"{prefix}_p95_ms": r(percentile(samples_ms, 95)),
+        f"{prefix}_p99_ms": r(percentile(samples_ms, 99)),
+        f"{prefix}_max_ms": r(max(samples_ms) if samples_ms else None),
+    }
+
+
+async def run_concurrently(count: int, concurrency: int, job: Callable[[int], Awaitable[None]]):
+    """Run job(0..count-1) with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int):
+        async with semaphore:
+            await job(index)
+
+    await asyncio.gather(*(bounded(i) for i in range(count)))
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@dataclass
+class Fixture:
+    """Benchmark-owned user, client, projects and executions."""
+    user_id: uuid.UUID
+    token: str
+    client_id: uuid.UUID
+    project_ids: List[uuid.UUID]
+    executions: Dict[uuid.UUID, str]  # execution_id -> crewai_execution_id
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def create_fixture(projects: int, executions: int) -> Fixture:
+    """
+    Insert a benchmark user with a client, projects and RUNNING executions.
+
+    The token is a mock-auth JWT (requires USE_MOCK_AUTH on the API).
+    """
+    run_id = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user = User(cognito_sub=f"bench-{run_id}", email=f"bench-{run_id}@bench.local", name="Benchmark")
+        db.add(user)
+        await db.flush()
+
+        client = Client(owner_id=user.user_id, client_name=f"Benchmark {run_id}")
+        db.add(client)
+        await db.flush()
+
+        project_rows = [
+            Project(
+                client_id=client.client_id,
+                project_name=f"Benchmark project {i}",
+                topic="Load testing the execution lifecycle",
+                content_type="blog",
+                created_by=user.user_id
+            )
+            for i in range(max(projects, 1))
+        ]
+        db.add_all(project_rows)
+        await db.flush()
+
+        execution_rows = [
+            CrewExecution(
+                project_id=project_rows[i % len(project_rows)].project_id,
+                workflow_mode="creation",
+                status=ExecutionStatus.RUNNING,
+                crewai_execution_id=f"bench-{run_id}-{i}",
+                started_at=datetime.utcnow(),
+                created_by=user.user_id,
+                owner_id=user.user_id
+            )
+            for i in range(executions)
+        ]
+        db.add_all(execution_rows)
+        await db.commit()
+
+        token = jwt.encode({"sub": user.cognito_sub, "email": user.email}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+        return Fixture(
+            user_id=user.user_id,
+            token=token,
+            client_id=client.client_id,
+            project_ids=[p.project_id for p in project_rows],
+            executions={e.execution_id: e.crewai_execution_id for e in execution_rows}
+        )
+
+
+def make_events(crewai_execution_id: str, count: int) -> List[Dict[str, Any]]:
+    """A batch of task events stamped with the current time."""
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": f"bench-{uuid.uuid4()}",
+            "execution_id": crewai_execution_id,
+            "timestamp": now,
+            "type": "task_started",
+            "data": {"task_name": "Benchmark task", "agent_name": "Benchmark Agent"}
+        }
+        for _ in range(count)
+    ]
+
+
+def webhook_headers() -> Dict[str, str]:
+    return {"Authorization": f"Bearer {settings.WEBHOOK_SECRET_TOKEN}"}
+
+
+def webhook_status_code() -> int:
+    """Webhooks are acknowledged with 202 in queue ingest mode."""
+    return 202 if settings.WEBHOOK_INGEST_MODE == "queue" else 200
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+async def scenario_start_executions(
+    http: httpx.AsyncClient,
+    fixture: Fixture,
+    requests: int = 100,
+    concurrency: int = 20
+) -> Dict[str, Any]:
+    """POST /executions/start, spread over the fixture projects."""
+    recorder = Recorder("start_executions")
+
+    async def job(i: int):
+        project_id = fixture.project_ids[i % len(fixture.project_ids)]
+        await recorder.timed(http.post(
+            "/api/v1/executions/start",
+            json={"project_id": str(project_id)},
+            headers=fixture.auth_headers
+        ), expect=202)
+
+    await run_concurrently(requests, concurrency, job)
+    recorder.finished_at = time.perf_counter()
+    return recorder.summary(concurrency=concurrency)
+
+
+async def scenario_webhook_storm(
+    http: httpx.AsyncClient,
+    fixture: Fixture,
+    batches: int = 500,
+    batch_size: int = 20,
+    concurrency: int = 20
+) -> Dict[str, Any]:
+    """Event batches to /webhook/stream, round-robin over executions."""
+    recorder = Recorder("webhook_storm")
+    crewai_ids = list(fixture.executions.values())
+
+    async def job(i: int):
+        events = make_events(crewai_ids[i % len(crewai_ids)], batch_size)
+        await recorder.timed(http.post(
+            "/api/v1/webhook/stream",
+            json={"events": events},
+            headers=webhook_headers()
+        ), expect=webhook_status_code())
+
+    await run_concurrently(batches, concurrency, job)
+    recorder.finished_at = time.perf_counter()
+
+    elapsed = recorder.finished_at - recorder.started_at
+    delivered = len(recorder.latencies_ms) * batch_size
+    return recorder.summary(
+        batch_size=batch_size,
+        concurrency=concurrency,
+        events_per_sec=round(delivered / elapsed, 1) if elapsed else None
+    )
+
+
+async def _subscribe(
+    http: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    lags_ms: List[float],
+    ready: asyncio.Event,
+    stop: asyncio.Event,
+    failures: List[str],
+    since: List[datetime]
+):
+    """
+    Read an SSE stream, recording now - event timestamp for messages.
+
+    Messages stamped before since[0] (replayed history) are ignored.
+    """
+    try:
+        async with http.stream("GET", url, headers=headers, timeout=None) as response:
+            if response.status_code != 200:
+                failures.append(f"{response.status_code}: {(await response.aread())[:200]!r}")
+                return
+            event_type = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event_type = line[7:]
+                    if event_type == "connected":
+                        ready.set()
+                elif line.startswith("data: ") and event_type == "message":
+                    sent = datetime.fromisoformat(json.loads(line[6:])["timestamp"])
+                    if sent.tzinfo is None:
+                        sent = sent.replace(tzinfo=timezone.utc)
+                    if not since or sent < since[0]:
+                        continue
+                    lags_ms.append((datetime.now(timezone.utc) - sent).total_seconds() * 1000)
+                if stop.is_set():
+                    return
+    except httpx.HTTPError as e:
+        failures.append(f"{type(e).__name__}: {e}")
+    finally:
+        ready.set()
+
+
+async def scenario_sse_fanout(
+    http: httpx.AsyncClient,
+    fixture: Fixture,
+    executions: int = 10,
+    subscribers: int = 3,
+    batches: int = 20,
+    batch_size: int = 5,
+    interval: float = 0.05,
+    drain_timeout: float = 10.0
+) -> Dict[str, Any]:
+    """
+    Subscribers per execution on the SSE stream while webhooks arrive.
+
+    Lag is measured from the event timestamp (set when the batch is built)
+    to the moment a subscriber parses the "message" event, so it covers
+    webhook handling, storage, fan-out and streaming. Subscribers per
+    user are capped by SSE_MAX_CONNECTIONS_PER_USER on the API.
+    """
+    recorder = Recorder("sse_fanout")
+    targets = list(fixture.executions.items())[:executions]
+    lags_ms: List[float] = []
+    failures: List[str] = []
+    stop = asyncio.Event()
+    since: List[datetime] = []  # set once every subscriber is connected
+
+    readies = []
+    readers = []
+    for execution_id, _ in targets:
+        for _ in range(subscribers):
+            ready = asyncio.Event()
+            readies.append(ready)
+            readers.append(asyncio.create_task(_subscribe(
+                http, f"/api/v1/executions/{execution_id}/stream",
+                fixture.auth_headers, lags_ms, ready, stop, failures, since
+            )))
+    await asyncio.gather(*(ready.wait() for ready in readies))
+    since.append(datetime.now(timezone.utc))
+
+    connected = len(readers) - len(failures)
+    # Every connected subscriber should see every event of its execution
+    expected = batches * batch_size * connected
+
+    recorder.started_at = time.perf_counter()
+
+    async def post_batches(crewai_id: str):
+        for _ in range(batches):
+            await recorder.timed(http.post(
+                "/api/v1/webhook/stream",
+                json={"events": make_events(crewai_id, batch_size)},
+                headers=webhook_headers()
+            ), expect=webhook_status_code())
+            await asyncio.sleep(interval)
+
+    await asyncio.gather(*(post_batches(crewai_id) for _, crewai_id in targets))
+    recorder.finished_at = time.perf_counter()
+
+    deadline = time.monotonic() + drain_timeout
+    while len(lags_ms) < expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    stop.set()
+    for reader in readers:
+        reader.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+
+    for failure in failures:
+        recorder.error(f"subscriber: {failure}")
+
+    return recorder.summary(
+        executions=len(targets),
+        subscribers_per_execution=subscribers,
+        subscribers_connected=connected,
+        sse_expected=expected,
+        sse_delivered=len(lags_ms),
+        **latency_summary(lags_ms, prefix="sse_lag")
+    )
+
+
+async def scenario_checkpoint_cycles(
+    http: httpx.AsyncClient,
+    fixture: Fixture,
+    executions: int = 20,
+    cycles: int = 3,
+    concurrency: int = 10
+) -> Dict[str, Any]:
+    """
+    HITL webhook followed by approve (or reject, every other cycle).
+
+    Latencies of the webhook and the decision call are reported
+    separately; resume delivery to CrewAI happens later from the outbox
+    and is not part of the measurement.
+    """
+    recorder = Recorder("checkpoint_cycles")
+    hitl_ms: List[float] = []
+    decision_ms: List[float] = []
+    targets = list(fixture.executions.items())[:executions]
+
+    async def find_pending(execution_id: uuid.UUID) -> Optional[str]:
+        for _ in range(50):
+            response = await http.get("/api/v1/checkpoints/pending", headers=fixture.auth_headers, params={"limit": 100})
+            for checkpoint in response.json().get("checkpoints", []):
+                if checkpoint["execution_id"] == str(execution_id):
+                    return checkpoint["checkpoint_id"]
+            await asyncio.sleep(0.05)
+        return None
+
+    async def job(i: int):
+        execution_id, crewai_id = targets[i % len(targets)]
+        for cycle in range(cycles):
+            count = len(recorder.latencies_ms)
+            response = await recorder.timed(http.post(
+                "/api/v1/webhook/hitl",
+                json={
+                    "execution_id": crewai_id,
+                    "task_id": "brand_voice_analysis_task",
+                    "task_output": "Benchmark checkpoint output"
+                },
+                headers=webhook_headers()
+            ), expect=webhook_status_code())
+            if response is None:
+                return
+            hitl_ms.append(recorder.latencies_ms[count])
+
+            checkpoint_id = response.json().get("checkpoint_id") or await find_pending(execution_id)
+            if checkpoint_id is None:
+                recorder.error("checkpoint not found")
+                return
+
+            action = "reject" if cycle % 2 else "approve"
+            count = len(recorder.latencies_ms)
+            response = await recorder.timed(http.post(
+                f"/api/v1/checkpoints/{checkpoint_id}/{action}",
+                json={"feedback": f"Benchmark {action}", "is_approve": action == "approve"},
+                headers=fixture.auth_headers
+            ))
+            if response is None:
+                return
+            decision_ms.append(recorder.latencies_ms[count])
+
+    await run_concurrently(len(targets), concurrency, job)
+    recorder.finished_at = time.perf_counter()
+
+    elapsed = recorder.finished_at - recorder.started_at
+    return recorder.summary(
+        cycles_per_execution=cycles,
+        cycles_per_sec=round(len(decision_ms) / elapsed, 1) if elapsed else None,
+        **latency_summary(hitl_ms, prefix="hitl"),
+        **latency_summary(decision_ms, prefix="decision")
+    )
+
+
+SCENARIOS = {
+    "start_executions": scenario_start_executions,
+    "webhook_storm": scenario_webhook_storm,
+    "sse_fanout": scenario_sse_fanout,
+    "checkpoint_cycles": scenario_checkpoint_cycles,
+}
+
+
+# =============================================================================
+# BASELINES
+# =============================================================================
+
+def _metric_direction(metric: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if not compared."""
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith("_ms") or metric == "errors":
+        return -1
+    return None
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold_pct: float = 10.0
+) -> List[Dict[str, Any]]:
+    """
+    Diff two benchmark results.
+
+    Args:
+        baseline: Earlier result (as saved to JSON)
+        current: New result
+        threshold_pct: Relative change that counts as a regression
+
+    Returns:
+        One row per compared metric: scenario, metric, baseline, current,
+        change_pct and regression flag
+    """
+    rows = []
+    for scenario, metrics in current.get("scenarios", {}).items():
+        base_metrics = baseline.get("scenarios", {}).get(scenario)
+        if not base_metrics:
+            continue
+        for metric, value in metrics.items():
+            direction = _metric_direction(metric)
+            base = base_metrics.get(metric)
+            if direction is None or not isinstance(value, (int, float)) or not isinstance(base, (int, float)):
+                continue
+
+            if base == 0:
+                change = 0.0 if value == 0 else math.inf
+            else:
+                change = (value - base) / base * 100
+            worse = -change if direction > 0 else change
+            rows.append({
+                "scenario": scenario,
+                "metric": metric,
+                "baseline": base,
+                "current": value,
+                "change_pct": round(change, 1) if math.isfinite(change) else None,
+                "regression": worse > threshold_pct
+            })
+    return rows
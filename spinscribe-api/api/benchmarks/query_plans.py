@@ -0,0 +1,377 @@
+# api/benchmarks/query_plans.py
+"""
+Query Plan Regression Check - EXPLAIN the hot-path queries on seeded data
+
+Builds the schema (create_all + SCHEMA_UPGRADES + activity partitions) in
+a throwaway Postgres schema, seeds it with generate_series at a realistic shape (many
+activities per execution, mostly finished executions and decided
+checkpoints), runs ANALYZE, then EXPLAINs each query in HOT_QUERIES.
+
+A query fails if its plan contains a sequential scan on a table with
+more than --min-rows rows: that's a missing or unusable index, and the
+query will slow down as the table grows.
+
+HOT_QUERIES mirror the statements issued by the routers and background
+services; when one of those queries changes, update its entry here.
+
+Usage:
+    python -m api.benchmarks.query_plans
+    python -m api.benchmarks.query_plans --activities 500000 --min-rows 5000 --verbose
+
+Exit code 1 if any query regressed. The scratch schema is dropped
+afterwards unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Select, func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from api.config import settings
+from api.database import Base, _async_database_url, apply_schema_upgrades
+from api.services.activity_partitions import prepare_activity_partitions, ensure_activity_partitions
+from api.models.activity import AgentActivity
+from api.models.activity_archive import ActivityArchive
+from api.models.checkpoint import HITLCheckpoint, CheckpointStatus
+from api.models.client import Client
+from api.models.document import Document
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.outbox import CrewAIOutbox, OutboxStatus
+from api.models.project import Project
+from api.models.user import User
+import api.models  # noqa: F401 - registers every table on Base.metadata
+
+
+# =============================================================================
+# SEED DATA
+# =============================================================================
+
+@dataclass
+class SeedSize:
+    users: int = 200
+    clients: int = 2_000
+    projects: int = 20_000
+    executions: int = 50_000
+    checkpoints: int = 50_000
+    activities: int = 300_000
+    documents: int = 10_000
+    outbox: int = 50_000
+
+
+# Every statement is run with the sizes as bind parameters.
+# Row i of a child table belongs to parent (i % parents).
+SEED_STATEMENTS = [
+    """INSERT INTO users (user_id, cognito_sub, email, name, role, is_active, created_at, updated_at, user_metadata)
+       SELECT gen_random_uuid(), 'plan-' || i, 'plan-' || i || '@example.com', 'User ' || i, 'client', true,
+              now(), now(), '{}'::json
+       FROM generate_series(1, :users) AS i""",
+    """INSERT INTO clients (client_id, owner_id, client_name, is_active, created_at, updated_at, client_metadata)
+       SELECT gen_random_uuid(), u.user_id, 'Client ' || i, i % 20 <> 0,
+              now() - i * interval '1 minute', now(), '{}'::json
+       FROM generate_series(1, :clients) AS i
+       JOIN (SELECT user_id, row_number() OVER () - 1 AS n FROM users) u ON u.n = i % :users""",
+    """INSERT INTO projects (project_id, client_id, project_name, topic, content_type, status, created_by,
+                            created_at, updated_at, project_metadata)
+       SELECT gen_random_uuid(), c.client_id, 'Project ' || i, 'Topic ' || i, 'blog', 'DRAFT'::projectstatus,
+              c.owner_id, now() - i * interval '1 minute', now(), '{}'::json
+       FROM generate_series(1, :projects) AS i
+       JOIN (SELECT client_id, owner_id, row_number() OVER () - 1 AS n FROM clients) c ON c.n = i % :clients""",
+    # ~1% queued, ~2% running, ~1% awaiting approval, the rest finished
+    """INSERT INTO crew_executions (execution_id, project_id, workflow_mode, status, crewai_execution_id,
+                                   started_at, retry_count, created_by, owner_id, metrics)
+       SELECT gen_random_uuid(), p.project_id, 'creation',
+              (CASE WHEN i % 100 = 0 THEN 'PENDING' WHEN i % 100 < 3 THEN 'RUNNING'
+                    WHEN i % 100 = 3 THEN 'AWAITING_APPROVAL' WHEN i % 10 = 4 THEN 'FAILED'
+                    ELSE 'COMPLETED' END)::executionstatus,
+              CASE WHEN i % 100 = 0 THEN NULL ELSE 'plan-kick-' || i END,
+              now() - i * interval '10 seconds', 0, p.created_by, p.owner_id, '{}'::json
+       FROM generate_series(1, :executions) AS i
+       JOIN (SELECT p.project_id, p.created_by, c.owner_id, row_number() OVER () - 1 AS n
+             FROM projects p JOIN clients c ON c.client_id = p.client_id) p ON p.n = i % :projects""",
+    # ~2% pending review
+    """INSERT INTO hitl_checkpoints (checkpoint_id, execution_id, checkpoint_type, task_id, status, content,
+                                    created_at, checkpoint_metadata, owner_id)
+       SELECT gen_random_uuid(), e.execution_id, 'BRAND_VOICE'::checkpointtype, 'task_' || (i % 3),
+              (CASE WHEN i % 50 = 0 THEN 'PENDING' ELSE 'APPROVED' END)::checkpointstatus, 'Review me',
+              now() - i * interval '10 seconds', '{}'::json, e.owner_id
+       FROM generate_series(1, :checkpoints) AS i
+       JOIN (SELECT execution_id, owner_id, row_number() OVER () - 1 AS n FROM crew_executions) e
+         ON e.n = i % :executions""",
+    """INSERT INTO agent_activity (activity_id, execution_id, event_id, agent_name, activity_type, message,
+                                  timestamp, activity_metadata)
+       SELECT gen_random_uuid(), e.execution_id, 'plan-evt-' || i, 'Agent', 'MESSAGE'::activitytype, 'm',
+              now() - i * interval '1 second', '{}'::json
+       FROM generate_series(1, :activities) AS i
+       JOIN (SELECT execution_id, row_number() OVER () - 1 AS n FROM crew_executions) e
+         ON e.n = i % :executions""",
+    """INSERT INTO documents (document_id, client_id, document_type, file_name, s3_bucket, s3_key, version,
+                             uploaded_by, uploaded_at, document_metadata)
+       SELECT gen_random_uuid(), c.client_id, 'BRAND_VOICE'::documenttype, 'doc-' || i || '.pdf', 'plan',
+              'clients/plan/doc-' || i, 1, c.owner_id, now() - i * interval '1 minute', '{}'::json
+       FROM generate_series(1, :documents) AS i
+       JOIN (SELECT client_id, owner_id, row_number() OVER () - 1 AS n FROM clients) c ON c.n = i % :clients""",
+    # Almost everything already dispatched
+    """INSERT INTO crewai_outbox (outbox_id, dedup_key, operation, payload, status, attempts, next_attempt_at,
+                                 execution_id, created_at)
+       SELECT gen_random_uuid(), 'plan-' || i, 'resume', '{}'::json,
+              (CASE WHEN i % 500 = 0 THEN 'PENDING' ELSE 'DISPATCHED' END)::outboxstatus, 1,
+              now() - i * interval '1 second', e.execution_id, now() - i * interval '1 second'
+       FROM generate_series(1, :outbox) AS i
+       JOIN (SELECT execution_id, row_number() OVER () - 1 AS n FROM crew_executions) e
+         ON e.n = i % :executions""",
+]
+
+
+@dataclass
+class Sample:
+    """Real keys from the seeded data, used as query parameters."""
+    user_id: uuid.UUID
+    cognito_sub: str
+    client_id: uuid.UUID
+    execution_id: uuid.UUID
+    crewai_execution_id: str
+    cursor_timestamp: datetime
+    cursor_id: uuid.UUID
+
+
+async def seed(conn: AsyncConnection, size: SeedSize) -> Sample:
+    """Insert the seed rows, ANALYZE, and pick sample keys."""
+    params = vars(size)
+    for statement in SEED_STATEMENTS:
+        await conn.execute(text(statement), params)
+    # Move activity seeded into past months out of the default partition
+    await conn.run_sync(ensure_activity_partitions)
+    await conn.execute(text("ANALYZE"))
+
+    row = (await conn.execute(text(
+        """SELECT e.execution_id, e.crewai_execution_id, e.owner_id, u.cognito_sub, p.client_id
+           FROM crew_executions e
+           JOIN projects p ON p.project_id = e.project_id
+           JOIN users u ON u.user_id = e.owner_id
+           WHERE e.status = 'RUNNING' LIMIT 1"""
+    ))).one()
+    cursor = (await conn.execute(
+        text("SELECT timestamp, activity_id FROM agent_activity WHERE execution_id = :e ORDER BY timestamp, activity_id OFFSET 3 LIMIT 1"),
+        {"e": row.execution_id}
+    )).one()
+    return Sample(
+        user_id=row.owner_id,
+        cognito_sub=row.cognito_sub,
+        client_id=row.client_id,
+        execution_id=row.execution_id,
+        crewai_execution_id=row.crewai_execution_id,
+        cursor_timestamp=cursor.timestamp,
+        cursor_id=cursor.activity_id,
+    )
+
+
+# =============================================================================
+# HOT QUERIES
+# =============================================================================
+
+@dataclass
+class HotQuery:
+    name: str
+    source: str  # where the query is issued
+    build: Callable[[Sample], Select]
+
+
+def _in_flight() -> List[ExecutionStatus]:
+    return [ExecutionStatus.PENDING, ExecutionStatus.RUNNING, ExecutionStatus.AWAITING_APPROVAL]
+
+
+def _reconciler_stale(s: Sample) -> Select:
+    last_activity = select(func.max(AgentActivity.timestamp)).where(
+        AgentActivity.execution_id == CrewExecution.execution_id
+    ).correlate(CrewExecution).scalar_subquery()
+    last_seen = func.coalesce(last_activity, CrewExecution.started_at)
+    return select(CrewExecution.execution_id, CrewExecution.crewai_execution_id).where(
+        CrewExecution.status.in_([ExecutionStatus.RUNNING, ExecutionStatus.AWAITING_APPROVAL]),
+        CrewExecution.crewai_execution_id.isnot(None),
+        last_seen < datetime.now(timezone.utc) - timedelta(minutes=10)
+    ).order_by(last_seen).limit(400)
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("current_user", "dependencies.get_current_user", lambda s: select(User).where(
+        User.cognito_sub == s.cognito_sub)),
+    HotQuery("execution_owned", "ownership.get_owned_execution", lambda s: select(CrewExecution).where(
+        CrewExecution.execution_id == s.execution_id, CrewExecution.owner_id == s.user_id)),
+    HotQuery("messages_first_page", "GET /executions/{id}/messages", lambda s: select(AgentActivity).where(
+        AgentActivity.execution_id == s.execution_id
+    ).order_by(AgentActivity.timestamp, AgentActivity.activity_id).limit(101)),
+    HotQuery("messages_cursor_page", "GET /executions/{id}/messages?cursor=", lambda s: select(AgentActivity).where(
+        AgentActivity.execution_id == s.execution_id,
+        tuple_(AgentActivity.timestamp, AgentActivity.activity_id) > (s.cursor_timestamp, s.cursor_id)
+    ).order_by(AgentActivity.timestamp, AgentActivity.activity_id).limit(101)),
+    HotQuery("messages_count", "GET /executions/{id}/messages", lambda s: select(func.count()).select_from(
+        AgentActivity).where(AgentActivity.execution_id == s.execution_id)),
+    HotQuery("messages_archives", "activity_archive.archived_activity_sources", lambda s: select(
+        ActivityArchive.s3_bucket, ActivityArchive.s3_key, ActivityArchive.first_timestamp,
+        ActivityArchive.last_timestamp, ActivityArchive.row_count).where(
+        ActivityArchive.execution_id == s.execution_id).order_by(ActivityArchive.partition_month)),
+    HotQuery("pending_checkpoint_for_execution", "GET /executions/{id}", lambda s: select(HITLCheckpoint).where(
+        HITLCheckpoint.execution_id == s.execution_id, HITLCheckpoint.status == CheckpointStatus.PENDING)),
+    HotQuery("checkpoint_dedupe", "webhook_ingest.process_hitl_checkpoint", lambda s: select(HITLCheckpoint).where(
+        HITLCheckpoint.execution_id == s.execution_id, HITLCheckpoint.task_id == "task_1",
+        HITLCheckpoint.status == CheckpointStatus.PENDING)),
+    HotQuery("pending_checkpoints_page", "GET /checkpoints/pending", lambda s: select(HITLCheckpoint).where(
+        HITLCheckpoint.status == CheckpointStatus.PENDING, HITLCheckpoint.owner_id == s.user_id
+    ).order_by(HITLCheckpoint.created_at.desc(), HITLCheckpoint.checkpoint_id.desc()).limit(21)),
+    HotQuery("execution_by_crewai_id", "webhook_ingest.process_hitl_checkpoint", lambda s: select(CrewExecution).where(
+        CrewExecution.crewai_execution_id == s.crewai_execution_id)),
+    HotQuery("user_stream_default", "GET /executions/stream", lambda s: select(CrewExecution.execution_id).where(
+        CrewExecution.owner_id == s.user_id, CrewExecution.status.in_(_in_flight())
+    ).order_by(CrewExecution.started_at.desc()).limit(50)),
+    HotQuery("clients_page", "GET /clients", lambda s: select(Client).where(
+        Client.owner_id == s.user_id, Client.is_active == True  # noqa: E712
+    ).order_by(Client.created_at.desc(), Client.client_id.desc()).limit(21)),
+    HotQuery("projects_page", "GET /projects", lambda s: select(Project).join(Client).where(
+        Client.owner_id == s.user_id, Client.is_active == True  # noqa: E712
+    ).order_by(Project.created_at.desc(), Project.project_id.desc()).limit(21)),
+    HotQuery("projects_by_client_page", "GET /projects/by-client/{id}", lambda s: select(Project).where(
+        Project.client_id == s.client_id
+    ).order_by(Project.created_at.desc(), Project.project_id.desc()).limit(21)),
+    HotQuery("documents_by_client", "GET /documents/client/{id}", lambda s: select(Document).where(
+        Document.client_id == s.client_id).order_by(Document.uploaded_at.desc())),
+    HotQuery("scheduler_rescan", "scheduler._rescan", lambda s: select(CrewExecution.execution_id).where(
+        CrewExecution.status == ExecutionStatus.PENDING,
+        CrewExecution.crewai_execution_id.is_(None),
+        CrewExecution.kickoff_inputs.isnot(None),
+        or_(CrewExecution.kickoff_claimed_at.is_(None),
+            CrewExecution.kickoff_claimed_at < datetime.now(timezone.utc) - timedelta(minutes=5))
+    ).order_by(CrewExecution.started_at).limit(500)),
+    HotQuery("reconciler_stale", "reconciler._find_stale", _reconciler_stale),
+    HotQuery("outbox_due", "outbox.dispatch_due", lambda s: select(CrewAIOutbox).where(
+        CrewAIOutbox.status == OutboxStatus.PENDING, CrewAIOutbox.next_attempt_at <= datetime.now(timezone.utc)
+    ).order_by(CrewAIOutbox.next_attempt_at).limit(50)),
+]
+
+
+# =============================================================================
+# PLAN CHECK
+# =============================================================================
+
+def _scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a JSON plan into its scan nodes."""
+    nodes = []
+    if "Relation Name" in plan:
+        nodes.append({
+            "type": plan["Node Type"],
+            "relation": plan["Relation Name"],
+            "index": plan.get("Index Name"),
+        })
+    for child in plan.get("Plans", []):
+        nodes.extend(_scans(child))
+    return nodes
+
+
+async def explain(conn: AsyncConnection, query: Select) -> Dict[str, Any]:
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    raw = result.scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+async def check_plans(conn: AsyncConnection, sample: Sample, min_rows: int) -> List[Dict[str, Any]]:
+    """EXPLAIN every hot query; flag sequential scans on large tables."""
+    table_rows = {
+        name: int(rows) for name, rows in (await conn.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace"
+        ))).all()
+    }
+
+    results = []
+    for hot in HOT_QUERIES:
+        plan = await explain(conn, hot.build(sample))
+        scans = _scans(plan)
+        seq_scans = [
+            scan["relation"] for scan in scans
+            if scan["type"] == "Seq Scan" and table_rows.get(scan["relation"], 0) > min_rows
+        ]
+        results.append({
+            "query": hot.name,
+            "source": hot.source,
+            "cost": plan["Total Cost"],
+            "scans": scans,
+            "seq_scans": seq_scans,
+            "ok": not seq_scans,
+        })
+    return results
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Create the scratch schema, seed it, check plans, drop it."""
+    schema = f"plan_check_{uuid.uuid4().hex[:8]}"
+    engine = create_async_engine(
+        _async_database_url(settings.DATABASE_URL),
+        connect_args={"server_settings": {"search_path": schema}}
+    )
+    size = SeedSize(
+        users=args.users, clients=args.clients, projects=args.projects, executions=args.executions,
+        checkpoints=args.executions, activities=args.activities, documents=args.documents, outbox=args.executions
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(apply_schema_upgrades)
+            await conn.run_sync(prepare_activity_partitions)
+            print(f"🌱 Seeding {schema} ({vars(size)})", flush=True)
+            sample = await seed(conn, size)
+        async with engine.connect() as conn:
+            return await check_plans(conn, sample, args.min_rows)
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN hot-path queries on seeded data")
+    parser.add_argument("--users", type=int, default=SeedSize.users)
+    parser.add_argument("--clients", type=int, default=SeedSize.clients)
+    parser.add_argument("--projects", type=int, default=SeedSize.projects)
+    parser.add_argument("--executions", type=int, default=SeedSize.executions, help="also sets checkpoint and outbox rows")
+    parser.add_argument("--activities", type=int, default=SeedSize.activities)
+    parser.add_argument("--documents", type=int, default=SeedSize.documents)
+    parser.add_argument("--min-rows", type=int, default=1000, help="ignore sequential scans on smaller tables")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for inspection")
+    parser.add_argument("--verbose", action="store_true", help="print every scan node")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"\n{'query':<34} {'cost':>10}  result")
+    for row in results:
+        verdict = "✅" if row["ok"] else f"❌ seq scan on {', '.join(row['seq_scans'])}"
+        print(f"{row['query']:<34} {row['cost']:>10.1f}  {verdict}")
+        if args.verbose:
+            for scan in row["scans"]:
+                print(f"    {scan['type']:<20} {scan['relation']:<20} {scan['index'] or ''}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    failed = [row for row in results if not row["ok"]]
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(results)} queries scan large tables sequentially")
+        return 1
+    print(f"\n✅ All {len(results)} hot queries use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,10 +22,48 @@ class Settings(BaseSettings):
     # Cognito
     COGNITO_USER_POOL_ID: Optional[str] = None
     COGNITO_CLIENT_ID: Optional[str] = None
+    COGNITO_STACK_NAME: str = "spinscribe-production"  # CloudFormation fallback for the IDs above
+    COGNITO_METADATA_CACHE_FILE: Optional[str] = ".cognito-metadata.json"  # discovered IDs; None disables
+    COGNITO_THREAD_POOL_SIZE: int = 8  # concurrent blocking boto3 calls
+    COGNITO_JWKS_CACHE_TTL: float = 3600.0
+    COGNITO_JWKS_MIN_REFRESH_INTERVAL: float = 30.0  # refetches on unknown kid
+    COGNITO_JWKS_TIMEOUT: float = 5.0
+    COGNITO_TOKEN_CACHE_SIZE: int = 10000  # verified tokens kept in the LRU
+
+    # Authenticated user cache ("local" = per process, "redis" = shared)
+    PRINCIPAL_CACHE_BACKEND: str = "local"
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_REDIS_PREFIX: str = "spinscribe:principal"
+
+    # Execution ownership cache ((user, execution) pairs that passed the check;
+    # "local" = per process, "redis" = owner changes cleared on every worker)
+    OWNERSHIP_CACHE_BACKEND: str = "local"
+    OWNERSHIP_CACHE_TTL_SECONDS: float = 5.0  # max staleness of a revoked grant on other workers ("local")
+    OWNERSHIP_CACHE_MAX_SIZE: int = 50000
+    OWNERSHIP_CACHE_REDIS_CHANNEL: str = "spinscribe:ownership"
     
     # S3
     DOCUMENTS_BUCKET: str = "local-documents"
     OUTPUTS_BUCKET: str = "local-outputs"
+    S3_THREAD_POOL_SIZE: int = 16  # concurrent blocking boto3 calls
+    S3_MAX_POOL_CONNECTIONS: int = 32  # botocore HTTP pool (>= thread pool)
+    S3_CONNECT_TIMEOUT: float = 5.0
+    S3_READ_TIMEOUT: float = 30.0
+    S3_MAX_ATTEMPTS: int = 3  # including the first try
+    DOCUMENT_MULTIPART_PART_SIZE: int = 64 * 1024 * 1024  # bytes per part (S3 minimum 5 MiB)
+
+    # Object storage backend ("s3" or "local")
+    STORAGE_BACKEND: str = "s3"
+    LOCAL_STORAGE_ROOT: str = ".storage"  # {root}/{bucket}/{key}
+    LOCAL_STORAGE_SIGNING_SECRET: Optional[str] = None  # defaults to JWT_SECRET
+    LOCAL_STORAGE_ACCEL_REDIRECT_PREFIX: Optional[str] = None  # e.g. "/_storage" to let nginx send files
+
+    # Presigned download URL cache
+    PRESIGN_CACHE_MAX_SIZE: int = 10000
+    PRESIGN_CACHE_REUSE_FRACTION: float = 0.5  # reuse until this share of the lifetime passed (0 = off)
+    PRESIGN_CACHE_REDIS: bool = False  # shared tier across workers
+    PRESIGN_CACHE_REDIS_PREFIX: str = "spinscribe:presign"
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -37,11 +75,83 @@ class Settings(BaseSettings):
     CREWAI_API_URL: str
     CREWAI_BEARER_TOKEN: str
     CREWAI_USER_BEARER_TOKEN: str
+    CREWAI_HTTP2: bool = False  # needs httpx[http2]
+    CREWAI_MAX_CONNECTIONS: int = 50
+    CREWAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    CREWAI_KEEPALIVE_EXPIRY: float = 30.0
+    CREWAI_CONNECT_TIMEOUT: float = 5.0
+    CREWAI_POOL_TIMEOUT: float = 5.0  # wait for a free pooled connection
+    CREWAI_TIMEOUT_KICKOFF: float = 30.0
+    CREWAI_TIMEOUT_RESUME: float = 30.0
+    CREWAI_TIMEOUT_STATUS: float = 10.0
+    CREWAI_TIMEOUT_CANCEL: float = 10.0
+    CREWAI_RETRY_ATTEMPTS: int = 3  # total attempts per call
+    CREWAI_RETRY_BASE_DELAY: float = 0.5
+    CREWAI_RETRY_MAX_DELAY: float = 8.0
+    CREWAI_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before opening
+    CREWAI_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds open before a probe
+
+    # Execution scheduler (kickoff admission control)
+    SCHEDULER_MAX_CONCURRENT_KICKOFFS: int = 8  # per process
+    SCHEDULER_MAX_CONCURRENT_PER_CLIENT: int = 2
+    SCHEDULER_RESCAN_INTERVAL: float = 30.0  # pick up executions queued elsewhere
+    SCHEDULER_RESCAN_LIMIT: int = 500
+    SCHEDULER_LEASE_SECONDS: float = 300.0  # claimed kickoffs hidden from other replicas
+
+    # CrewAI outbox (resume calls from checkpoint decisions)
+    OUTBOX_POLL_INTERVAL: float = 2.0
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_LEASE_SECONDS: float = 120.0  # claimed rows are hidden from other workers
+    OUTBOX_RETRY_BASE_DELAY: float = 2.0
+    OUTBOX_RETRY_MAX_DELAY: float = 300.0
+
+    # Status reconciler (repairs executions whose webhooks were lost)
+    RECONCILER_ENABLED: bool = True
+    RECONCILER_INTERVAL: float = 60.0
+    RECONCILER_STALE_MINUTES: float = 10.0  # no activity for this long -> poll CrewAI
+    RECONCILER_BATCH_SIZE: int = 100
+    RECONCILER_CONCURRENCY: int = 5
+    RECONCILER_MAX_BACKOFF_SECONDS: float = 1800.0
+    
+    # Agent activity partitions (monthly) and retention
+    ACTIVITY_PARTITION_PREMAKE_MONTHS: int = 2  # future months created ahead
+    ACTIVITY_MAINTENANCE_INTERVAL: float = 3600.0
+    ACTIVITY_RETENTION_ENABLED: bool = False  # archive to S3, then drop old partitions
+    ACTIVITY_RETENTION_MONTHS: int = 6  # full months kept in Postgres
+    ACTIVITY_ARCHIVE_PREFIX: str = "activity-archive"  # key prefix in OUTPUTS_BUCKET
+    ACTIVITY_ARCHIVE_CACHE_SIZE: int = 32  # decoded archive files kept in memory
     
     # API
     API_BASE_URL: str = "http://localhost:8000"
     WEBHOOK_SECRET_TOKEN: str = "dev-secret"
-    
+
+    # Webhook ingestion ("sync" = process in request, "queue" = ack + Redis stream)
+    WEBHOOK_INGEST_MODE: str = "sync"
+    WEBHOOK_QUEUE_STREAM: str = "spinscribe:webhooks"
+    WEBHOOK_QUEUE_GROUP: str = "spinscribe-api"
+    WEBHOOK_QUEUE_WORKERS: int = 4
+    WEBHOOK_QUEUE_READ_COUNT: int = 50
+    WEBHOOK_QUEUE_CLAIM_IDLE_MS: int = 60000
+    WEBHOOK_QUEUE_MAX_DELIVERIES: int = 5
+
+    # SSE fan-out ("local" = single worker, "redis" = pub/sub across workers)
+    SSE_BACKEND: str = "local"
+    SSE_REDIS_CHANNEL_PREFIX: str = "spinscribe:sse"
+    SSE_SLOT_TTL_SECONDS: int = 90
+    SSE_MAX_CONNECTIONS_PER_USER: int = 3
+
+    # SSE per-connection queues (policy: "drop_oldest", "coalesce" or "disconnect")
+    SSE_QUEUE_MAXSIZE: int = 256
+    SSE_OVERFLOW_POLICY: str = "drop_oldest"
+    SSE_MAX_STREAM_SUBSCRIPTIONS: int = 100  # executions per multiplexed user stream
+
+    # SSE Last-Event-ID replay
+    SSE_REPLAY_BUFFER_SIZE: int = 256  # events kept per execution
+    SSE_REPLAY_MAX_EXECUTIONS: int = 1000  # executions with a buffer
+    SSE_REPLAY_FALLBACK_LIMIT: int = 500  # max rows replayed from agent_activity
+    SSE_REPLAY_FALLBACK_SKEW_SECONDS: int = 30  # webhook delivery delay allowance
+
     # JWT
     JWT_SECRET: str = "dev-secret-key"
     JWT_ALGORITHM: str = "HS256"
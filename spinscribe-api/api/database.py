@@ -1,10 +1,21 @@
 # api/database.py
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from api.config import settings
 
-# Create engine
+
+def _async_database_url(url: str) -> str:
+    """Point the configured DATABASE_URL at the asyncpg driver."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+# Create engine (sync - scripts, migrations, background jobs)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Check connection health
@@ -13,16 +24,92 @@ engine = create_engine(
     echo=settings.DEBUG
 )
 
-# Create session factory
+# Create async engine (API request handlers)
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    echo=settings.DEBUG
+)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: attributes stay loaded after commit, so handlers
+# can keep reading them without an implicit (and illegal) async lazy load
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
+# Additive changes to tables that may already exist (create_all only creates
+# missing tables). Every statement must be idempotent.
+SCHEMA_UPGRADES = [
+    # Webhook idempotency: first-class event_id (previously only in activity_metadata).
+    # Backfill keeps the earliest row per event; later duplicates stay NULL.
+    "ALTER TABLE agent_activity ADD COLUMN IF NOT EXISTS event_id VARCHAR(255)",
+    """UPDATE agent_activity a SET event_id = d.event_id
+       FROM (
+           SELECT DISTINCT ON (activity_metadata->>'event_id')
+                  activity_id, timestamp, activity_metadata->>'event_id' AS event_id
+           FROM agent_activity
+           WHERE event_id IS NULL AND activity_metadata->>'event_id' IS NOT NULL
+           ORDER BY activity_metadata->>'event_id', timestamp, activity_id
+       ) d
+       WHERE a.activity_id = d.activity_id AND a.timestamp IS NOT DISTINCT FROM d.timestamp
+         AND a.event_id IS NULL
+         AND NOT EXISTS (SELECT 1 FROM agent_activity x WHERE x.event_id = d.event_id)""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_agent_activity_event_id_timestamp ON agent_activity (event_id, timestamp)",
+    "ALTER TABLE crew_executions ADD COLUMN IF NOT EXISTS kickoff_inputs JSON",
+    "ALTER TABLE crew_executions ADD COLUMN IF NOT EXISTS kickoff_claimed_at TIMESTAMP WITH TIME ZONE",
+    # Denormalized owner (clients.owner_id) for single-lookup ownership checks
+    "ALTER TABLE crew_executions ADD COLUMN IF NOT EXISTS owner_id UUID REFERENCES users(user_id)",
+    "ALTER TABLE hitl_checkpoints ADD COLUMN IF NOT EXISTS owner_id UUID REFERENCES users(user_id)",
+    """UPDATE crew_executions e SET owner_id = c.owner_id
+       FROM projects p JOIN clients c ON c.client_id = p.client_id
+       WHERE p.project_id = e.project_id AND e.owner_id IS NULL""",
+    """UPDATE hitl_checkpoints h SET owner_id = e.owner_id
+       FROM crew_executions e
+       WHERE e.execution_id = h.execution_id AND h.owner_id IS NULL""",
+    "CREATE INDEX IF NOT EXISTS ix_crew_executions_execution_owner ON crew_executions (execution_id, owner_id)",
+    "CREATE INDEX IF NOT EXISTS ix_crew_executions_owner_status_started ON crew_executions (owner_id, status, started_at)",
+    "CREATE INDEX IF NOT EXISTS ix_hitl_checkpoints_checkpoint_owner ON hitl_checkpoints (checkpoint_id, owner_id)",
+    "CREATE INDEX IF NOT EXISTS ix_hitl_checkpoints_owner_status_created ON hitl_checkpoints (owner_id, status, created_at, checkpoint_id)",
+    # Keyset pagination: (timestamp, id) tie-broken orderings
+    "CREATE INDEX IF NOT EXISTS ix_agent_activity_execution_timestamp_id ON agent_activity (execution_id, timestamp, activity_id)",
+    "CREATE INDEX IF NOT EXISTS ix_clients_owner_created_id ON clients (owner_id, created_at, client_id)",
+    "CREATE INDEX IF NOT EXISTS ix_projects_client_created_id ON projects (client_id, created_at, project_id)",
+    # Hot-path composite and partial indexes (see api/benchmarks/query_plans.py)
+    "CREATE INDEX IF NOT EXISTS ix_hitl_checkpoints_execution_task_status ON hitl_checkpoints (execution_id, task_id, status)",
+    # One pending checkpoint per task: drop redelivery duplicates (keep the first), then enforce
+    """DELETE FROM hitl_checkpoints h USING hitl_checkpoints k
+       WHERE h.status = 'PENDING' AND k.status = 'PENDING'
+         AND k.execution_id = h.execution_id AND k.task_id = h.task_id
+         AND (k.created_at, k.checkpoint_id) < (h.created_at, h.checkpoint_id)""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_hitl_checkpoints_pending_task ON hitl_checkpoints (execution_id, task_id) WHERE status = 'PENDING'",
+    "CREATE INDEX IF NOT EXISTS ix_hitl_checkpoints_pending_execution ON hitl_checkpoints (execution_id, created_at) WHERE status = 'PENDING'",
+    "CREATE INDEX IF NOT EXISTS ix_crew_executions_unclaimed ON crew_executions (started_at) WHERE status = 'PENDING' AND crewai_execution_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_crew_executions_in_flight ON crew_executions (started_at) WHERE status IN ('RUNNING', 'AWAITING_APPROVAL')",
+    "CREATE INDEX IF NOT EXISTS ix_documents_client_uploaded ON documents (client_id, uploaded_at)",
+]
+
+
+def apply_schema_upgrades(connection):
+    """Apply SCHEMA_UPGRADES (run with run_sync after create_all)."""
+    for statement in SCHEMA_UPGRADES:
+        connection.execute(text(statement))
+
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
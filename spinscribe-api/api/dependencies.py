@@ -1,12 +1,17 @@
 # api/dependencies.py - Update the authentication section
 import jwt
 from jwt.exceptions import PyJWTError as JWTError
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from api.database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.database import AsyncSessionLocal
 from api.models.user import User
 from api.config import settings
+from api.services.jwks import get_token_verifier, JWKSUnavailableError
+from api.services.principal_cache import PrincipalCache, UserPrincipal, get_principal_cache
+from api.utils.pagination import Cursor, CursorError
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,25 +23,23 @@ security = HTTPBearer()
 # DATABASE
 # =============================================================================
 
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 # =============================================================================
 # AUTHENTICATION
 # =============================================================================
 
-def decode_token(token: str) -> dict:
+async def decode_token(token: str) -> dict:
     """
     Decode JWT token (works for both Cognito and mock tokens).
     
     In development (mock mode): verifies with JWT_SECRET
-    In production (Cognito): should verify with Cognito public keys
+    In production (Cognito): verifies the RS256 signature against the user
+    pool's JWKS (cached keys and verified claims, see api/services/jwks.py)
     
     Args:
         token: JWT token string
@@ -45,7 +48,8 @@ def decode_token(token: str) -> dict:
         Decoded token payload
         
     Raises:
-        HTTPException: If token is invalid
+        HTTPException: If token is invalid, or 503 if signing keys are
+            unavailable
     """
     try:
         # In mock mode or development, verify with JWT_SECRET
@@ -59,13 +63,7 @@ def decode_token(token: str) -> dict:
             return payload
         
         # In production with real Cognito
-        # TODO: Implement proper Cognito JWT verification with public keys
-        # For now, decode without verification (SECURITY RISK - FIX BEFORE PRODUCTION)
-        payload = jwt.decode(
-            token,
-            options={"verify_signature": False}
-        )
-        return payload
+        return await get_token_verifier().verify(token)
         
     except jwt.ExpiredSignatureError:
         logger.error("Token has expired")
@@ -81,6 +79,12 @@ def decode_token(token: str) -> dict:
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except (JWKSUnavailableError, ValueError) as e:
+        logger.error(f"Token verification unavailable: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication temporarily unavailable",
+        )
 
 
 async def get_current_user_cognito_sub(
@@ -99,7 +103,7 @@ async def get_current_user_cognito_sub(
         HTTPException: If token is invalid or sub not found
     """
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = await decode_token(token)
     
     cognito_sub = payload.get("sub")
     if not cognito_sub:
@@ -114,36 +118,51 @@ async def get_current_user_cognito_sub(
 
 async def get_current_user(
     cognito_sub: str = Depends(get_current_user_cognito_sub),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db),
+    cache: PrincipalCache = Depends(get_principal_cache)
+) -> UserPrincipal:
     """
-    Get current authenticated user from database.
+    Get current authenticated user.
+    
+    Served from the principal cache when possible; the database is only
+    queried on a miss. The result is a read-only snapshot - load the User
+    row to modify it.
     
     Args:
         cognito_sub: Cognito user ID from JWT token
         db: Database session
+        cache: Principal cache
         
     Returns:
-        User object from database
+        UserPrincipal for the user
         
     Raises:
         HTTPException: If user not found or inactive
     """
-    user = db.query(User).filter(User.cognito_sub == cognito_sub).first()
+    principal = await cache.get(cognito_sub)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    if principal is None:
+        result = await db.execute(
+            select(User).where(User.cognito_sub == cognito_sub)
         )
+        user = result.scalars().first()
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        principal = UserPrincipal.from_user(user)
+        await cache.set(principal)
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
     
-    return user
+    return principal
 
 # =============================================================================
 # WEBHOOK AUTHENTICATION
@@ -201,39 +220,63 @@ async def verify_webhook_token(
 # =============================================================================
 
 def get_s3_service():
-    """Get S3 service instance"""
-    from api.services.s3 import S3Service
-    return S3Service()
+    """Get the shared S3 service instance (lazy boto3 client, thread pool)"""
+    from api.services.s3 import get_s3_service as get_shared_s3_service
+    return get_shared_s3_service()
 
 
 def get_crewai_service():
-    """Get CrewAI service instance"""
-    from api.services.crewai import CrewAIService
-    return CrewAIService()
+    """Get the shared CrewAI service instance (pooled HTTP client)"""
+    from api.services.crewai import get_crewai_service as get_shared_crewai_service
+    return get_shared_crewai_service()
 
 
 def get_cognito_service():
-    """Get Cognito service instance"""
-    from api.services.cognito import CognitoService
-    return CognitoService()
+    """Get the shared Cognito service instance (resolved once at startup)"""
+    from api.services.cognito import get_cognito_service as get_shared_cognito_service
+    return get_shared_cognito_service()
 
 
 # =============================================================================
 # PAGINATION
 # =============================================================================
 
+def parse_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor (next_cursor / prev_cursor of a previous page)")
+) -> Optional[Cursor]:
+    """Decode a keyset pagination cursor (400 if malformed)"""
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except CursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 class PaginationParams:
-    """Reusable pagination parameters"""
+    """
+    Reusable pagination parameters.
+    
+    A cursor (keyset pagination) takes precedence over page; page and
+    page_size keep working for existing clients.
+    """
     
     def __init__(
         self,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[Cursor] = Depends(parse_cursor),
+        include_total: bool = Query(True, description="Compute the exact total (extra COUNT query)"),
     ):
         self.page = max(1, page)
         self.page_size = min(100, max(1, page_size))
         self.skip = (self.page - 1) * self.page_size
         self.limit = self.page_size
+        self.cursor = cursor
+        self.include_total = include_total
 
 
 # =============================================================================
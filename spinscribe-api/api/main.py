@@ -14,7 +14,19 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from api.config import settings
-from api.database import engine, Base
+from api.database import engine, async_engine, Base, apply_schema_upgrades
+from api.services.redis_client import close_redis
+from api.services.sse import sse_manager
+from api.services.crewai import get_crewai_service, close_crewai_service
+from api.services.cognito import get_cognito_service, close_cognito_service, CognitoConfigurationError
+from api.services.s3 import close_s3_service
+from api.services.outbox import outbox_dispatcher
+from api.services.scheduler import execution_scheduler
+from api.services.reconciler import status_reconciler
+from api.services.activity_partitions import prepare_activity_partitions
+from api.services.activity_archive import activity_retention
+from api.services.webhook_queue import webhook_queue
+from api.services.ownership import ownership_cache
 
 # Configure logging
 logging.basicConfig(
@@ -47,12 +59,15 @@ async def lifespan(app: FastAPI):
     logger.info(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'Not configured'}")
     logger.info(f"Redis: {settings.REDIS_URL}")
     logger.info(f"CrewAI: {settings.CREWAI_API_URL}")
-    logger.info(f"S3 Buckets: {settings.DOCUMENTS_BUCKET}, {settings.OUTPUTS_BUCKET}")
+    logger.info(f"Storage: {settings.STORAGE_BACKEND} ({settings.DOCUMENTS_BUCKET}, {settings.OUTPUTS_BUCKET})")
     
     # Create database tables (if not exist)
     try:
         logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(apply_schema_upgrades)
+            await conn.run_sync(prepare_activity_partitions)
         logger.info("✅ Database tables created/verified")
     except Exception as e:
         logger.error(f"❌ Database initialization error: {e}")
@@ -65,6 +80,39 @@ async def lifespan(app: FastAPI):
     if not settings.CREWAI_BEARER_TOKEN:
         logger.warning("⚠️  CREWAI_BEARER_TOKEN not set - CrewAI integration will not work")
     
+    # Open pooled CrewAI HTTP client
+    try:
+        await get_crewai_service().start()
+    except ValueError as e:
+        logger.warning(f"⚠️  CrewAI client not started: {e}")
+    
+    # Resolve Cognito pool metadata once (not per login)
+    try:
+        await get_cognito_service().start()
+    except CognitoConfigurationError as e:
+        logger.warning(f"⚠️  Cognito not configured: {e}")
+    
+    # Start SSE fan-out backend before anything that broadcasts
+    await sse_manager.start()
+    
+    # Receive ownership cache clears from other workers (redis backend)
+    await ownership_cache.start()
+    
+    # Start CrewAI outbox dispatcher and kickoff scheduler
+    await outbox_dispatcher.start()
+    await execution_scheduler.start()
+    
+    # Start status reconciler (polls CrewAI for stale executions)
+    if settings.RECONCILER_ENABLED:
+        await status_reconciler.start()
+    
+    # Start activity partition maintenance (and retention, if enabled)
+    await activity_retention.start()
+    
+    # Start webhook queue workers (ack-first ingestion)
+    if settings.WEBHOOK_INGEST_MODE == "queue":
+        await webhook_queue.start()
+    
     logger.info("✅ Spinscribe API ready to accept requests")
     logger.info("=" * 80)
     
@@ -74,7 +122,31 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 80)
     logger.info("🛑 SPINSCRIBE API SHUTTING DOWN")
     logger.info("=" * 80)
+    if settings.WEBHOOK_INGEST_MODE == "queue":
+        await webhook_queue.stop()
+    
+    await activity_retention.stop()
+    await status_reconciler.stop()
+    await execution_scheduler.stop()
+    await outbox_dispatcher.stop()
+    
+    await sse_manager.stop()
+    await ownership_cache.stop()
+    
+    logger.info("Closing CrewAI HTTP client...")
+    await close_crewai_service()
+    
+    logger.info("Shutting down Cognito client...")
+    await close_cognito_service()
+    
+    logger.info("Shutting down S3 client...")
+    await close_s3_service()
+    
+    logger.info("Closing Redis connections...")
+    await close_redis()
+    
     logger.info("Closing database connections...")
+    await async_engine.dispose()
     engine.dispose()
     logger.info("✅ Shutdown complete")
     logger.info("=" * 80)
@@ -200,7 +272,7 @@ async def root():
 # =============================================================================
 
 # Import routers (we'll create these next)
-from api.routers import health, auth, clients, projects, webhooks, checkpoints, executions, documents
+from api.routers import health, auth, clients, projects, webhooks, checkpoints, executions, documents, storage
 
 # Register routers
 app.include_router(health.router, prefix="/health", tags=["Health"])
@@ -212,6 +284,10 @@ app.include_router(checkpoints.router, prefix="/api/v1/checkpoints", tags=["Chec
 app.include_router(executions.router, prefix="/api/v1/executions", tags=["Executions"])
 app.include_router(documents.router, prefix="/api/v1/documents", tags=["Documents"])
 
+# Presigned URL targets for the local storage backend
+if settings.STORAGE_BACKEND == "local":
+    app.include_router(storage.router, prefix="/api/v1/storage", tags=["Storage"])
+
 
 # =============================================================================
 # STARTUP MESSAGE
@@ -6,6 +6,8 @@ from api.models.document import Document, DocumentType
 from api.models.execution import CrewExecution, ExecutionStatus
 from api.models.checkpoint import HITLCheckpoint, CheckpointType, CheckpointStatus
 from api.models.activity import AgentActivity, ActivityType
+from api.models.activity_archive import ActivityArchive
+from api.models.outbox import CrewAIOutbox, OutboxStatus
 
 __all__ = [
     "User",
@@ -20,5 +22,8 @@ __all__ = [
     "CheckpointType",
     "CheckpointStatus",
     "AgentActivity",
-    "ActivityType"
+    "ActivityType",
+    "ActivityArchive",
+    "CrewAIOutbox",
+    "OutboxStatus"
 ]
\ No newline at end of file
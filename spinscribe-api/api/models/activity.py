@@ -1,5 +1,5 @@
 # api/models/activity.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,11 +22,22 @@ class AgentActivity(Base):
 
     activity_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     execution_id = Column(UUID(as_uuid=True), ForeignKey('crew_executions.execution_id', ondelete='CASCADE'), nullable=False, index=True)
+    event_id = Column(String(255))  # CrewAI event ID (webhook idempotency, unique with timestamp)
     agent_name = Column(String(100), nullable=False)
     activity_type = Column(Enum(ActivityType), nullable=False, index=True)
     message = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Partition key: part of the primary key and of every unique index
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), index=True)
     activity_metadata = Column(JSON, default={})
     
     # Relationships
-    execution = relationship("CrewExecution", backref="activities")
\ No newline at end of file
+    execution = relationship("CrewExecution", backref="activities")
+    
+    __table_args__ = (
+        # Keyset pagination / SSE replay: (timestamp, activity_id) per execution
+        Index('ix_agent_activity_execution_timestamp_id', 'execution_id', 'timestamp', 'activity_id'),
+        # Redelivered CrewAI events carry the same id and timestamp
+        Index('ix_agent_activity_event_id_timestamp', 'event_id', 'timestamp', unique=True),
+        # Monthly partitions, managed by api/services/activity_partitions.py
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
\ No newline at end of file
@@ -0,0 +1,27 @@
+# api/models/activity_archive.py
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+from api.database import Base
+
+class ActivityArchive(Base):
+    """One execution's agent activity for one month, exported to S3 before its partition was dropped."""
+    __tablename__ = "activity_archives"
+    __table_args__ = (
+        UniqueConstraint('execution_id', 'partition_month', name='_activity_archive_execution_month_uc'),
+    )
+
+    archive_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    execution_id = Column(UUID(as_uuid=True), ForeignKey('crew_executions.execution_id', ondelete='CASCADE'), nullable=False, index=True)
+    partition_month = Column(String(7), nullable=False)  # YYYY-MM
+    s3_bucket = Column(String(255), nullable=False)
+    s3_key = Column(Text, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True))
+    last_timestamp = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    execution = relationship("CrewExecution", backref="activity_archives")
@@ -1,5 +1,5 @@
 # api/models/checkpoint.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -32,7 +32,22 @@ class HITLCheckpoint(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     reviewed_at = Column(DateTime(timezone=True))
     checkpoint_metadata = Column(JSON, default={})
+    owner_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id'))  # denormalized clients.owner_id
     
     # Relationships
     execution = relationship("CrewExecution", backref="checkpoints")
-    reviewer = relationship("User", backref="reviewed_checkpoints")
\ No newline at end of file
+    reviewer = relationship("User", backref="reviewed_checkpoints", foreign_keys=[reviewed_by])
+    
+    __table_args__ = (
+        # Ownership checks (index-only) and the pending-review dashboard
+        Index('ix_hitl_checkpoints_checkpoint_owner', 'checkpoint_id', 'owner_id'),
+        Index('ix_hitl_checkpoints_owner_status_created', 'owner_id', 'status', 'created_at', 'checkpoint_id'),
+        # Webhook dedupe: (execution, task, status)
+        Index('ix_hitl_checkpoints_execution_task_status', 'execution_id', 'task_id', 'status'),
+        # At most one pending checkpoint per task (concurrent webhook workers)
+        Index('ix_hitl_checkpoints_pending_task', 'execution_id', 'task_id', unique=True,
+              postgresql_where=text("status = 'PENDING'")),
+        # "Is anything awaiting review" (status route, reconciler): pending rows only
+        Index('ix_hitl_checkpoints_pending_execution', 'execution_id', 'created_at',
+              postgresql_where=text("status = 'PENDING'")),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 # api/models/client.py
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -23,4 +23,9 @@ class Client(Base):
     client_metadata = Column(JSON, default={})
     
     # Relationships
-    owner = relationship("User", backref="clients")
\ No newline at end of file
+    owner = relationship("User", backref="clients")
+    
+    __table_args__ = (
+        # Keyset pagination of a user's clients (newest first)
+        Index('ix_clients_owner_created_id', 'owner_id', 'created_at', 'client_id'),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 # api/models/document.py
-from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, JSON, Enum, UniqueConstraint, Text
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, JSON, Enum, UniqueConstraint, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -18,6 +18,8 @@ class Document(Base):
     __tablename__ = "documents"
     __table_args__ = (
         UniqueConstraint('client_id', 'document_type', 'file_name', 'version', name='_client_doc_version_uc'),
+        # Client document listing (newest first)
+        Index('ix_documents_client_uploaded', 'client_id', 'uploaded_at'),
     )
 
     document_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -1,5 +1,5 @@
 # api/models/execution.py
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Enum, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -29,7 +29,22 @@ class CrewExecution(Base):
     retry_count = Column(Integer, default=0)
     created_by = Column(UUID(as_uuid=True), ForeignKey('users.user_id'), nullable=False)
     metrics = Column(JSON, default={})  # token usage, costs, duration
+    kickoff_inputs = Column(JSON)  # crew inputs, kept until the scheduler kicks off
+    kickoff_claimed_at = Column(DateTime(timezone=True))  # scheduler lease
+    owner_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id'))  # denormalized clients.owner_id
     
     # Relationships
     project = relationship("Project", backref="executions")
-    creator = relationship("User", backref="started_executions")
\ No newline at end of file
+    creator = relationship("User", backref="started_executions", foreign_keys=[created_by])
+    
+    __table_args__ = (
+        # Ownership checks (index-only) and per-user listings
+        Index('ix_crew_executions_execution_owner', 'execution_id', 'owner_id'),
+        Index('ix_crew_executions_owner_status_started', 'owner_id', 'status', 'started_at'),
+        # Scheduler rescan: queued executions not yet kicked off
+        Index('ix_crew_executions_unclaimed', 'started_at',
+              postgresql_where=text("status = 'PENDING' AND crewai_execution_id IS NULL")),
+        # Status reconciler: executions CrewAI is still working on
+        Index('ix_crew_executions_in_flight', 'started_at',
+              postgresql_where=text("status IN ('RUNNING', 'AWAITING_APPROVAL')")),
+    )
\ No newline at end of file
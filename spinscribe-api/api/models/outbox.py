@@ -0,0 +1,34 @@
+# api/models/outbox.py
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+import enum
+from api.database import Base
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    DISPATCHED = "dispatched"
+    FAILED = "failed"
+
+class CrewAIOutbox(Base):
+    """CrewAI calls recorded in the same transaction as the decision that needs them."""
+    __tablename__ = "crewai_outbox"
+
+    outbox_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    dedup_key = Column(String(255), nullable=False, unique=True)  # also sent as Idempotency-Key
+    operation = Column(String(50), nullable=False)  # resume
+    payload = Column(JSON, nullable=False)
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text)
+    execution_id = Column(UUID(as_uuid=True), ForeignKey('crew_executions.execution_id', ondelete='CASCADE'), nullable=False, index=True)
+    checkpoint_id = Column(UUID(as_uuid=True), ForeignKey('hitl_checkpoints.checkpoint_id', ondelete='CASCADE'), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    dispatched_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Dispatcher poll: due pending rows
+        Index("ix_crewai_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -1,5 +1,5 @@
 # api/models/project.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -33,4 +33,9 @@ class Project(Base):
     
     # Relationships
     client = relationship("Client", backref="projects")
-    creator = relationship("User", backref="created_projects")
\ No newline at end of file
+    creator = relationship("User", backref="created_projects")
+    
+    __table_args__ = (
+        # Keyset pagination of a client's projects (newest first)
+        Index('ix_projects_client_created_id', 'client_id', 'created_at', 'project_id'),
+    )
\ No newline at end of file
@@ -10,10 +10,10 @@ Handles user authentication via AWS Cognito:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import logging
-from uuid import UUID
 
 from api.dependencies import get_db, get_current_user, get_cognito_service
 from api.schemas.auth import (
@@ -24,6 +24,7 @@ from api.schemas.auth import (
     UserResponse
 )
 from api.models.user import User
+from api.services.principal_cache import PrincipalCache, UserPrincipal, get_principal_cache
 from api.services.cognito import CognitoService
 
 logger = logging.getLogger(__name__)
@@ -38,7 +39,7 @@ router = APIRouter()
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
     signup_data: SignupRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     cognito: CognitoService = Depends(get_cognito_service)
 ):
     """
@@ -62,7 +63,8 @@ async def signup(
         500: Registration failed
     """
     # Check if user already exists in our database
-    existing_user = db.query(User).filter(User.email == signup_data.email).first()
+    result = await db.execute(select(User).where(User.email == signup_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,7 +74,7 @@ async def signup(
     try:
         # Create user in Cognito
         logger.info(f"Creating Cognito user for: {signup_data.email}")
-        cognito_response = cognito.signup(
+        cognito_response = await cognito.signup(
             email=signup_data.email,
             password=signup_data.password,
             name=signup_data.name
@@ -91,8 +93,8 @@ async def signup(
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
         logger.info(f"✅ User created successfully: {new_user.email}")
         
@@ -106,7 +108,7 @@ async def signup(
             detail=str(e)
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Signup error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -117,7 +119,7 @@ async def signup(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     cognito: CognitoService = Depends(get_cognito_service)
 ):
     """
@@ -138,17 +140,18 @@ async def login(
     try:
         # Authenticate with Cognito
         logger.info(f"Login attempt for: {login_data.email}")
-        auth_result = cognito.login(
+        auth_result = await cognito.login(
             email=login_data.email,
             password=login_data.password
         )
         
         # Get user from token
-        user_info = cognito.get_user_from_token(auth_result['access_token'])
+        user_info = await cognito.get_user_from_token(auth_result['access_token'])
         cognito_sub = user_info['sub']
         
         # Get or update user in database
-        user = db.query(User).filter(User.cognito_sub == cognito_sub).first()
+        result = await db.execute(select(User).where(User.cognito_sub == cognito_sub))
+        user = result.scalars().first()
         
         if not user:
             # User authenticated in Cognito but not in our database
@@ -160,7 +163,7 @@ async def login(
         
         # Update last login
         user.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         logger.info(f"✅ Login successful: {user.email}")
         
@@ -209,7 +212,7 @@ async def refresh_token(
     """
     try:
         logger.info("Refreshing access token")
-        auth_result = cognito.refresh_token(refresh_data.refresh_token)
+        auth_result = await cognito.refresh_token(refresh_data.refresh_token)
         
         return TokenResponse(
             access_token=auth_result['access_token'],
@@ -234,7 +237,7 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get current authenticated user's profile.
@@ -251,8 +254,9 @@ async def get_current_user_profile(
 async def update_current_user_profile(
     name: str = None,
     company_name: str = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    principal_cache: PrincipalCache = Depends(get_principal_cache)
 ):
     """
     Update current user's profile.
@@ -264,20 +268,29 @@ async def update_current_user_profile(
     Returns:
         Updated user profile
     """
+    # current_user is a read-only snapshot; update the row itself
+    user = await db.get(User, current_user.user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     if name is not None:
-        current_user.name = name
+        user.name = name
     
     if company_name is not None:
-        current_user.company_name = company_name
+        user.company_name = company_name
     
-    current_user.updated_at = datetime.utcnow()
+    user.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    await principal_cache.invalidate(user.cognito_sub)
     
-    logger.info(f"Profile updated: {current_user.email}")
+    logger.info(f"Profile updated: {user.email}")
     
-    return current_user
+    return user
 
 
 # =============================================================================
@@ -304,7 +317,7 @@ async def verify_email(
         Success message
     """
     try:
-        cognito.confirm_sign_up(email, code)
+        await cognito.confirm_signup(email, code)
         return {"message": "Email verified successfully"}
     except ValueError as e:
         raise HTTPException(
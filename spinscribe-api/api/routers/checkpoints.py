@@ -15,19 +15,21 @@ References:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
 from uuid import UUID
 from datetime import datetime
 import logging
 
-from api.dependencies import get_db, get_current_user, get_crewai_service
-from api.models.user import User
-from api.models.project import Project
-from api.models.client import Client
+from api.dependencies import get_db, get_current_user, parse_cursor
+from api.utils.pagination import Cursor, paginate, count_total
+from api.services.principal_cache import UserPrincipal
 from api.services.sse import get_sse_manager, SSEConnectionManager
 from api.models.checkpoint import HITLCheckpoint, CheckpointStatus, CheckpointType
-from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.execution import CrewExecution
 from api.models.activity import AgentActivity, ActivityType
 from api.schemas.webhook import (
     CheckpointResponse,
@@ -35,7 +37,7 @@ from api.schemas.webhook import (
     HITLApprovalRequest,
     HITLApprovalResponse
 )
-from api.services.crewai import CrewAIService
+from api.services.outbox import get_outbox_dispatcher, OutboxDispatcher
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -50,14 +52,16 @@ async def list_pending_checkpoints(
     checkpoint_type: Optional[CheckpointType] = Query(None, description="Filter by checkpoint type"),
     project_id: Optional[UUID] = Query(None, description="Filter by project"),
     limit: int = Query(20, ge=1, le=100, description="Maximum results"),
-    offset: int = Query(0, ge=0, description="Pagination offset"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    offset: int = Query(0, ge=0, description="Pagination offset (ignored with a cursor)"),
+    cursor: Optional[Cursor] = Depends(parse_cursor),
+    include_total: bool = Query(True, description="Compute the exact total (extra COUNT query)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all pending checkpoints for the current user.
     
-    Returns checkpoints from executions owned by the user (via project → client → user).
+    Returns checkpoints from executions owned by the user (denormalized owner_id).
     Useful for displaying a "tasks awaiting approval" dashboard.
     
     Args:
@@ -65,41 +69,46 @@ async def list_pending_checkpoints(
         project_id: Optional filter by specific project
         limit: Maximum number of results (1-100)
         offset: Pagination offset
+        cursor: next_cursor / prev_cursor from a previous page (keyset)
+        include_total: Whether to compute the exact total
         db: Database session
         current_user: Authenticated user
     
     Returns:
         List of pending checkpoints with pagination info
+    
+    Raises:
+        400: Invalid cursor
     """
     logger.info(f"📋 Listing pending checkpoints for user: {current_user.user_id}")
     
     # Build query - only show checkpoints from user's executions
-    query = db.query(HITLCheckpoint).join(
-    CrewExecution, HITLCheckpoint.execution_id == CrewExecution.execution_id
-        ).join(
-            Project, CrewExecution.project_id == Project.project_id
-        ).join(
-            Client, Project.client_id == Client.client_id
-        ).filter(
-            HITLCheckpoint.status == CheckpointStatus.PENDING,
-            Client.owner_id == current_user.user_id
-        )
+    query = select(HITLCheckpoint).where(
+        HITLCheckpoint.status == CheckpointStatus.PENDING,
+        HITLCheckpoint.owner_id == current_user.user_id
+    )
     
     # Apply optional filters
     if checkpoint_type:
-        query = query.filter(HITLCheckpoint.checkpoint_type == checkpoint_type)
+        query = query.where(HITLCheckpoint.checkpoint_type == checkpoint_type)
     
     if project_id:
-        query = query.filter(CrewExecution.project_id == project_id)
-    
-    # Order by creation time (newest first)
-    query = query.order_by(HITLCheckpoint.created_at.desc())
+        query = query.join(
+            CrewExecution, HITLCheckpoint.execution_id == CrewExecution.execution_id
+        ).where(CrewExecution.project_id == project_id)
     
-    # Get total count
-    total = query.count()
+    # Get total count (optional)
+    total = await count_total(db, query) if include_total else None
     
-    # Apply pagination
-    checkpoints = query.offset(offset).limit(limit).all()
+    # Order by creation time (newest first) and apply pagination
+    page = await paginate(
+        db, query, HITLCheckpoint.created_at, HITLCheckpoint.checkpoint_id,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        descending=True
+    )
+    checkpoints = page.items
     
     logger.info(f"✅ Found {len(checkpoints)} pending checkpoints (total: {total})")
     
@@ -107,7 +116,9 @@ async def list_pending_checkpoints(
         checkpoints=[CheckpointResponse.from_orm(cp) for cp in checkpoints],
         total=total,
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
     )
 
 
@@ -118,8 +129,8 @@ async def list_pending_checkpoints(
 @router.get("/{checkpoint_id}", response_model=CheckpointResponse)
 async def get_checkpoint(
     checkpoint_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get detailed information about a specific checkpoint.
@@ -140,16 +151,13 @@ async def get_checkpoint(
     logger.info(f"📄 Getting checkpoint: {checkpoint_id}")
     
     # Get checkpoint with ownership verification
-    checkpoint = db.query(HITLCheckpoint).join(
-        CrewExecution, HITLCheckpoint.execution_id == CrewExecution.execution_id
-    ).join(
-        Project, CrewExecution.project_id == Project.project_id
-    ).join(
-        Client, Project.client_id == Client.client_id
-    ).filter(
-        HITLCheckpoint.checkpoint_id == checkpoint_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(HITLCheckpoint).where(
+            HITLCheckpoint.checkpoint_id == checkpoint_id,
+            HITLCheckpoint.owner_id == current_user.user_id
+        )
+    )
+    checkpoint = result.scalars().first()
     
     if not checkpoint:
         logger.warning(f"❌ Checkpoint {checkpoint_id} not found for user {current_user.user_id}")
@@ -171,9 +179,9 @@ async def get_checkpoint(
 async def approve_checkpoint(
     checkpoint_id: UUID,
     approval: HITLApprovalRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    crewai_service: CrewAIService = Depends(get_crewai_service),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    outbox_dispatcher: OutboxDispatcher = Depends(get_outbox_dispatcher),
     sse_manager: SSEConnectionManager = Depends(get_sse_manager)
 ):
     """
@@ -183,8 +191,9 @@ async def approve_checkpoint(
     1. Updates the checkpoint status to APPROVED
     2. Stores the human feedback
     3. Creates a chat message with the approval
-    4. Calls CrewAI /resume endpoint to continue execution
-    5. Updates execution status to RUNNING
+    4. Records the CrewAI /resume call in the outbox (same transaction)
+    5. Returns once committed; the outbox dispatcher calls CrewAI and
+       sets the execution to RUNNING ("status" SSE event)
     
     CRITICAL: Must re-provide webhook URLs to CrewAI resume call.
     
@@ -200,15 +209,15 @@ async def approve_checkpoint(
         approval: Approval request with feedback
         db: Database session
         current_user: Authenticated user
-        crewai_service: CrewAI service instance
+        outbox_dispatcher: Outbox dispatcher (delivers the resume call)
     
     Returns:
-        Approval confirmation with resume status
+        Approval confirmation (crew_resumed is False until dispatched)
     
     Raises:
         404: Checkpoint not found
         400: Checkpoint not in pending state
-        500: Failed to resume CrewAI execution
+        409: Checkpoint decided concurrently
     """
     logger.info(f"✅ Approving checkpoint: {checkpoint_id}")
     logger.info(f"   User: {current_user.email}")
@@ -216,16 +225,13 @@ async def approve_checkpoint(
     
     try:
         # Get checkpoint with ownership verification
-        checkpoint = db.query(HITLCheckpoint).join(
-            CrewExecution, HITLCheckpoint.execution_id == CrewExecution.execution_id
-        ).join(
-            Project, CrewExecution.project_id == Project.project_id
-        ).join(
-            Client, Project.client_id == Client.client_id
-        ).filter(
-            HITLCheckpoint.checkpoint_id == checkpoint_id,
-            Client.owner_id == current_user.user_id
-        ).first()
+        result = await db.execute(
+            select(HITLCheckpoint).where(
+                HITLCheckpoint.checkpoint_id == checkpoint_id,
+                HITLCheckpoint.owner_id == current_user.user_id
+            ).options(selectinload(HITLCheckpoint.execution))
+        )
+        checkpoint = result.scalars().first()
         
         if not checkpoint:
             logger.warning(f"❌ Checkpoint {checkpoint_id} not found")
@@ -273,70 +279,55 @@ async def approve_checkpoint(
         )
         db.add(activity)
         
-        # Commit checkpoint and activity updates before calling CrewAI
-        db.commit()
-        db.refresh(checkpoint)
-        
-        logger.info(f"💾 Checkpoint updated in database")
-        logger.info(f"🔄 Calling CrewAI resume endpoint...")
+        # Stage the CrewAI resume call in the same transaction (outbox),
+        # so the decision and the resume can't get out of step
+        await outbox_dispatcher.add_resume(
+            db, checkpoint, execution,
+            feedback=approval.feedback,
+            is_approve=True,
+            reviewer_name=current_user.name
+        )
         
-        # Call CrewAI to resume execution
-        # CRITICAL: Re-provide webhook URLs!
         try:
-            resume_result = await crewai_service.resume_crew(
-                crewai_execution_id=execution.crewai_execution_id,
-                task_id=checkpoint.task_id,
-                human_feedback=approval.feedback,
-                is_approve=True  # This is an approval
-            )
-            
-            logger.info(f"✅ CrewAI resume successful!")
-            
-            # Update execution status
-            execution.status = ExecutionStatus.RUNNING
-            db.commit()
-            
-            # Broadcast approval to SSE clients
-            await sse_manager.broadcast(
-                execution_id=execution.execution_id,
-                event_type="approval",
-                data={
-                    "checkpoint_id": str(checkpoint.checkpoint_id),
-                    "approved": True,
-                    "feedback": approval.feedback,
-                    "reviewer": current_user.name,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            )
-            
-            return HITLApprovalResponse(
-                status="success",
-                checkpoint_id=checkpoint.checkpoint_id,
-                execution_id=execution.execution_id,
-                message="Checkpoint approved. Crew execution resumed.",
-                crew_resumed=True,
-                will_retry=False
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to resume CrewAI execution: {str(e)}")
-            
-            # Rollback checkpoint status since resume failed
-            checkpoint.status = CheckpointStatus.PENDING
-            checkpoint.reviewed_by = None
-            checkpoint.reviewed_at = None
-            db.commit()
-            
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to resume crew execution: {str(e)}"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Checkpoint was already reviewed"
             )
+        
+        outbox_dispatcher.notify()
+        
+        logger.info(f"💾 Checkpoint approved, CrewAI resume queued")
+        
+        # Broadcast decision to SSE clients
+        await sse_manager.broadcast(
+            execution_id=execution.execution_id,
+            event_type="approval",
+            data={
+                "checkpoint_id": str(checkpoint.checkpoint_id),
+                "approved": True,
+                "feedback": approval.feedback,
+                "reviewer": current_user.name,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        
+        return HITLApprovalResponse(
+            status="success",
+            checkpoint_id=checkpoint.checkpoint_id,
+            execution_id=execution.execution_id,
+            message="Checkpoint approved. Crew execution will resume shortly.",
+            crew_resumed=False,
+            will_retry=False
+        )
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ Error approving checkpoint: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to approve checkpoint: {str(e)}"
@@ -351,9 +342,9 @@ async def approve_checkpoint(
 async def reject_checkpoint(
     checkpoint_id: UUID,
     rejection: HITLApprovalRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    crewai_service: CrewAIService = Depends(get_crewai_service),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    outbox_dispatcher: OutboxDispatcher = Depends(get_outbox_dispatcher),
     sse_manager: SSEConnectionManager = Depends(get_sse_manager)
 ):
     """
@@ -374,15 +365,15 @@ async def reject_checkpoint(
         rejection: Rejection request with feedback explaining what needs improvement
         db: Database session
         current_user: Authenticated user
-        crewai_service: CrewAI service instance
+        outbox_dispatcher: Outbox dispatcher (delivers the resume call)
     
     Returns:
-        Rejection confirmation with retry status
+        Rejection confirmation (crew_resumed is False until dispatched)
     
     Raises:
         404: Checkpoint not found
         400: Checkpoint not in pending state
-        500: Failed to resume CrewAI execution
+        409: Checkpoint decided concurrently
     """
     logger.info(f"❌ Rejecting checkpoint: {checkpoint_id}")
     logger.info(f"   User: {current_user.email}")
@@ -391,16 +382,13 @@ async def reject_checkpoint(
     # Most logic is the same as approve, just with different status and is_approve=False
     try:
         # Get checkpoint with ownership verification
-        checkpoint = db.query(HITLCheckpoint).join(
-            CrewExecution, HITLCheckpoint.execution_id == CrewExecution.execution_id
-        ).join(
-            Project, CrewExecution.project_id == Project.project_id
-        ).join(
-            Client, Project.client_id == Client.client_id
-        ).filter(
-            HITLCheckpoint.checkpoint_id == checkpoint_id,
-            Client.owner_id == current_user.user_id
-        ).first()
+        result = await db.execute(
+            select(HITLCheckpoint).where(
+                HITLCheckpoint.checkpoint_id == checkpoint_id,
+                HITLCheckpoint.owner_id == current_user.user_id
+            ).options(selectinload(HITLCheckpoint.execution))
+        )
+        checkpoint = result.scalars().first()
         
         if not checkpoint:
             logger.warning(f"❌ Checkpoint {checkpoint_id} not found")
@@ -448,72 +436,58 @@ async def reject_checkpoint(
         )
         db.add(activity)
         
-        # Commit updates
-        db.commit()
-        db.refresh(checkpoint)
-        
-        logger.info(f"💾 Checkpoint rejected in database")
-        logger.info(f"🔄 Calling CrewAI resume endpoint with negative feedback...")
+        # Stage the CrewAI resume call in the same transaction (outbox),
+        # so the decision and the resume can't get out of step
+        await outbox_dispatcher.add_resume(
+            db, checkpoint, execution,
+            feedback=rejection.feedback,
+            is_approve=False,
+            reviewer_name=current_user.name
+        )
         
-        # Call CrewAI to resume with rejection
         try:
-            resume_result = await crewai_service.resume_crew(
-                crewai_execution_id=execution.crewai_execution_id,
-                task_id=checkpoint.task_id,
-                human_feedback=rejection.feedback,
-                is_approve=False  # This is a rejection
-            )
-            
-            logger.info(f"✅ CrewAI resume successful! Agent will retry task.")
-            
-            # Keep execution in AWAITING_APPROVAL state
-            # (will change when agent submits revised work)
-            execution.status = ExecutionStatus.RUNNING
-            db.commit()
-            
-            # Broadcast rejection to SSE clients
-            await sse_manager.broadcast(
-                execution_id=execution.execution_id,
-                event_type="approval",
-                data={
-                    "checkpoint_id": str(checkpoint.checkpoint_id),
-                    "approved": False,
-                    "will_retry": True,
-                    "feedback": rejection.feedback,
-                    "reviewer": current_user.name,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            )
-            
-            return HITLApprovalResponse(
-                status="success",
-                checkpoint_id=checkpoint.checkpoint_id,
-                execution_id=execution.execution_id,
-                message="Checkpoint rejected. Agent will revise based on feedback.",
-                crew_resumed=True,
-                will_retry=True
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to resume CrewAI execution: {str(e)}")
-            
-            # Rollback checkpoint status
-            checkpoint.status = CheckpointStatus.PENDING
-            checkpoint.reviewed_by = None
-            checkpoint.reviewed_at = None
-            db.commit()
-            
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to resume crew execution: {str(e)}"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Checkpoint was already reviewed"
             )
+        
+        outbox_dispatcher.notify()
+        
+        logger.info(f"💾 Checkpoint rejected, CrewAI resume queued")
+        
+        # Broadcast decision to SSE clients
+        await sse_manager.broadcast(
+            execution_id=execution.execution_id,
+            event_type="approval",
+            data={
+                "checkpoint_id": str(checkpoint.checkpoint_id),
+                "approved": False,
+                "will_retry": True,
+                "feedback": rejection.feedback,
+                "reviewer": current_user.name,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        
+        return HITLApprovalResponse(
+            status="success",
+            checkpoint_id=checkpoint.checkpoint_id,
+            execution_id=execution.execution_id,
+            message="Checkpoint rejected. Agent will revise based on feedback.",
+            crew_resumed=False,
+            will_retry=True
+        )
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ Error rejecting checkpoint: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to reject checkpoint: {str(e)}"
-        )
\ No newline at end of file
+        )
+
@@ -7,13 +7,14 @@ Each user can only access their own clients.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import logging
 
 from api.dependencies import get_db, get_current_user, PaginationParams
-from api.models.user import User
+from api.utils.pagination import paginate, count_total
+from api.services.principal_cache import UserPrincipal
 from api.models.client import Client
 from api.schemas.client import (
     ClientCreate,
@@ -33,8 +34,8 @@ router = APIRouter()
 @router.post("", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
 async def create_client(
     client_data: ClientCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new client.
@@ -60,8 +61,8 @@ async def create_client(
     )
     
     db.add(new_client)
-    db.commit()
-    db.refresh(new_client)
+    await db.commit()
+    await db.refresh(new_client)
     
     logger.info(f"✅ Client created: {new_client.client_id}")
     return new_client
@@ -74,41 +75,51 @@ async def create_client(
 @router.get("", response_model=ClientListResponse)
 async def list_clients(
     pagination: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all clients owned by the current user.
     
     Supports pagination via query parameters:
-    - page: Page number (default: 1)
+    - cursor: next_cursor / prev_cursor from a previous page (keyset)
+    - page: Page number (default: 1), used when no cursor is given
     - page_size: Items per page (default: 20, max: 100)
+    - include_total: Compute the exact total (default: true)
     
     Returns:
         List of clients with pagination metadata
+    
+    Raises:
+        400: Invalid cursor
     """
     logger.info(f"Fetching clients for user {current_user.user_id}")
     
     # Query clients owned by current user
-    query = db.query(Client).filter(
+    query = select(Client).where(
         Client.owner_id == current_user.user_id,
         Client.is_active == True
     )
     
-    # Get total count
-    total = query.count()
+    # Get total count (optional)
+    total = await count_total(db, query) if pagination.include_total else None
     
-    # Apply pagination
-    clients = query.order_by(Client.created_at.desc())\
-                   .offset(pagination.skip)\
-                   .limit(pagination.limit)\
-                   .all()
+    # Apply pagination (newest first)
+    page = await paginate(
+        db, query, Client.created_at, Client.client_id,
+        limit=pagination.limit,
+        cursor=pagination.cursor,
+        offset=pagination.skip,
+        descending=True
+    )
     
-    logger.info(f"Found {total} clients, returning page {pagination.page}")
+    logger.info(f"Found {total} clients, returning {len(page.items)}")
     
     return ClientListResponse(
-        clients=clients,
-        total=total
+        clients=page.items,
+        total=total,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
     )
 
 
@@ -119,8 +130,8 @@ async def list_clients(
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get a specific client by ID.
@@ -138,10 +149,13 @@ async def get_client(
     """
     logger.info(f"Fetching client {client_id} for user {current_user.user_id}")
     
-    client = db.query(Client).filter(
-        Client.client_id == client_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Client).where(
+            Client.client_id == client_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    client = result.scalars().first()
     
     if not client:
         logger.warning(f"Client {client_id} not found for user {current_user.user_id}")
@@ -161,8 +175,8 @@ async def get_client(
 async def update_client(
     client_id: UUID,
     client_data: ClientUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Update a client's information.
@@ -183,10 +197,13 @@ async def update_client(
     logger.info(f"Updating client {client_id} for user {current_user.user_id}")
     
     # Get client
-    client = db.query(Client).filter(
-        Client.client_id == client_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Client).where(
+            Client.client_id == client_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    client = result.scalars().first()
     
     if not client:
         logger.warning(f"Client {client_id} not found for user {current_user.user_id}")
@@ -200,8 +217,8 @@ async def update_client(
     for field, value in update_data.items():
         setattr(client, field, value)
     
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
     
     logger.info(f"✅ Client {client_id} updated")
     return client
@@ -214,8 +231,8 @@ async def update_client(
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_client(
     client_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete a client (soft delete).
@@ -235,10 +252,13 @@ async def delete_client(
     logger.info(f"Deleting client {client_id} for user {current_user.user_id}")
     
     # Get client
-    client = db.query(Client).filter(
-        Client.client_id == client_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Client).where(
+            Client.client_id == client_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    client = result.scalars().first()
     
     if not client:
         logger.warning(f"Client {client_id} not found for user {current_user.user_id}")
@@ -249,7 +269,7 @@ async def delete_client(
     
     # Soft delete
     client.is_active = False
-    db.commit()
+    await db.commit()
     
     logger.info(f"✅ Client {client_id} deleted (soft delete)")
     return None
@@ -1,21 +1,25 @@
 # api/routers/documents.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 
-from api.database import get_db
+from api.config import settings
+from api.dependencies import get_db, get_s3_service
 from api.models.document import Document, DocumentType
-from api.models.user import User
+from api.services.principal_cache import UserPrincipal
 from api.models.client import Client
 from api.schemas.document import (
     DocumentUploadRequest,
     DocumentUploadResponse,
+    DocumentMultipartUploadResponse,
+    DocumentMultipartCompleteRequest,
     DocumentResponse,
     DocumentDownloadResponse,
     DocumentListResponse
 )
-from api.services.s3 import s3_service
+from api.services.s3 import S3Service
 from api.routers.auth import get_current_user
 
 router = APIRouter()
@@ -24,8 +28,9 @@ router = APIRouter()
 async def generate_upload_url(
     client_id: UUID,
     request: DocumentUploadRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
 ):
     """
     Generate a presigned URL for uploading a document to S3.
@@ -39,7 +44,8 @@ async def generate_upload_url(
     - PREVIOUS_WORK -> previous-work/
     """
     # Verify client exists
-    client = db.query(Client).filter(Client.client_id == client_id).first()
+    result = await db.execute(select(Client).where(Client.client_id == client_id))
+    client = result.scalars().first()
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,7 +54,7 @@ async def generate_upload_url(
     
     try:
         # Generate presigned URL - S3 service handles folder structure
-        presigned_url, s3_key = s3_service.generate_upload_presigned_url(
+        presigned_url, s3_key = await s3_service.generate_upload_presigned_url(
             client_id=str(client_id),
             document_type=request.document_type,
             file_name=request.file_name,
@@ -70,8 +76,8 @@ async def generate_upload_url(
         )
         
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        await db.commit()
+        await db.refresh(document)
         
         return DocumentUploadResponse(
             document_id=document.document_id,
@@ -81,22 +87,176 @@ async def generate_upload_url(
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate upload URL: {str(e)}"
         )
 
+@router.post("/client/{client_id}/multipart-upload", response_model=DocumentMultipartUploadResponse)
+async def start_multipart_upload(
+    client_id: UUID,
+    request: DocumentUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """
+    Start a multipart upload for a large document.
+    
+    The file is split into DOCUMENT_MULTIPART_PART_SIZE parts; part N is
+    PUT to part_urls[N - 1] (in any order, in parallel). Finish with
+    POST /{document_id}/multipart-upload/complete, passing each part's
+    ETag response header, or abort with DELETE /{document_id}/multipart-upload.
+    """
+    # Verify client exists
+    result = await db.execute(select(Client).where(Client.client_id == client_id))
+    client = result.scalars().first()
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    part_size = settings.DOCUMENT_MULTIPART_PART_SIZE
+    part_count = -(-request.file_size // part_size)
+    if part_count > 10000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File too large for a multipart upload (max 10000 parts)"
+        )
+    
+    try:
+        upload_id, s3_key = await s3_service.create_multipart_upload(
+            client_id=str(client_id),
+            document_type=request.document_type,
+            file_name=request.file_name,
+            mime_type=request.mime_type
+        )
+        part_urls = await s3_service.generate_upload_part_presigned_urls(
+            s3_key=s3_key,
+            upload_id=upload_id,
+            part_count=part_count,
+            expires_in=3600
+        )
+        
+        # Create document record in database
+        document = Document(
+            client_id=client_id,
+            document_type=request.document_type,
+            file_name=request.file_name,
+            s3_bucket=s3_service.documents_bucket,
+            s3_key=s3_key,
+            file_size=request.file_size,
+            mime_type=request.mime_type,
+            uploaded_by=current_user.user_id,
+            version=1
+        )
+        
+        db.add(document)
+        await db.commit()
+        await db.refresh(document)
+        
+        return DocumentMultipartUploadResponse(
+            document_id=document.document_id,
+            s3_key=s3_key,
+            upload_id=upload_id,
+            part_size=part_size,
+            part_urls=part_urls,
+            expires_in=3600
+        )
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start multipart upload: {str(e)}"
+        )
+
+@router.post("/{document_id}/multipart-upload/complete", response_model=DocumentResponse)
+async def complete_multipart_upload(
+    document_id: UUID,
+    request: DocumentMultipartCompleteRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """Assemble the uploaded parts into the document"""
+    result = await db.execute(select(Document).where(Document.document_id == document_id))
+    document = result.scalars().first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    parts = sorted(request.parts, key=lambda part: part.part_number)
+    try:
+        await s3_service.complete_multipart_upload(
+            s3_key=document.s3_key,
+            upload_id=request.upload_id,
+            parts=[{"PartNumber": part.part_number, "ETag": part.etag} for part in parts]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return DocumentResponse.from_orm(document)
+
+@router.delete("/{document_id}/multipart-upload")
+async def abort_multipart_upload(
+    document_id: UUID,
+    upload_id: str = Query(..., min_length=1),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    """Abort a multipart upload and remove its document record"""
+    result = await db.execute(select(Document).where(Document.document_id == document_id))
+    document = result.scalars().first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    try:
+        await s3_service.abort_multipart_upload(
+            s3_key=document.s3_key,
+            upload_id=upload_id
+        )
+        
+        await db.delete(document)
+        await db.commit()
+        
+        return {
+            "message": "Multipart upload aborted",
+            "document_id": document_id
+        }
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to abort multipart upload: {str(e)}"
+        )
+
 @router.get("/{document_id}/download-url", response_model=DocumentDownloadResponse)
 async def generate_download_url(
     document_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
 ):
     """
     Generate a presigned URL for downloading a document from S3
     """
-    document = db.query(Document).filter(Document.document_id == document_id).first()
+    result = await db.execute(select(Document).where(Document.document_id == document_id))
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(
@@ -105,7 +265,8 @@ async def generate_download_url(
         )
     
     try:
-        download_url = s3_service.generate_download_presigned_url(
+        # Cached URLs are reused while most of their lifetime is left
+        download = await s3_service.presign_download(
             s3_key=document.s3_key,
             bucket=document.s3_bucket,
             expires_in=3600
@@ -114,8 +275,8 @@ async def generate_download_url(
         return DocumentDownloadResponse(
             document_id=document.document_id,
             file_name=document.file_name,
-            presigned_url=download_url,
-            expires_in=3600
+            presigned_url=download.url,
+            expires_in=download.expires_in
         )
         
     except Exception as e:
@@ -128,8 +289,10 @@ async def generate_download_url(
 async def list_client_documents(
     client_id: UUID,
     document_type: Optional[DocumentType] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    include_download_urls: bool = Query(False, description="Add a presigned download URL to each document"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
 ):
     """
     List all documents for a client, optionally filtered by document type.
@@ -140,27 +303,50 @@ async def list_client_documents(
     - sample-content/
     - marketing-materials/
     - previous-work/
+    
+    With include_download_urls=true every document carries a download URL,
+    presigned in one batch (cached URLs are reused), so the dashboard
+    doesn't need a download-url request per document.
     """
-    query = db.query(Document).filter(Document.client_id == client_id)
+    query = select(Document).where(Document.client_id == client_id)
     
     if document_type:
-        query = query.filter(Document.document_type == document_type)
+        query = query.where(Document.document_type == document_type)
+    
+    result = await db.execute(query.order_by(Document.uploaded_at.desc()))
+    documents = result.scalars().all()
+    responses = [DocumentResponse.from_orm(doc) for doc in documents]
     
-    documents = query.order_by(Document.uploaded_at.desc()).all()
+    if include_download_urls and documents:
+        try:
+            urls = await s3_service.presign_downloads(
+                [(doc.s3_bucket, doc.s3_key) for doc in documents],
+                expires_in=3600
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to generate download URLs: {str(e)}"
+            )
+        for response in responses:
+            download = urls[(response.s3_bucket, response.s3_key)]
+            response.download_url = download.url
+            response.download_url_expires_in = download.expires_in
     
     return DocumentListResponse(
-        documents=[DocumentResponse.from_orm(doc) for doc in documents],
+        documents=responses,
         total=len(documents)
     )
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get document metadata by ID"""
-    document = db.query(Document).filter(Document.document_id == document_id).first()
+    result = await db.execute(select(Document).where(Document.document_id == document_id))
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(
@@ -173,11 +359,13 @@ async def get_document(
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    s3_service: S3Service = Depends(get_s3_service)
 ):
     """Delete a document from both S3 and database"""
-    document = db.query(Document).filter(Document.document_id == document_id).first()
+    result = await db.execute(select(Document).where(Document.document_id == document_id))
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(
@@ -187,14 +375,14 @@ async def delete_document(
     
     try:
         # Delete from S3
-        s3_service.delete_document(
+        await s3_service.delete_document(
             s3_key=document.s3_key,
             bucket=document.s3_bucket
         )
         
         # Delete from database
-        db.delete(document)
-        db.commit()
+        await db.delete(document)
+        await db.commit()
         
         return {
             "message": "Document deleted successfully",
@@ -202,7 +390,7 @@ async def delete_document(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete document: {str(e)}"
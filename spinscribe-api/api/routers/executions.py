@@ -15,17 +15,19 @@ This is the main integration point that connects:
 - Frontend (REST API + SSE stream)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional, List
 from uuid import UUID
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from api.dependencies import get_db, get_current_user, get_crewai_service
-from api.models.user import User
+from api.dependencies import get_db, get_current_user, get_crewai_service, parse_cursor
+from api.utils.pagination import Cursor, paginate, paginate_with_sources, count_total
+from api.services.principal_cache import UserPrincipal
 from api.models.project import Project
 from api.models.client import Client
 from api.models.execution import CrewExecution, ExecutionStatus
@@ -39,10 +41,15 @@ from api.schemas.execution import (
     MessagesResponse,
     MessageResponse,
     CancelExecutionResponse,
-    WorkflowModeEnum
+    WorkflowModeEnum,
+    StreamSubscriptionUpdate,
+    StreamSubscriptionResponse
 )
 from api.services.crewai import CrewAIService
-from api.services.sse import get_sse_manager, SSEConnectionManager
+from api.services.scheduler import get_execution_scheduler, ExecutionScheduler, client_weight
+from api.services.sse import get_sse_manager, SSEConnectionManager, EventStreamResponse
+from api.services.ownership import get_owned_execution, user_owns_execution, owned_execution_ids
+from api.services.activity_archive import archived_activity_sources, ArchiveUnavailableError
 from api.config import settings
 
 logger = logging.getLogger(__name__)
@@ -53,38 +60,39 @@ router = APIRouter()
 # START EXECUTION
 # =============================================================================
 
-@router.post("/start", response_model=StartExecutionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/start", response_model=StartExecutionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def start_execution(
     request: StartExecutionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    crewai_service: CrewAIService = Depends(get_crewai_service)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    scheduler: ExecutionScheduler = Depends(get_execution_scheduler)
 ):
     """
-    Start a new crew execution.
+    Queue a new crew execution.
     
     This endpoint:
     1. Validates the project belongs to the user
-    2. Creates an execution record in the database
-    3. Prepares inputs for CrewAI crew
-    4. Calls CrewAI /kickoff endpoint (with webhook URLs)
-    5. Returns execution details and SSE stream URL
+    2. Prepares inputs for CrewAI crew
+    3. Creates a PENDING execution record holding those inputs
+    4. Hands it to the execution scheduler and returns 202
     
-    The crew will run asynchronously. Use the SSE stream or status
-    endpoint to monitor progress.
+    The scheduler calls CrewAI /kickoff (with webhook URLs) under global
+    and per-client concurrency caps, fairly across clients, and sends a
+    "status" SSE event when the crew starts (RUNNING) or fails to start
+    (FAILED). Queue position and ETA are in the status endpoint.
     
     Args:
         request: Execution start request
         db: Database session
         current_user: Authenticated user
-        crewai_service: CrewAI service instance
+        scheduler: Execution scheduler
     
     Returns:
-        Execution details with stream URL
+        Execution details with queue position and stream URL
     
     Raises:
         404: Project not found or user doesn't have access
-        500: Failed to start execution
+        500: Failed to queue execution
     """
     logger.info(f"🚀 Starting execution for project: {request.project_id}")
     logger.info(f"   User: {current_user.email}")
@@ -92,12 +100,15 @@ async def start_execution(
     
     try:
         # Get project with ownership verification
-        project = db.query(Project).join(
-            Client, Project.client_id == Client.client_id
-        ).filter(
-            Project.project_id == request.project_id,
-            Client.owner_id == current_user.user_id
-        ).first()
+        result = await db.execute(
+            select(Project).join(
+                Client, Project.client_id == Client.client_id
+            ).where(
+                Project.project_id == request.project_id,
+                Client.owner_id == current_user.user_id
+            ).options(selectinload(Project.client))
+        )
+        project = result.scalars().first()
         
         if not project:
             logger.warning(f"❌ Project {request.project_id} not found for user {current_user.user_id}")
@@ -108,20 +119,6 @@ async def start_execution(
         
         logger.info(f"✅ Project found: {project.project_name}")
         
-        # Create execution record
-        execution = CrewExecution(
-            project_id=project.project_id,
-            workflow_mode=request.workflow_mode.value,
-            status=ExecutionStatus.PENDING,
-            created_by=current_user.user_id,
-            started_at=datetime.utcnow()
-        )
-        
-        db.add(execution)
-        db.flush()  # Get execution_id without committing
-        
-        logger.info(f"💾 Execution record created: {execution.execution_id}")
-        
         # Prepare inputs for CrewAI crew
         crew_inputs = {
             "topic": project.topic,
@@ -144,62 +141,50 @@ async def start_execution(
         logger.info(f"📋 Crew inputs prepared")
         logger.debug(f"Inputs: {crew_inputs}")
         
-        # Call CrewAI kickoff
-        try:
-            kickoff_result = await crewai_service.kickoff_crew(
-                inputs=crew_inputs,
-                execution_id=str(execution.execution_id)
-            )
-            
-            # Update execution with CrewAI execution ID
-            execution.crewai_execution_id = kickoff_result.get("kickoff_id")
-            execution.status = ExecutionStatus.RUNNING
-            
-            # Create initial activity
-            activity = AgentActivity(
-                execution_id=execution.execution_id,
-                agent_name="System",
-                activity_type=ActivityType.CREW_KICKOFF,
-                message=f"Crew execution started in {request.workflow_mode.value} mode"
-            )
-            db.add(activity)
-            
-            db.commit()
-            db.refresh(execution)
-            
-            logger.info(f"✅ CrewAI kickoff successful!")
-            logger.info(f"   CrewAI execution ID: {execution.crewai_execution_id}")
-            
-            # Build SSE stream URL
-            stream_url = f"{settings.API_BASE_URL}/api/v1/executions/{execution.execution_id}/stream"
-            
-            return StartExecutionResponse(
-                execution_id=execution.execution_id,
-                project_id=project.project_id,
-                status=ExecutionStatusEnum.RUNNING,
-                crewai_execution_id=execution.crewai_execution_id,
-                message="Execution started successfully. Connect to stream for real-time updates.",
-                stream_url=stream_url
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ CrewAI kickoff failed: {str(e)}")
-            
-            # Update execution status to failed
-            execution.status = ExecutionStatus.FAILED
-            execution.error_message = f"Failed to start crew: {str(e)}"
-            db.commit()
-            
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to start crew execution: {str(e)}"
-            )
+        # Create execution record (inputs are kept until the kickoff)
+        execution = CrewExecution(
+            project_id=project.project_id,
+            workflow_mode=request.workflow_mode.value,
+            status=ExecutionStatus.PENDING,
+            created_by=current_user.user_id,
+            owner_id=project.client.owner_id,
+            started_at=datetime.utcnow(),
+            kickoff_inputs=crew_inputs
+        )
+        
+        db.add(execution)
+        await db.commit()
+        
+        logger.info(f"💾 Execution record created: {execution.execution_id}")
+        
+        # Queue the kickoff (fair across clients, concurrency-capped)
+        scheduler.submit(
+            execution.execution_id,
+            project.client.client_id,
+            client_weight(project.client.client_metadata)
+        )
+        queue_info = scheduler.get_queue_info(execution.execution_id) or {}
+        
+        logger.info(f"⏳ Execution queued for kickoff (position {queue_info.get('queue_position')})")
+        
+        # Build SSE stream URL
+        stream_url = f"{settings.API_BASE_URL}/api/v1/executions/{execution.execution_id}/stream"
+        
+        return StartExecutionResponse(
+            execution_id=execution.execution_id,
+            project_id=project.project_id,
+            status=ExecutionStatusEnum.PENDING,
+            crewai_execution_id=None,
+            message="Execution queued. Connect to stream for real-time updates.",
+            stream_url=stream_url,
+            **queue_info
+        )
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ Error starting execution: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start execution: {str(e)}"
@@ -213,9 +198,10 @@ async def start_execution(
 @router.get("/{execution_id}/status", response_model=ExecutionStatusResponse)
 async def get_execution_status(
     execution_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    sse_manager: SSEConnectionManager = Depends(get_sse_manager)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    sse_manager: SSEConnectionManager = Depends(get_sse_manager),
+    scheduler: ExecutionScheduler = Depends(get_execution_scheduler)
 ):
     """
     Get current status and progress of an execution.
@@ -226,12 +212,14 @@ async def get_execution_status(
     - Pending checkpoints
     - Error messages (if failed)
     - Active SSE connection count
+    - Kickoff queue position and ETA (while PENDING)
     
     Args:
         execution_id: UUID of the execution
         db: Database session
         current_user: Authenticated user
         sse_manager: SSE connection manager
+        scheduler: Execution scheduler
     
     Returns:
         Execution status and progress information
@@ -242,14 +230,7 @@ async def get_execution_status(
     logger.info(f"📊 Getting status for execution: {execution_id}")
     
     # Get execution with ownership verification
-    execution = db.query(CrewExecution).join(
-        Project, CrewExecution.project_id == Project.project_id
-    ).join(
-        Client, Project.client_id == Client.client_id
-    ).filter(
-        CrewExecution.execution_id == execution_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    execution = await get_owned_execution(db, execution_id, current_user.user_id)
     
     if not execution:
         logger.warning(f"❌ Execution {execution_id} not found for user {current_user.user_id}")
@@ -261,10 +242,13 @@ async def get_execution_status(
     # Check for pending checkpoint
     pending_checkpoint = None
     if execution.status == ExecutionStatus.AWAITING_APPROVAL:
-        checkpoint = db.query(HITLCheckpoint).filter(
-            HITLCheckpoint.execution_id == execution.execution_id,
-            HITLCheckpoint.status == CheckpointStatus.PENDING
-        ).first()
+        result = await db.execute(
+            select(HITLCheckpoint).where(
+                HITLCheckpoint.execution_id == execution.execution_id,
+                HITLCheckpoint.status == CheckpointStatus.PENDING
+            )
+        )
+        checkpoint = result.scalars().first()
         
         if checkpoint:
             pending_checkpoint = {
@@ -301,7 +285,8 @@ async def get_execution_status(
         pending_checkpoint=pending_checkpoint,
         error_message=execution.error_message,
         metrics=execution.metrics or {},
-        active_connections=active_connections
+        active_connections=active_connections,
+        **(scheduler.get_queue_info(execution.execution_id) or {})
     )
 
 
@@ -312,21 +297,31 @@ async def get_execution_status(
 @router.get("/{execution_id}/messages", response_model=MessagesResponse)
 async def get_execution_messages(
     execution_id: UUID,
-    limit: int = 100,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Pagination offset (ignored with a cursor)"),
+    cursor: Optional[Cursor] = Depends(parse_cursor),
+    include_total: bool = Query(True, description="Compute the exact total (extra COUNT query)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get chat history (messages) for an execution.
     
     Returns all agent activities as chat messages in chronological order.
-    Supports pagination for long conversations.
+    Supports pagination for long conversations: follow next_cursor for
+    later messages and prev_cursor for earlier ones. Both are keyset
+    cursors, so deep pages cost the same as the first.
+    
+    Months that retention moved to S3 (see api/services/activity_archive.py)
+    are merged in, so old executions page the same way as recent ones; a
+    page only downloads the archive months it overlaps.
     
     Args:
         execution_id: UUID of the execution
         limit: Maximum number of messages to return (1-100)
         offset: Pagination offset
+        cursor: next_cursor / prev_cursor from a previous page
+        include_total: Whether to compute the exact total
         db: Database session
         current_user: Authenticated user
     
@@ -334,38 +329,52 @@ async def get_execution_messages(
         List of messages with pagination info
     
     Raises:
+        400: Invalid cursor
         404: Execution not found or user doesn't have access
+        503: Archived messages could not be read
     """
     logger.info(f"💬 Getting messages for execution: {execution_id}")
     
     # Verify ownership
-    execution = db.query(CrewExecution).join(
-        Project, CrewExecution.project_id == Project.project_id
-    ).join(
-        Client, Project.client_id == Client.client_id
-    ).filter(
-        CrewExecution.execution_id == execution_id,
-        Client.owner_id == current_user.user_id
-    ).first()
-    
-    if not execution:
+    if not await user_owns_execution(db, execution_id, current_user.user_id):
         logger.warning(f"❌ Execution {execution_id} not found")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Execution not found"
         )
     
-    # Get total count
-    total = db.query(AgentActivity).filter(
-        AgentActivity.execution_id == execution_id
-    ).count()
+    query = select(AgentActivity).where(AgentActivity.execution_id == execution_id)
     
-    # Get messages with pagination
-    activities = db.query(AgentActivity).filter(
-        AgentActivity.execution_id == execution_id
-    ).order_by(
-        AgentActivity.timestamp.asc()
-    ).offset(offset).limit(limit).all()
+    # Months moved to S3 by retention (metadata only; files load on demand)
+    archives, archived_total = await archived_activity_sources(db, execution_id)
+    
+    # Get total count (optional)
+    total = await count_total(db, query) + archived_total if include_total else None
+    
+    # Get messages with pagination (oldest first)
+    if archives:
+        # Merge in only the archive months this page reaches
+        try:
+            page = await paginate_with_sources(
+                db, query, AgentActivity.timestamp, AgentActivity.activity_id,
+                archives,
+                limit=limit,
+                cursor=cursor,
+                offset=offset
+            )
+        except ArchiveUnavailableError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Archived messages are temporarily unavailable"
+            )
+    else:
+        page = await paginate(
+            db, query, AgentActivity.timestamp, AgentActivity.activity_id,
+            limit=limit,
+            cursor=cursor,
+            offset=offset
+        )
+    activities = page.items
     
     # Convert to message responses
     messages = []
@@ -393,7 +402,9 @@ async def get_execution_messages(
         execution_id=execution_id,
         messages=messages,
         total=total,
-        has_more=(offset + limit) < total
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
     )
 
 
@@ -404,9 +415,9 @@ async def get_execution_messages(
 @router.get("/{execution_id}/stream")
 async def stream_execution_events(
     execution_id: UUID,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
     sse_manager: SSEConnectionManager = Depends(get_sse_manager)
 ):
     """
@@ -421,35 +432,39 @@ async def stream_execution_events(
     Connection lifecycle:
     1. Client connects to this endpoint
     2. Connection registered in SSE manager
-    3. Events broadcast to all connected clients
-    4. Client disconnects → cleanup
+    3. Missed events replayed (if the browser sent Last-Event-ID)
+    4. Events broadcast to all connected clients
+    5. Client disconnects → cleanup
+    
+    Heartbeats come from the SSE manager's shared scheduler, and disconnects
+    are detected from the ASGI http.disconnect event (EventStreamResponse).
+    
+    Reconnects:
+    Browsers resend the id of the last event they received as Last-Event-ID.
+    Missed events come from the SSE manager's ring buffer. If the gap is
+    older than the buffer, stored messages are replayed from agent_activity
+    instead; if even that is truncated, a "resync" event tells the client
+    to refetch /messages.
     
     Args:
         execution_id: UUID of the execution to stream
-        request: FastAPI request (for disconnect detection)
+        last_event_id: Last-Event-ID header sent on reconnect
         db: Database session
         current_user: Authenticated user
         sse_manager: SSE connection manager
     
     Returns:
-        StreamingResponse with SSE events
+        EventStreamResponse with SSE events
     
     Raises:
         404: Execution not found or user doesn't have access
-        429: Too many connections (limit: 3 per user)
+        429: Too many connections (SSE_MAX_CONNECTIONS_PER_USER, default 3)
     """
     logger.info(f"🔌 SSE connection request for execution: {execution_id}")
     logger.info(f"   User: {current_user.email}")
     
     # Verify ownership
-    execution = db.query(CrewExecution).join(
-        Project, CrewExecution.project_id == Project.project_id
-    ).join(
-        Client, Project.client_id == Client.client_id
-    ).filter(
-        CrewExecution.execution_id == execution_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    execution = await get_owned_execution(db, execution_id, current_user.user_id)
     
     if not execution:
         logger.warning(f"❌ Execution {execution_id} not found")
@@ -457,9 +472,9 @@ async def stream_execution_events(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Execution not found"
         )
-    
-    # Create queue for this connection
-    queue: asyncio.Queue = asyncio.Queue()
+
+    # Create bounded queue for this connection
+    queue: asyncio.Queue = sse_manager.create_queue()
     
     # Register connection
     connected = await sse_manager.connect(
@@ -475,6 +490,26 @@ async def stream_execution_events(
             detail=f"Connection limit reached ({sse_manager.MAX_CONNECTIONS_PER_USER} max)"
         )
     
+    # Collect events missed since Last-Event-ID. The buffer snapshot must be
+    # taken right after connect() so nothing falls between replay and queue.
+    replay = []
+    resume_from = sse_manager.parse_last_event_id(last_event_id)
+    if resume_from is not None:
+        replay = sse_manager.get_replay(execution_id, resume_from)
+        if replay is None:
+            try:
+                replay = await _replay_from_activity(
+                    db, execution_id, resume_from, sse_manager
+                )
+            except Exception:
+                sse_manager.disconnect(queue)
+                raise
+        logger.info(f"↩️  Replaying {len(replay)} events after Last-Event-ID {resume_from}")
+    
+    # Return the DB connection to the pool before streaming.
+    # Streams stay open for hours and must not pin a pooled connection.
+    await db.close()
+    
     async def event_generator():
         """Generate SSE events from the queue."""
         try:
@@ -488,34 +523,211 @@ async def stream_execution_events(
                 }
             )
             
-            # Send events from queue
+            # Send missed events
+            for event in replay:
+                yield event
+            
+            # Send events from queue. Heartbeats are queued by the shared
+            # scheduler; disconnects cancel this generator.
             while True:
-                # Check if client disconnected
-                if await request.is_disconnected():
-                    logger.info(f"🔌 Client disconnected from stream")
+                event = await queue.get()
+                if event is sse_manager.CLOSE:
+                    logger.info(f"🔌 Closing stream for slow consumer")
                     break
-                
-                try:
-                    # Wait for event with timeout (for heartbeat)
-                    event = await asyncio.wait_for(
-                        queue.get(),
-                        timeout=sse_manager.HEARTBEAT_INTERVAL
-                    )
-                    yield event
-                    
-                except asyncio.TimeoutError:
-                    # Send heartbeat
-                    await sse_manager.send_heartbeat(queue)
-                    continue
+                yield event
         
         finally:
             # Cleanup on disconnect
+            stats = sse_manager.get_connection_stats(queue)
+            sse_manager.disconnect(queue)
+            logger.info(f"✅ SSE connection cleaned up (stats: {stats})")
+    
+    return EventStreamResponse(
+        event_generator(),
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+    )
+
+
+async def _replay_from_activity(
+    db: AsyncSession,
+    execution_id: UUID,
+    last_event_id: int,
+    sse_manager: SSEConnectionManager
+) -> list:
+    """
+    Replay stored messages newer than a Last-Event-ID from agent_activity.
+    
+    Used when the gap is older than the SSE ring buffer (or the buffer was
+    lost in a restart). Event IDs are anchored to broadcast time in
+    milliseconds, so they map onto activity timestamps; the skew allowance
+    covers events broadcast after their own timestamp. Replayed events carry
+    no SSE id, so a reconnect during replay resumes from the same point.
+    
+    Args:
+        db: Database session
+        execution_id: UUID of the execution
+        last_event_id: Last event ID the client received
+        sse_manager: SSE manager (for message formatting)
+    
+    Returns:
+        Encoded SSE messages
+    """
+    since = datetime.fromtimestamp(last_event_id / 1000, tz=timezone.utc) - timedelta(
+        seconds=settings.SSE_REPLAY_FALLBACK_SKEW_SECONDS
+    )
+    limit = settings.SSE_REPLAY_FALLBACK_LIMIT
+    
+    # Keyset scan on (timestamp, activity_id); reads one extra row to
+    # detect truncation
+    result = await db.execute(
+        select(AgentActivity).where(
+            AgentActivity.execution_id == execution_id,
+            tuple_(AgentActivity.timestamp, AgentActivity.activity_id) > (since, UUID(int=0))
+        ).order_by(
+            AgentActivity.timestamp.asc(),
+            AgentActivity.activity_id.asc()
+        ).limit(limit + 1)
+    )
+    activities = result.scalars().all()
+    
+    events = [
+        sse_manager._format_sse_message(
+            "message",
+            {
+                "message_id": str(activity.activity_id),
+                "sender_type": "agent",
+                "sender_name": activity.agent_name,
+                "content": activity.message,
+                "activity_type": activity.activity_type.value,
+                "timestamp": activity.timestamp.isoformat(),
+                "replayed": True
+            }
+        )
+        for activity in activities[:limit]
+    ]
+    
+    if len(activities) > limit:
+        events.append(sse_manager._format_sse_message(
+            "resync",
+            {
+                "execution_id": str(execution_id),
+                "message": "Too many missed events; refetch /messages"
+            }
+        ))
+    
+    return events
+
+
+# =============================================================================
+# USER EVENT STREAM
+# =============================================================================
+
+@router.get("/events")
+async def stream_user_events(
+    execution_ids: Optional[List[UUID]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    sse_manager: SSEConnectionManager = Depends(get_sse_manager)
+):
+    """
+    Multiplexed SSE stream for many executions over one connection.
+    
+    Every event carries an execution_id field. The first event
+    ("connected") includes a stream_id; use it with
+    PATCH /executions/events/{stream_id} to add or remove executions
+    while the stream is open. The resulting set is confirmed on the
+    stream with a "subscriptions" event.
+    
+    Only executions owned by the user (via Client.owner_id) can be
+    subscribed. Counts as one connection towards the per-user limit.
+    Last-Event-ID replay is not supported on this stream; refetch
+    /messages for executions after a reconnect.
+    
+    Args:
+        execution_ids: Executions to follow (default: all active executions)
+        db: Database session
+        current_user: Authenticated user
+        sse_manager: SSE connection manager
+    
+    Returns:
+        EventStreamResponse with SSE events
+    
+    Raises:
+        404: A requested execution is not found or not owned by the user
+        429: Too many connections
+    """
+    logger.info(f"🔌 User stream request from {current_user.email}")
+    
+    if execution_ids:
+        owned = await owned_execution_ids(db, current_user.user_id, execution_ids)
+        if len(owned) != len(set(execution_ids)):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Execution not found"
+            )
+        subscriptions = list(owned)
+    else:
+        # Default to everything the user may be waiting on
+        result = await db.execute(
+            select(CrewExecution.execution_id).where(
+                CrewExecution.owner_id == current_user.user_id,
+                CrewExecution.status.in_([
+                    ExecutionStatus.PENDING,
+                    ExecutionStatus.RUNNING,
+                    ExecutionStatus.AWAITING_APPROVAL
+                ])
+            ).order_by(
+                CrewExecution.started_at.desc()
+            ).limit(sse_manager.max_stream_subscriptions)
+        )
+        subscriptions = list(result.scalars().all())
+    
+    # Streams stay open for hours and must not pin a pooled connection
+    await db.close()
+    
+    queue: asyncio.Queue = sse_manager.create_queue()
+    stream_id = await sse_manager.connect_user_stream(
+        user_id=current_user.user_id,
+        queue=queue,
+        execution_ids=subscriptions
+    )
+    
+    if stream_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Connection limit reached ({sse_manager.MAX_CONNECTIONS_PER_USER} max)"
+        )
+    
+    async def event_generator():
+        """Generate SSE events from the queue."""
+        try:
+            yield sse_manager._format_sse_message(
+                "connected",
+                {
+                    "stream_id": stream_id,
+                    "execution_ids": sse_manager.get_stream_subscriptions(stream_id),
+                    "message": "Connected to user event stream"
+                }
+            )
+            
+            while True:
+                event = await queue.get()
+                if event is sse_manager.CLOSE:
+                    logger.info(f"🔌 Closing user stream for slow consumer")
+                    break
+                yield event
+        
+        finally:
+            stats = sse_manager.get_connection_stats(queue)
             sse_manager.disconnect(queue)
-            logger.info(f"✅ SSE connection cleaned up")
+            logger.info(f"✅ User stream cleaned up (stats: {stats})")
     
-    return StreamingResponse(
+    return EventStreamResponse(
         event_generator(),
-        media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
@@ -524,6 +736,61 @@ async def stream_execution_events(
     )
 
 
+@router.patch(
+    "/events/{stream_id}",
+    response_model=StreamSubscriptionResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def update_user_stream_subscriptions(
+    stream_id: str,
+    update: StreamSubscriptionUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+    sse_manager: SSEConnectionManager = Depends(get_sse_manager)
+):
+    """
+    Add or remove executions on an open user stream.
+    
+    The change is delivered to whichever API worker holds the stream and
+    is confirmed on the stream with a "subscriptions" event. Streams that
+    belong to another user are never modified.
+    
+    Args:
+        stream_id: Stream ID from the "connected" event
+        update: Executions to add and remove
+        db: Database session
+        current_user: Authenticated user
+        sse_manager: SSE connection manager
+    
+    Returns:
+        Accepted subscription change
+    
+    Raises:
+        404: An added execution is not found or not owned by the user
+    """
+    if update.add:
+        owned = await owned_execution_ids(db, current_user.user_id, update.add)
+        if len(owned) != len(set(update.add)):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Execution not found"
+            )
+    
+    await sse_manager.update_subscriptions(
+        stream_id=stream_id,
+        user_id=current_user.user_id,
+        add=update.add,
+        remove=update.remove
+    )
+    
+    return StreamSubscriptionResponse(
+        stream_id=stream_id,
+        added=update.add,
+        removed=update.remove,
+        message="Subscription change sent to stream"
+    )
+
+
 # =============================================================================
 # CANCEL EXECUTION
 # =============================================================================
@@ -531,25 +798,32 @@ async def stream_execution_events(
 @router.delete("/{execution_id}", response_model=CancelExecutionResponse)
 async def cancel_execution(
     execution_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
     crewai_service: CrewAIService = Depends(get_crewai_service),
-    sse_manager: SSEConnectionManager = Depends(get_sse_manager)
+    sse_manager: SSEConnectionManager = Depends(get_sse_manager),
+    scheduler: ExecutionScheduler = Depends(get_execution_scheduler)
 ):
     """
     Cancel a running execution.
     
     Attempts to:
-    1. Cancel the CrewAI execution (if running)
-    2. Update execution status to CANCELLED
+    1. Update execution status to CANCELLED
+    2. Cancel the CrewAI execution (if it was started)
     3. Broadcast cancellation to connected clients
     
+    The row is locked while its status is changed. The scheduler locks it
+    too when recording a kickoff, so either the kickoff id is already
+    visible here (and the crew is cancelled below) or the scheduler sees
+    CANCELLED and cancels the crew itself.
+    
     Args:
         execution_id: UUID of the execution to cancel
         db: Database session
         current_user: Authenticated user
         crewai_service: CrewAI service instance
         sse_manager: SSE manager for broadcasting
+        scheduler: Execution scheduler
     
     Returns:
         Cancellation confirmation
@@ -561,14 +835,7 @@ async def cancel_execution(
     logger.info(f"🛑 Cancelling execution: {execution_id}")
     
     # Get execution with ownership verification
-    execution = db.query(CrewExecution).join(
-        Project, CrewExecution.project_id == Project.project_id
-    ).join(
-        Client, Project.client_id == Client.client_id
-    ).filter(
-        CrewExecution.execution_id == execution_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    execution = await get_owned_execution(db, execution_id, current_user.user_id)
     
     if not execution:
         logger.warning(f"❌ Execution {execution_id} not found")
@@ -577,6 +844,9 @@ async def cancel_execution(
             detail="Execution not found"
         )
     
+    # Re-read under a row lock (status / kickoff id may have just changed)
+    await db.refresh(execution, with_for_update=True)
+    
     # Check if already completed/cancelled
     if execution.status in [ExecutionStatus.COMPLETED, ExecutionStatus.CANCELLED, ExecutionStatus.FAILED]:
         logger.warning(f"⚠️  Execution already {execution.status.value}")
@@ -585,16 +855,10 @@ async def cancel_execution(
             detail=f"Cannot cancel execution with status: {execution.status.value}"
         )
     
-    # Try to cancel in CrewAI
-    crewai_cancelled = False
-    if execution.crewai_execution_id:
-        try:
-            crewai_cancelled = await crewai_service.cancel_execution(
-                execution.crewai_execution_id
-            )
-            logger.info(f"CrewAI cancellation: {crewai_cancelled}")
-        except Exception as e:
-            logger.warning(f"⚠️  CrewAI cancellation failed: {e}")
+    # Drop a queued kickoff (an in-flight one is cancelled by the scheduler)
+    scheduler.discard(execution.execution_id)
+    
+    crewai_execution_id = execution.crewai_execution_id
     
     # Update execution status
     execution.status = ExecutionStatus.CANCELLED
@@ -610,7 +874,16 @@ async def cancel_execution(
     )
     db.add(activity)
     
-    db.commit()
+    await db.commit()
+    
+    # Try to cancel in CrewAI (after the commit releases the row lock)
+    crewai_cancelled = False
+    if crewai_execution_id:
+        try:
+            crewai_cancelled = await crewai_service.cancel_execution(crewai_execution_id)
+            logger.info(f"CrewAI cancellation: {crewai_cancelled}")
+        except Exception as e:
+            logger.warning(f"⚠️  CrewAI cancellation failed: {e}")
     
     # Broadcast cancellation to SSE clients
     await sse_manager.broadcast(
@@ -7,7 +7,7 @@ external service status, and readiness checks.
 """
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import logging
 from datetime import datetime
@@ -15,6 +15,13 @@ from typing import Dict, Any
 
 from api.dependencies import get_db
 from api.config import settings
+from api.services.crewai import get_crewai_service
+from api.services.outbox import get_outbox_dispatcher
+from api.services.scheduler import get_execution_scheduler
+from api.services.reconciler import get_status_reconciler
+from api.services.activity_archive import get_activity_retention
+from api.services.sse import get_sse_manager
+from api.services.webhook_queue import get_webhook_queue
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +34,7 @@ router = APIRouter()
 
 @router.get("")
 @router.get("/")
-async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def health_check(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """
     Comprehensive health check endpoint.
     
@@ -49,7 +56,7 @@ async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     
     # Check database connectivity
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         health_status["checks"]["database"] = {
             "status": "healthy",
             "message": "Database connection successful"
@@ -99,17 +106,90 @@ async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
         "url": settings.REDIS_URL.split('@')[1] if '@' in settings.REDIS_URL else settings.REDIS_URL
     }
     
+    # SSE fan-out backend
+    health_status["checks"]["sse"] = {
+        "status": "healthy",
+        **get_sse_manager().get_stats()
+    }
+    
+    # Webhook ingestion queue
+    if settings.WEBHOOK_INGEST_MODE == "queue":
+        try:
+            queue_metrics = await get_webhook_queue().get_metrics()
+            health_status["checks"]["webhook_queue"] = {
+                "status": "healthy" if queue_metrics["workers"] else "unhealthy",
+                **queue_metrics
+            }
+        except Exception as e:
+            logger.error(f"Webhook queue health check failed: {e}")
+            health_status["status"] = "unhealthy"
+            health_status["checks"]["webhook_queue"] = {
+                "status": "unhealthy",
+                "message": f"Webhook queue unavailable: {str(e)}"
+            }
+    else:
+        health_status["checks"]["webhook_queue"] = {
+            "status": "disabled",
+            "mode": settings.WEBHOOK_INGEST_MODE
+        }
+    
     # CrewAI configuration
     health_status["checks"]["crewai"] = {
         "status": "configured" if settings.CREWAI_BEARER_TOKEN else "not_configured",
         "api_url": settings.CREWAI_API_URL
     }
+    try:
+        crewai_metrics = get_crewai_service().get_metrics()
+        health_status["checks"]["crewai"].update(crewai_metrics)
+        if crewai_metrics["circuit_breaker"]["state"] != "closed":
+            health_status["checks"]["crewai"]["status"] = "degraded"
+            if health_status["status"] == "healthy":
+                health_status["status"] = "degraded"
+    except ValueError:
+        # Not configured; status above already says so
+        pass
+    
+    # Kickoff scheduler
+    scheduler_metrics = get_execution_scheduler().get_metrics()
+    health_status["checks"]["execution_scheduler"] = {
+        "status": "healthy" if scheduler_metrics["running"] else "unhealthy",
+        **scheduler_metrics
+    }
+    
+    # CrewAI outbox (queued resume calls)
+    try:
+        outbox_metrics = await get_outbox_dispatcher().get_metrics(db)
+        health_status["checks"]["crewai_outbox"] = {
+            "status": "healthy" if outbox_metrics["running"] else "unhealthy",
+            **outbox_metrics
+        }
+    except Exception as e:
+        logger.error(f"Outbox health check failed: {e}")
+        health_status["checks"]["crewai_outbox"] = {
+            "status": "unhealthy",
+            "message": f"Outbox unavailable: {str(e)}"
+        }
+    
+    # Status reconciler (only the replica holding the lock is "leader")
+    reconciler_metrics = get_status_reconciler().get_metrics()
+    health_status["checks"]["status_reconciler"] = {
+        "status": "healthy" if reconciler_metrics["running"] or not settings.RECONCILER_ENABLED else "unhealthy",
+        "enabled": settings.RECONCILER_ENABLED,
+        **reconciler_metrics
+    }
+    
+    # Activity partition maintenance / retention
+    retention_metrics = get_activity_retention().get_metrics()
+    health_status["checks"]["activity_retention"] = {
+        "status": "healthy" if retention_metrics["running"] else "unhealthy",
+        **retention_metrics
+    }
     
     return health_status
 
 
 @router.get("/ready")
-async def readiness_check(db: Session = Depends(get_db)) -> Dict[str, str]:
+async def readiness_check(db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
     """
     Kubernetes-style readiness probe.
     
@@ -121,7 +201,7 @@ async def readiness_check(db: Session = Depends(get_db)) -> Dict[str, str]:
     """
     try:
         # Check database connectivity
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         
         # Check critical configuration
         if not settings.DATABASE_URL:
@@ -158,7 +238,7 @@ async def liveness_check() -> Dict[str, str]:
 
 
 @router.get("/startup")
-async def startup_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def startup_check(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """
     Kubernetes-style startup probe.
     
@@ -170,7 +250,7 @@ async def startup_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     try:
         # Verify database is accessible
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         
         # Verify tables exist
         from api.database import Base
@@ -7,14 +7,16 @@ Each project belongs to a client and is created by a user.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
 import logging
 from datetime import datetime
 
 from api.dependencies import get_db, get_current_user, PaginationParams
-from api.models.user import User
+from api.utils.pagination import paginate, count_total
+from api.services.principal_cache import UserPrincipal
 from api.models.client import Client
 from api.models.project import Project, ProjectStatus
 from api.schemas.project import (
@@ -35,8 +37,8 @@ router = APIRouter()
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new project.
@@ -55,11 +57,14 @@ async def create_project(
     logger.info(f"Creating project '{project_data.project_name}' for user {current_user.user_id}")
     
     # Verify client exists and is owned by user
-    client = db.query(Client).filter(
-        Client.client_id == project_data.client_id,
-        Client.owner_id == current_user.user_id,
-        Client.is_active == True
-    ).first()
+    result = await db.execute(
+        select(Client).where(
+            Client.client_id == project_data.client_id,
+            Client.owner_id == current_user.user_id,
+            Client.is_active == True
+        )
+    )
+    client = result.scalars().first()
     
     if not client:
         logger.warning(f"Client {project_data.client_id} not found for user {current_user.user_id}")
@@ -81,8 +86,8 @@ async def create_project(
     )
     
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     
     logger.info(f"✅ Project created: {new_project.project_id}")
     return new_project
@@ -97,8 +102,8 @@ async def list_projects(
     status: Optional[ProjectStatus] = Query(None, description="Filter by project status"),
     content_type: Optional[str] = Query(None, description="Filter by content type"),
     pagination: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all projects created by the current user.
@@ -106,40 +111,50 @@ async def list_projects(
     Supports filtering and pagination:
     - status: Filter by project status (draft, in_progress, etc.)
     - content_type: Filter by content type (blog, landing_page, local_article)
-    - page: Page number (default: 1)
+    - cursor: next_cursor / prev_cursor from a previous page (keyset)
+    - page: Page number (default: 1), used when no cursor is given
     - page_size: Items per page (default: 20, max: 100)
+    - include_total: Compute the exact total (default: true)
     
     Returns:
         List of projects with pagination metadata
+    
+    Raises:
+        400: Invalid cursor
     """
     logger.info(f"Fetching projects for user {current_user.user_id}")
     
     # Build query - only show projects from user's clients
-    query = db.query(Project).join(Client).filter(
+    query = select(Project).join(Client).where(
         Client.owner_id == current_user.user_id,
         Client.is_active == True
     )
     
     # Apply filters
     if status:
-        query = query.filter(Project.status == status)
+        query = query.where(Project.status == status)
     if content_type:
-        query = query.filter(Project.content_type == content_type)
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    projects = query.order_by(Project.created_at.desc())\
-                    .offset(pagination.skip)\
-                    .limit(pagination.limit)\
-                    .all()
+        query = query.where(Project.content_type == content_type)
+    
+    # Get total count (optional)
+    total = await count_total(db, query) if pagination.include_total else None
+    
+    # Apply pagination (newest first)
+    page = await paginate(
+        db, query, Project.created_at, Project.project_id,
+        limit=pagination.limit,
+        cursor=pagination.cursor,
+        offset=pagination.skip,
+        descending=True
+    )
     
-    logger.info(f"Found {total} projects, returning page {pagination.page}")
+    logger.info(f"Found {total} projects, returning {len(page.items)}")
     
     return ProjectListResponse(
-        projects=projects,
-        total=total
+        projects=page.items,
+        total=total,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
     )
 
 
@@ -152,8 +167,8 @@ async def list_projects_by_client(
     client_id: UUID,
     status: Optional[ProjectStatus] = Query(None, description="Filter by project status"),
     pagination: PaginationParams = Depends(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all projects for a specific client.
@@ -163,21 +178,26 @@ async def list_projects_by_client(
     Args:
         client_id: UUID of the client
         status: Optional status filter
+        pagination: cursor or page, page_size, include_total
         
     Returns:
         List of projects for the client
         
     Raises:
+        400: Invalid cursor
         404: Client not found or not owned by user
     """
     logger.info(f"Fetching projects for client {client_id}")
     
     # Verify client exists and is owned by user
-    client = db.query(Client).filter(
-        Client.client_id == client_id,
-        Client.owner_id == current_user.user_id,
-        Client.is_active == True
-    ).first()
+    result = await db.execute(
+        select(Client).where(
+            Client.client_id == client_id,
+            Client.owner_id == current_user.user_id,
+            Client.is_active == True
+        )
+    )
+    client = result.scalars().first()
     
     if not client:
         logger.warning(f"Client {client_id} not found for user {current_user.user_id}")
@@ -187,26 +207,31 @@ async def list_projects_by_client(
         )
     
     # Query projects for this client
-    query = db.query(Project).filter(Project.client_id == client_id)
+    query = select(Project).where(Project.client_id == client_id)
     
     # Apply status filter
     if status:
-        query = query.filter(Project.status == status)
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    projects = query.order_by(Project.created_at.desc())\
-                    .offset(pagination.skip)\
-                    .limit(pagination.limit)\
-                    .all()
+        query = query.where(Project.status == status)
+    
+    # Get total count (optional)
+    total = await count_total(db, query) if pagination.include_total else None
+    
+    # Apply pagination (newest first)
+    page = await paginate(
+        db, query, Project.created_at, Project.project_id,
+        limit=pagination.limit,
+        cursor=pagination.cursor,
+        offset=pagination.skip,
+        descending=True
+    )
     
     logger.info(f"Found {total} projects for client {client_id}")
     
     return ProjectListResponse(
-        projects=projects,
-        total=total
+        projects=page.items,
+        total=total,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor
     )
 
 
@@ -217,8 +242,8 @@ async def list_projects_by_client(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get a specific project by ID.
@@ -236,10 +261,13 @@ async def get_project(
     """
     logger.info(f"Fetching project {project_id} for user {current_user.user_id}")
     
-    project = db.query(Project).join(Client).filter(
-        Project.project_id == project_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Project).join(Client).where(
+            Project.project_id == project_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         logger.warning(f"Project {project_id} not found for user {current_user.user_id}")
@@ -259,8 +287,8 @@ async def get_project(
 async def update_project(
     project_id: UUID,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Update a project's information.
@@ -283,10 +311,13 @@ async def update_project(
     logger.info(f"Updating project {project_id} for user {current_user.user_id}")
     
     # Get project
-    project = db.query(Project).join(Client).filter(
-        Project.project_id == project_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Project).join(Client).where(
+            Project.project_id == project_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         logger.warning(f"Project {project_id} not found for user {current_user.user_id}")
@@ -305,8 +336,8 @@ async def update_project(
         if not project.completed_at:
             project.completed_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     logger.info(f"✅ Project {project_id} updated")
     return project
@@ -319,8 +350,8 @@ async def update_project(
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete a project.
@@ -340,10 +371,13 @@ async def delete_project(
     logger.info(f"Deleting project {project_id} for user {current_user.user_id}")
     
     # Get project
-    project = db.query(Project).join(Client).filter(
-        Project.project_id == project_id,
-        Client.owner_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Project).join(Client).where(
+            Project.project_id == project_id,
+            Client.owner_id == current_user.user_id
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         logger.warning(f"Project {project_id} not found for user {current_user.user_id}")
@@ -353,8 +387,8 @@ async def delete_project(
         )
     
     # Hard delete
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     logger.info(f"✅ Project {project_id} deleted")
     return None
\ No newline at end of file
@@ -0,0 +1,103 @@
+# api/routers/storage.py
+"""
+Local object storage endpoints (STORAGE_BACKEND=local)
+
+Targets of the presigned URLs issued by LocalStorageBackend; the URL's
+signature is the only authorization, as with S3.
+
+- GET  /{bucket}/{key}: download. The file is handed to the server as a
+  path (ASGI pathsend, sendfile where the server supports it) or, with
+  LOCAL_STORAGE_ACCEL_REDIRECT_PREFIX set, to the reverse proxy via
+  X-Accel-Redirect so the bytes never pass through Python
+- PUT  /{bucket}/{key}: upload, streamed to disk. With upload_id and
+  part_number, uploads one part of a multipart upload. Returns the ETag
+"""
+
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+
+from api.config import settings
+from api.dependencies import get_s3_service
+from api.services.s3 import S3Service
+from api.services.storage_backends import LocalStorageBackend, StorageError, StorageObjectNotFound
+
+router = APIRouter()
+
+
+def get_local_storage(s3_service: S3Service = Depends(get_s3_service)) -> LocalStorageBackend:
+    """The local storage backend (404 when another backend is configured)."""
+    if not isinstance(s3_service.backend, LocalStorageBackend):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return s3_service.backend
+
+
+def _storage_path(backend: LocalStorageBackend, bucket: str, key: str):
+    try:
+        return backend.path_for(bucket, key)
+    except StorageError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/{bucket}/{key:path}")
+async def download_object(
+    bucket: str,
+    key: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    backend: LocalStorageBackend = Depends(get_local_storage)
+):
+    """
+    Download an object through a presigned URL.
+    """
+    if not backend.verify("GET", bucket, key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature")
+
+    path = _storage_path(backend, bucket, key)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+
+    if settings.LOCAL_STORAGE_ACCEL_REDIRECT_PREFIX:
+        prefix = settings.LOCAL_STORAGE_ACCEL_REDIRECT_PREFIX.rstrip("/")
+        return Response(headers={"X-Accel-Redirect": f"{prefix}/{quote(bucket)}/{quote(key)}"})
+
+    return FileResponse(path, filename=path.name, content_disposition_type="inline")
+
+
+@router.put("/{bucket}/{key:path}")
+async def upload_object(
+    bucket: str,
+    key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    upload_id: Optional[str] = Query(None),
+    part_number: Optional[int] = Query(None, ge=1, le=10000),
+    backend: LocalStorageBackend = Depends(get_local_storage)
+):
+    """
+    Upload an object (or one multipart part) through a presigned URL.
+
+    Whole-object uploads must send the Content-Type they were signed for.
+    """
+    if (upload_id is None) != (part_number is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="upload_id and part_number must be given together"
+        )
+
+    content_type = request.headers.get("content-type", "")
+    if not backend.verify("PUT", bucket, key, expires, signature, content_type, upload_id, part_number):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature")
+
+    _storage_path(backend, bucket, key)
+    try:
+        etag = await backend.receive(bucket, key, request.stream(), upload_id, part_number)
+    except StorageObjectNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return Response(status_code=status.HTTP_200_OK, headers={"ETag": f'"{etag}"'})
@@ -26,7 +26,9 @@ from api.schemas.execution import (
     WorkflowModeEnum,
     MessagesResponse,
     MessageResponse,
-    CancelExecutionResponse
+    CancelExecutionResponse,
+    StreamSubscriptionUpdate,
+    StreamSubscriptionResponse
 )
 
 __all__ = [
@@ -42,7 +44,8 @@ __all__ = [
     "DocumentResponse", "DocumentDownloadResponse", "DocumentListResponse",
     # Execution
     "StartExecutionRequest", "StartExecutionResponse", "ExecutionStatusEnum", "ExecutionStatusResponse", 
-    "WorkflowModeEnum", "MessagesResponse", "MessageResponse", "CancelExecutionResponse"
+    "WorkflowModeEnum", "MessagesResponse", "MessageResponse", "CancelExecutionResponse",
+    "StreamSubscriptionUpdate", "StreamSubscriptionResponse",
     # Webhook
     "HITLWebhookPayload", "WebhookEvent", "WebhookEventsPayload",
     "HITLApprovalRequest", "HITLApprovalResponse",
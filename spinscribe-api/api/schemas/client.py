@@ -38,4 +38,6 @@ class ClientResponse(BaseModel):
 
 class ClientListResponse(BaseModel):
     clients: list[ClientResponse]
-    total: int
\ No newline at end of file
+    total: Optional[int] = None  # omitted when include_total=false
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
\ No newline at end of file
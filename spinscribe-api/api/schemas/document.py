@@ -20,6 +20,25 @@ class DocumentUploadResponse(BaseModel):
     s3_key: str
     expires_in: int = 3600  # seconds
 
+class DocumentMultipartUploadResponse(BaseModel):
+    """Response with presigned part URLs for a multipart upload"""
+    document_id: UUID
+    s3_key: str
+    upload_id: str
+    part_size: int  # bytes per part (the last part may be smaller)
+    part_urls: list[str]  # part N is PUT to part_urls[N - 1]
+    expires_in: int = 3600  # seconds
+
+class MultipartUploadPart(BaseModel):
+    """An uploaded part (ETag header of its PUT response)"""
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str = Field(..., min_length=1)
+
+class DocumentMultipartCompleteRequest(BaseModel):
+    """Request to assemble the uploaded parts"""
+    upload_id: str = Field(..., min_length=1)
+    parts: list[MultipartUploadPart] = Field(..., min_length=1)
+
 # Response schemas
 class DocumentResponse(BaseModel):
     document_id: UUID
@@ -34,6 +53,10 @@ class DocumentResponse(BaseModel):
     uploaded_by: UUID
     uploaded_at: datetime
     
+    # Only in listings requested with include_download_urls=true
+    download_url: Optional[str] = None
+    download_url_expires_in: Optional[int] = None
+    
     class Config:
         from_attributes = True
 
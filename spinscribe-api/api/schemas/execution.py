@@ -86,6 +86,14 @@ class StartExecutionResponse(BaseModel):
         ...,
         description="SSE stream URL for real-time updates"
     )
+    queue_position: Optional[int] = Field(
+        None,
+        description="Position in the kickoff queue (1 = next)"
+    )
+    estimated_start_seconds: Optional[float] = Field(
+        None,
+        description="Estimated seconds until the kickoff"
+    )
 
 
 # =============================================================================
@@ -141,6 +149,16 @@ class ExecutionStatusResponse(BaseModel):
         description="Number of active SSE connections watching this execution"
     )
     
+    # Kickoff queue (PENDING executions queued on this API instance)
+    queue_position: Optional[int] = Field(
+        None,
+        description="Position in the kickoff queue (1 = next)"
+    )
+    estimated_start_seconds: Optional[float] = Field(
+        None,
+        description="Estimated seconds until the kickoff"
+    )
+    
     class Config:
         from_attributes = True
 
@@ -186,11 +204,13 @@ class MessagesResponse(BaseModel):
     """
     execution_id: UUID
     messages: List[MessageResponse]
-    total: int = Field(..., description="Total number of messages")
+    total: Optional[int] = Field(None, description="Total number of messages (omitted when include_total=false)")
     has_more: bool = Field(
         default=False,
         description="Whether there are more messages to load"
     )
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next (later) messages")
+    prev_cursor: Optional[str] = Field(None, description="Cursor for the previous (earlier) messages")
 
 
 # =============================================================================
@@ -243,6 +263,43 @@ class CancelExecutionResponse(BaseModel):
     )
 
 
+# =============================================================================
+# USER EVENT STREAM
+# =============================================================================
+
+class StreamSubscriptionUpdate(BaseModel):
+    """
+    Change the executions a multiplexed user stream follows.
+    
+    Example:
+    {
+        "add": ["550e8400-e29b-41d4-a716-446655440000"],
+        "remove": []
+    }
+    """
+    add: List[UUID] = Field(
+        default_factory=list,
+        description="Executions to subscribe to (must be owned by the user)"
+    )
+    remove: List[UUID] = Field(
+        default_factory=list,
+        description="Executions to unsubscribe from"
+    )
+
+
+class StreamSubscriptionResponse(BaseModel):
+    """
+    Response after requesting a subscription change.
+    
+    The stream itself receives a "subscriptions" event with the
+    resulting set once the change is applied.
+    """
+    stream_id: str
+    added: List[UUID]
+    removed: List[UUID]
+    message: str
+
+
 # =============================================================================
 # SSE EVENT TYPES
 # =============================================================================
@@ -252,6 +309,8 @@ class SSEEventType(str, Enum):
     # Connection events
     CONNECTED = "connected"
     HEARTBEAT = "heartbeat"
+    RESYNC = "resync"
+    SUBSCRIPTIONS = "subscriptions"
     
     # Execution events
     STATUS = "status"
@@ -42,4 +42,6 @@ class ProjectResponse(BaseModel):
 
 class ProjectListResponse(BaseModel):
     projects: list[ProjectResponse]
-    total: int
\ No newline at end of file
+    total: Optional[int] = None  # omitted when include_total=false
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
\ No newline at end of file
@@ -186,7 +186,7 @@ class HITLApprovalResponse(BaseModel):
     )
     crew_resumed: bool = Field(
         ...,
-        description="Whether CrewAI execution was successfully resumed"
+        description="Whether CrewAI was resumed before responding (resume calls are delivered asynchronously from the outbox)"
     )
     will_retry: Optional[bool] = Field(
         None,
@@ -219,6 +219,8 @@ class CheckpointResponse(BaseModel):
 class PendingCheckpointsResponse(BaseModel):
     """Response for listing pending checkpoints."""
     checkpoints: List[CheckpointResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Exact total (omitted when include_total=false)")
     limit: int
-    offset: int
\ No newline at end of file
+    offset: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (older checkpoints)")
+    prev_cursor: Optional[str] = Field(None, description="Cursor for the previous page (newer checkpoints)")
\ No newline at end of file
@@ -0,0 +1,513 @@
+# api/services/activity_archive.py
+"""
+Activity Archive - Retention for agent_activity partitions
+
+agent_activity is partitioned by month (api/services/activity_partitions.py).
+When ACTIVITY_RETENTION_ENABLED, months older than ACTIVITY_RETENTION_MONTHS
+leave Postgres:
+
+1. A partition is only archived when every execution with rows in it is
+   finished (COMPLETED / FAILED / CANCELLED); otherwise it waits
+2. Each execution's rows for that month are written to the outputs bucket
+   as gzipped JSON lines:
+       {ACTIVITY_ARCHIVE_PREFIX}/{YYYY-MM}/{execution_id}.jsonl.gz
+3. An activity_archives row per (execution, month) records the object,
+   and the partition is detached and dropped in the same transaction
+
+If anything fails before the commit, the partition stays and the next
+round retries (uploads are idempotent: same key, same content).
+
+Rows that arrive late for an archived month land in the default
+partition. Partition maintenance gives the month its partition back, and
+the next retention round merges those rows into the existing archive file
+and drops the partition again, so nothing stays behind in Postgres.
+
+Reading: archived_activity_sources() describes an execution's archive
+files (time range, row count) without downloading them. The messages
+endpoint merges them with live rows page by page and only loads the files
+that overlap the requested page. Files hold ArchivedActivity rows
+(attribute-compatible with AgentActivity). Decoded archives are kept in a
+small LRU (ACTIVITY_ARCHIVE_CACHE_SIZE files); archives are immutable
+once written.
+
+The maintenance loop also creates upcoming partitions. Like the status
+reconciler, it runs on one replica at a time (pg_try_advisory_lock).
+"""
+
+import asyncio
+import functools
+import gzip
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import date, datetime, time as dt_time, timezone
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.config import settings
+from api.database import AsyncSessionLocal, async_engine
+from api.models.activity import AgentActivity, ActivityType
+from api.models.activity_archive import ActivityArchive
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.services.activity_partitions import (
+    add_months,
+    drop_partition,
+    ensure_activity_partitions,
+    list_partitions,
+    month_of,
+)
+from api.services.s3 import get_s3_service
+from api.utils.pagination import RowSource
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveUnavailableError(RuntimeError):
+    """Raised when an execution's archived activity can't be read from S3."""
+
+
+# =============================================================================
+# ARCHIVE FORMAT
+# =============================================================================
+
+@dataclass(frozen=True)
+class ArchivedActivity:
+    """An agent activity read back from an archive (same attributes as AgentActivity)."""
+    activity_id: UUID
+    execution_id: UUID
+    event_id: Optional[str]
+    agent_name: str
+    activity_type: ActivityType
+    message: str
+    timestamp: datetime
+    activity_metadata: Dict[str, Any]
+
+    @classmethod
+    def from_activity(cls, activity: AgentActivity) -> "ArchivedActivity":
+        data = {f.name: getattr(activity, f.name) for f in fields(cls)}
+        data["activity_metadata"] = data["activity_metadata"] or {}
+        return cls(**data)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "activity_id": str(self.activity_id),
+            "execution_id": str(self.execution_id),
+            "event_id": self.event_id,
+            "agent_name": self.agent_name,
+            "activity_type": self.activity_type.name,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+            "activity_metadata": self.activity_metadata,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ArchivedActivity":
+        data = json.loads(raw)
+        data["activity_id"] = UUID(data["activity_id"])
+        data["execution_id"] = UUID(data["execution_id"])
+        data["activity_type"] = ActivityType[data["activity_type"]]
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return cls(**data)
+
+
+def encode_archive(activities: Iterable[ArchivedActivity]) -> bytes:
+    """Gzipped JSON lines, one activity per line."""
+    lines = "".join(activity.to_json() + "\n" for activity in activities)
+    return gzip.compress(lines.encode("utf-8"))
+
+
+def decode_archive(body: bytes) -> Tuple[ArchivedActivity, ...]:
+    lines = gzip.decompress(body).decode("utf-8").splitlines()
+    return tuple(ArchivedActivity.from_json(line) for line in lines if line)
+
+
+def archive_key(month: date, execution_id: UUID) -> str:
+    return f"{settings.ACTIVITY_ARCHIVE_PREFIX}/{month:%Y-%m}/{execution_id}.jsonl.gz"
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+class ActivityArchiveCache:
+    """
+    LRU of decoded archive files keyed by (bucket, key).
+    """
+
+    def __init__(self, max_size: int = settings.ACTIVITY_ARCHIVE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[ArchivedActivity, ...]]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, bucket: str, s3_key: str) -> Tuple[ArchivedActivity, ...]:
+        """
+        Decoded archive, downloading it on a miss.
+
+        Raises:
+            ArchiveUnavailableError: If the object can't be read or decoded
+        """
+        key = (bucket, s3_key)
+        activities = self._entries.get(key)
+        if activities is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return activities
+
+        self.misses += 1
+        try:
+            body = await get_s3_service().get_output_object(s3_key, bucket)
+            activities = await asyncio.to_thread(decode_archive, body)
+        except (ValueError, KeyError, TypeError, OSError, EOFError) as e:
+            self.errors += 1
+            logger.error(f"❌ Could not read activity archive s3://{bucket}/{s3_key}: {e}")
+            raise ArchiveUnavailableError(f"Archived activity unavailable: {s3_key}") from e
+
+        self._entries[key] = activities
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return activities
+
+    def discard(self, bucket: str, s3_key: str):
+        self._entries.pop((bucket, s3_key), None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# Global cache instance
+activity_archive_cache = ActivityArchiveCache()
+
+
+async def archived_activity_sources(db: AsyncSession, execution_id: UUID) -> Tuple[List[RowSource], int]:
+    """
+    An execution's archive files as pagination sources (nothing downloaded).
+
+    Args:
+        db: Database session
+        execution_id: UUID of the execution
+
+    Returns:
+        (sources, archived row count); a source raises
+        ArchiveUnavailableError when loaded if its file can't be read
+    """
+    result = await db.execute(
+        select(
+            ActivityArchive.s3_bucket,
+            ActivityArchive.s3_key,
+            ActivityArchive.first_timestamp,
+            ActivityArchive.last_timestamp,
+            ActivityArchive.row_count
+        ).where(
+            ActivityArchive.execution_id == execution_id
+        ).order_by(ActivityArchive.partition_month)
+    )
+    sources: List[RowSource] = []
+    total = 0
+    for bucket, s3_key, first_timestamp, last_timestamp, row_count in result.all():
+        sources.append(RowSource(
+            first=first_timestamp,
+            last=last_timestamp,
+            load=functools.partial(activity_archive_cache.get, bucket, s3_key)
+        ))
+        total += row_count
+    return sources, total
+
+
+# =============================================================================
+# RETENTION JOB
+# =============================================================================
+
+class ActivityRetention:
+    """
+    Leader-elected partition maintenance and archiving.
+
+    Features:
+    - Postgres advisory lock (one active replica)
+    - Upcoming partitions created ahead of time
+    - Expired partitions exported to S3, then dropped
+    """
+
+    # Advisory lock key (any constant bigint shared by all replicas)
+    ADVISORY_LOCK_KEY = 0x5350494E_52455445  # "SPINRETE"
+
+    TERMINAL_STATUSES = [
+        ExecutionStatus.COMPLETED,
+        ExecutionStatus.FAILED,
+        ExecutionStatus.CANCELLED,
+    ]
+
+    def __init__(
+        self,
+        interval: float = settings.ACTIVITY_MAINTENANCE_INTERVAL,
+        enabled: bool = settings.ACTIVITY_RETENTION_ENABLED,
+        retention_months: int = settings.ACTIVITY_RETENTION_MONTHS,
+        months_ahead: int = settings.ACTIVITY_PARTITION_PREMAKE_MONTHS
+    ):
+        if retention_months < 1:
+            raise ValueError("ACTIVITY_RETENTION_MONTHS must be at least 1")
+        self.interval = interval
+        self.enabled = enabled
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+
+        self._task: Optional[asyncio.Task] = None
+
+        # State / counters (per process)
+        self.is_leader = False
+        self.last_round_at: Optional[datetime] = None
+        self.rounds_total = 0
+        self.partitions_created_total = 0
+        self.partitions_archived_total = 0
+        self.partitions_deferred_total = 0
+        self.rows_archived_total = 0
+        self.errors_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Start the maintenance loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="activity-retention")
+            retention = f"keep {self.retention_months} months" if self.enabled else "retention off"
+            logger.info(f"✅ Activity partition maintenance started (every {self.interval:.0f}s, {retention})")
+
+    async def stop(self):
+        """Stop the maintenance loop (releases the advisory lock)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info("🛑 Activity partition maintenance stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors_total += 1
+                logger.error(f"❌ Activity partition maintenance failed: {e}")
+
+    # =========================================================================
+    # ROUND
+    # =========================================================================
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Run one round if this replica gets the advisory lock.
+
+        Args:
+            now: Current time (defaults to UTC now)
+
+        Returns:
+            Number of partitions archived and dropped
+        """
+        async with async_engine.connect() as conn:
+            acquired = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": self.ADVISORY_LOCK_KEY}
+            )).scalar()
+
+            self.is_leader = bool(acquired)
+            if not acquired:
+                logger.debug("Activity retention lock held by another replica")
+                return 0
+
+            try:
+                return await self._maintain(now or datetime.now(timezone.utc))
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": self.ADVISORY_LOCK_KEY}
+                )
+
+    async def _maintain(self, now: datetime) -> int:
+        self.rounds_total += 1
+        self.last_round_at = now
+
+        # Months before the cutoff are archived (late rows included: their
+        # month's partition is re-created above and archived again here)
+        cutoff = add_months(month_of(now), -self.retention_months) if self.enabled else None
+
+        async with async_engine.begin() as conn:
+            created = await conn.run_sync(
+                ensure_activity_partitions, months_ahead=self.months_ahead, now=now
+            )
+            partitions = await conn.run_sync(list_partitions)
+        self.partitions_created_total += len(created)
+
+        if cutoff is None:
+            return 0
+
+        archived = 0
+        for name, month in partitions:
+            if month >= cutoff:
+                break
+            if await self.archive_partition(name, month):
+                archived += 1
+        return archived
+
+    async def archive_partition(self, name: str, month: date) -> bool:
+        """
+        Export one month to S3 and drop its partition.
+
+        Args:
+            name: Partition table name
+            month: First day of the month it holds
+
+        Returns:
+            True if the partition was archived and dropped, False if it
+            still holds activity of unfinished executions
+        """
+        lower = datetime.combine(month, dt_time.min, tzinfo=timezone.utc)
+        upper = datetime.combine(add_months(month, 1), dt_time.min, tzinfo=timezone.utc)
+        in_month = (AgentActivity.timestamp >= lower, AgentActivity.timestamp < upper)
+
+        async with AsyncSessionLocal() as db:
+            unfinished = await db.scalar(
+                select(func.count(func.distinct(AgentActivity.execution_id))).join(
+                    CrewExecution, CrewExecution.execution_id == AgentActivity.execution_id
+                ).where(
+                    *in_month,
+                    CrewExecution.status.notin_(self.TERMINAL_STATUSES)
+                )
+            )
+            if unfinished:
+                self.partitions_deferred_total += 1
+                logger.info(f"⏭️  Keeping {name}: {unfinished} executions still in progress")
+                return False
+
+            execution_ids = (await db.execute(
+                select(AgentActivity.execution_id).where(*in_month).distinct()
+            )).scalars().all()
+
+            records = []
+            for execution_id in execution_ids:
+                records.append(await self._export_execution(db, execution_id, month, in_month))
+                # Rows are in S3 now: don't keep the whole month in the identity map
+                db.expunge_all()
+
+            for start in range(0, len(records), 1000):
+                stmt = pg_insert(ActivityArchive).values(records[start:start + 1000])
+                await db.execute(stmt.on_conflict_do_update(
+                    constraint="_activity_archive_execution_month_uc",
+                    set_={
+                        "s3_bucket": stmt.excluded.s3_bucket,
+                        "s3_key": stmt.excluded.s3_key,
+                        "row_count": stmt.excluded.row_count,
+                        "first_timestamp": stmt.excluded.first_timestamp,
+                        "last_timestamp": stmt.excluded.last_timestamp,
+                        "archived_at": func.now(),
+                    }
+                ))
+
+            connection = await db.connection()
+            await connection.run_sync(drop_partition, name)
+            await db.commit()
+
+        for record in records:
+            activity_archive_cache.discard(record["s3_bucket"], record["s3_key"])
+
+        row_count = sum(record["row_count"] for record in records)
+        self.partitions_archived_total += 1
+        self.rows_archived_total += row_count
+        logger.info(f"📦 Archived {name}: {row_count} activities of {len(records)} executions")
+        return True
+
+    async def _export_execution(
+        self,
+        db: AsyncSession,
+        execution_id: UUID,
+        month: date,
+        in_month: Tuple
+    ) -> Dict[str, Any]:
+        """Upload one execution's rows for the month; returns its activity_archives values."""
+        result = await db.execute(
+            select(AgentActivity).where(
+                AgentActivity.execution_id == execution_id, *in_month
+            ).order_by(AgentActivity.timestamp, AgentActivity.activity_id)
+        )
+        activities = [ArchivedActivity.from_activity(activity) for activity in result.scalars().all()]
+
+        # Late rows for a month archived before: merge into the existing file
+        existing = (await db.execute(
+            select(ActivityArchive.s3_bucket, ActivityArchive.s3_key).where(
+                ActivityArchive.execution_id == execution_id,
+                ActivityArchive.partition_month == f"{month:%Y-%m}"
+            )
+        )).first()
+        if existing is not None:
+            merged = {activity.activity_id: activity for activity in await activity_archive_cache.get(*existing)}
+            merged.update((activity.activity_id, activity) for activity in activities)
+            activities = sorted(merged.values(), key=lambda activity: (activity.timestamp, activity.activity_id))
+
+        s3_key = archive_key(month, execution_id)
+        body = await asyncio.to_thread(encode_archive, activities)
+        s3_service = get_s3_service()
+        await s3_service.put_output_object(s3_key, body, "application/gzip")
+
+        return {
+            "execution_id": execution_id,
+            "partition_month": f"{month:%Y-%m}",
+            "s3_bucket": s3_service.outputs_bucket,
+            "s3_key": s3_key,
+            "row_count": len(activities),
+            "first_timestamp": activities[0].timestamp,
+            "last_timestamp": activities[-1].timestamp,
+        }
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Maintenance state for the health endpoint.
+
+        Returns:
+            Dict with leadership, last round time, counters and archive cache
+        """
+        return {
+            "running": self._task is not None,
+            "leader": self.is_leader,
+            "retention_enabled": self.enabled,
+            "last_round_at": self.last_round_at.isoformat() if self.last_round_at else None,
+            "rounds_total": self.rounds_total,
+            "partitions_created_total": self.partitions_created_total,
+            "partitions_archived_total": self.partitions_archived_total,
+            "partitions_deferred_total": self.partitions_deferred_total,
+            "rows_archived_total": self.rows_archived_total,
+            "errors_total": self.errors_total,
+            "archive_cache": activity_archive_cache.get_metrics(),
+        }
+
+
+# Global retention instance
+activity_retention = ActivityRetention()
+
+
+def get_activity_retention() -> ActivityRetention:
+    """
+    Get the global activity retention instance.
+
+    Used as FastAPI dependency.
+    """
+    return activity_retention
@@ -0,0 +1,301 @@
+# api/services/activity_partitions.py
+"""
+Activity Partitions - Monthly range partitions of agent_activity
+
+agent_activity is the largest table by far and only ever grows. It is
+range-partitioned on timestamp, one partition per UTC month:
+
+    agent_activity                  (partitioned parent)
+    ├── agent_activity_y2026m09     [2026-09-01, 2026-10-01)
+    ├── agent_activity_y2026m10     [2026-10-01, 2026-11-01)
+    ├── ...
+    └── agent_activity_default      (rows outside every partition)
+
+Queries filtered by execution_id still use the per-partition indexes; an
+old month can be removed with DETACH + DROP instead of a huge DELETE
+(see api/services/activity_archive.py).
+
+Partition maintenance (ensure_activity_partitions):
+- The current month and ACTIVITY_PARTITION_PREMAKE_MONTHS ahead always exist
+- Rows that landed in the default partition (late or far-future
+  timestamps) get their month's partition, and are moved into it
+- New partitions are built as standalone tables and ATTACHed, which
+  doesn't block writers to other partitions
+
+Existing unpartitioned tables are converted once, at startup
+(prepare_activity_partitions). All DDL here runs on a sync connection
+(run_sync) under a transaction-level advisory lock, so concurrent
+replicas don't race.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from api.config import settings
+from api.models.activity import AgentActivity
+
+logger = logging.getLogger(__name__)
+
+
+PARENT_TABLE = AgentActivity.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+LEGACY_TABLE = f"{PARENT_TABLE}_unpartitioned"
+
+# Advisory lock key (any constant bigint shared by all replicas)
+ADVISORY_LOCK_KEY = 0x5350494E_41435456  # "SPINACTV"
+
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# Every column, in table order (for INSERT ... SELECT)
+_COLUMNS = ", ".join(column.name for column in AgentActivity.__table__.columns)
+
+
+# =============================================================================
+# MONTH HELPERS
+# =============================================================================
+
+def month_of(value: datetime) -> date:
+    """First day of the UTC month containing a timestamp."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """Shift a month (first day) by count months (negative goes back)."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a managed partition, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _lock(connection: Connection):
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+# =============================================================================
+# INSPECTION
+# =============================================================================
+
+def _relkind(connection: Connection, table: str) -> Optional[str]:
+    return connection.scalar(
+        text("SELECT c.relkind::text FROM pg_class c WHERE c.oid = to_regclass(:table)"),
+        {"table": table}
+    )
+
+
+def list_partitions(connection: Connection) -> List[Tuple[str, date]]:
+    """
+    Managed monthly partitions currently attached, oldest first.
+
+    Returns:
+        List of (partition name, month) tuples
+    """
+    result = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent)"
+        ),
+        {"parent": PARENT_TABLE}
+    )
+    partitions = []
+    for (name,) in result:
+        month = partition_month(name)
+        if month is not None:
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _default_months(connection: Connection) -> List[date]:
+    """Months with rows sitting in the default partition."""
+    result = connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC')::date "
+        f"FROM {DEFAULT_PARTITION}"
+    ))
+    return sorted(row[0] for row in result)
+
+
+# =============================================================================
+# DDL
+# =============================================================================
+
+def create_partition(connection: Connection, month: date) -> bool:
+    """
+    Create and attach the partition for one month.
+
+    Matching rows are moved out of the default partition first (Postgres
+    refuses to attach a range the default partition already holds rows for).
+
+    Args:
+        connection: Sync connection inside a transaction
+        month: First day of the month
+
+    Returns:
+        True if the partition was created, False if it already existed
+    """
+    name = partition_name(month)
+    if _relkind(connection, name) is not None:
+        return False
+
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    if _relkind(connection, DEFAULT_PARTITION) is not None:
+        moved = connection.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= {lower} AND timestamp < {upper} "
+            f"RETURNING {_COLUMNS}) "
+            f"INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM moved"
+        )).rowcount
+        if moved:
+            logger.info(f"📦 Moved {moved} rows from {DEFAULT_PARTITION} into {name}")
+    connection.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+    ))
+    logger.info(f"✅ Created activity partition {name}")
+    return True
+
+
+def drop_partition(connection: Connection, name: str):
+    """Detach and drop a managed partition (its rows are deleted)."""
+    if partition_month(name) is None:
+        raise ValueError(f"Not a managed activity partition: {name}")
+    _lock(connection)
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+    logger.info(f"🗑️  Dropped activity partition {name}")
+
+
+def ensure_activity_partitions(
+    connection: Connection,
+    months_ahead: int = settings.ACTIVITY_PARTITION_PREMAKE_MONTHS,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Create missing partitions: this month, months_ahead more, and any
+    month with rows in the default partition.
+
+    A late row for a month retention already archived gets that month's
+    partition back; the next retention round archives it again (merged
+    into the existing archive file).
+
+    Args:
+        connection: Sync connection inside a transaction
+        months_ahead: Future months to create ahead of time
+        now: Current time (defaults to UTC now)
+
+    Returns:
+        Names of the partitions created
+    """
+    _lock(connection)
+    current = month_of(now or datetime.now(timezone.utc))
+    months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    if _relkind(connection, DEFAULT_PARTITION) is not None:
+        months.update(_default_months(connection))
+
+    return [partition_name(month) for month in sorted(months) if create_partition(connection, month)]
+
+
+def prepare_activity_partitions(connection: Connection) -> List[str]:
+    """
+    Startup hook (run_sync after create_all and SCHEMA_UPGRADES).
+
+    Converts a legacy unpartitioned agent_activity table, creates the
+    default partition and the upcoming months.
+
+    Returns:
+        Names of the partitions created
+    """
+    _lock(connection)
+    relkind = _relkind(connection, PARENT_TABLE)
+    if relkind == "r":
+        _convert_legacy_table(connection)
+    elif relkind != "p":
+        raise RuntimeError(f"{PARENT_TABLE} is missing; run create_all first")
+
+    if _relkind(connection, DEFAULT_PARTITION) is None:
+        connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        logger.info(f"✅ Created activity partition {DEFAULT_PARTITION}")
+
+    return ensure_activity_partitions(connection)
+
+
+def _convert_legacy_table(connection: Connection):
+    """
+    Rebuild an unpartitioned agent_activity as a partitioned table.
+
+    Runs inside the startup transaction: either the whole copy commits
+    or the old table is left untouched.
+    """
+    logger.warning(f"⚠️  Converting {PARENT_TABLE} to a partitioned table (one-time copy)")
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+
+    # Index names are schema-wide: free them for the new parent
+    constraints = connection.execute(text(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:table) AND contype IN ('p', 'u')"
+    ), {"table": LEGACY_TABLE}).scalars().all()
+    for constraint in constraints:
+        connection.execute(text(f'ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT "{constraint}"'))
+    indexes = connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"
+    ), {"table": LEGACY_TABLE}).scalars().all()
+    for index in indexes:
+        connection.execute(text(f'DROP INDEX "{index}"'))
+
+    AgentActivity.__table__.create(connection, checkfirst=True)
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    months = connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC')::date "
+        f"FROM {LEGACY_TABLE} WHERE timestamp IS NOT NULL"
+    )).scalars().all()
+    for month in sorted(months):
+        create_partition(connection, month)
+
+    # Copy with the legacy table's own columns: it may predate some of ours
+    legacy_columns = set(connection.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table"
+    ), {"table": LEGACY_TABLE}).scalars().all())
+    # Rows without a timestamp predate the NOT NULL partition key
+    timestamp = "coalesce(timestamp, now())" if "timestamp" in legacy_columns else "now()"
+    # event_id is unique per timestamp; older rows only had it in the metadata
+    event_id = "event_id" if "event_id" in legacy_columns else "activity_metadata->>'event_id'"
+    expressions = {
+        "timestamp": timestamp,
+        "event_id": (
+            f"CASE WHEN row_number() OVER (PARTITION BY {event_id}, {timestamp} ORDER BY activity_id) = 1 "
+            f"THEN {event_id} END"
+        ),
+    }
+    columns = ", ".join(
+        expressions.get(column.name, column.name if column.name in legacy_columns else "NULL")
+        for column in AgentActivity.__table__.columns
+    )
+    copied = connection.execute(text(
+        f"INSERT INTO {PARENT_TABLE} ({_COLUMNS}) SELECT {columns} FROM {LEGACY_TABLE}"
+    )).rowcount
+    connection.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    logger.info(f"✅ Copied {copied} activities into {len(months)} monthly partitions")
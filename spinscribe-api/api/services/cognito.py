@@ -1,8 +1,29 @@
 # api/services/cognito.py
+"""
+Cognito Service - AWS Cognito user pool authentication
+
+One process-wide instance, opened in the application lifespan:
+- The pool and app client IDs are resolved once at startup, from
+  COGNITO_USER_POOL_ID / COGNITO_CLIENT_ID, then the metadata cache file
+  (COGNITO_METADATA_CACHE_FILE), then CloudFormation / list_user_pools.
+  A discovered result is written to the cache file so later starts skip
+  the AWS lookups.
+- boto3 is blocking, so every call runs in a bounded thread pool
+  (COGNITO_THREAD_POOL_SIZE) instead of on the event loop.
+
+Mock mode (USE_MOCK_AUTH) issues local HS256 tokens for development.
+"""
+
+import asyncio
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
 import boto3
 import jwt
-from datetime import datetime, timedelta
-from typing import Dict, Optional
 from botocore.exceptions import ClientError
 from api.config import settings
 import logging
@@ -10,6 +31,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class CognitoConfigurationError(RuntimeError):
+    """Raised when the user pool or app client can't be resolved."""
+
+
 class CognitoService:
     """
     AWS Cognito authentication service.
@@ -18,62 +43,151 @@ class CognitoService:
     
     def __init__(self):
         self.mock_mode = settings.USE_MOCK_AUTH
+        self.client = None
+        self.user_pool_id: Optional[str] = None
+        self.client_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._start_lock = asyncio.Lock()
         
         if self.mock_mode:
             logger.warning("🔧 Running in MOCK AUTH mode - for development only!")
             self.user_pool_id = "mock-pool-id"
             self.client_id = "mock-client-id"
-            self.client = None
-        else:
-            # Real Cognito setup
-            self.client = boto3.client('cognito-idp', region_name=settings.AWS_REGION)
-            self.user_pool_id = self._get_user_pool_id()
-            self.client_id = self._get_client_id()
     
-    def _get_user_pool_id(self) -> str:
-        """Get User Pool ID from config or CloudFormation"""
-        # First check if hardcoded in env
-        if settings.COGNITO_USER_POOL_ID:
-            return settings.COGNITO_USER_POOL_ID
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+    
+    async def start(self):
+        """
+        Create the boto3 client and resolve pool metadata (application startup).
+        
+        Safe to call more than once; later calls return immediately.
+        
+        Raises:
+            CognitoConfigurationError: If the pool or client can't be resolved
+        """
+        if self.mock_mode or self.client is not None:
+            return
+        async with self._start_lock:
+            if self.client is not None:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.COGNITO_THREAD_POOL_SIZE,
+                    thread_name_prefix="cognito"
+                )
+            client = await self._run(boto3.client, 'cognito-idp', region_name=settings.AWS_REGION)
+            self.user_pool_id, self.client_id = await self._run(self._resolve_metadata, client)
+            self.client = client
+            logger.info(f"✅ Cognito ready (pool {self.user_pool_id})")
+    
+    async def close(self):
+        """Shut down the boto3 thread pool (application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.client = None
+    
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking boto3 call in the Cognito thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def _call(self, method: str, **kwargs) -> Dict:
+        """Call a cognito-idp API method off the event loop."""
+        return await self._run(getattr(self.client, method), **kwargs)
+    
+    # =============================================================================
+    # POOL METADATA RESOLUTION (runs in the thread pool)
+    # =============================================================================
+    
+    def _resolve_metadata(self, client) -> Tuple[str, str]:
+        """Resolve (user_pool_id, client_id): env, cache file, then AWS."""
+        user_pool_id = settings.COGNITO_USER_POOL_ID
+        client_id = settings.COGNITO_CLIENT_ID
+        if user_pool_id and client_id:
+            return user_pool_id, client_id
         
-        # Try CloudFormation
+        cached = self._read_metadata_cache()
+        user_pool_id = user_pool_id or cached.get('user_pool_id')
+        client_id = client_id or cached.get('client_id')
+        if user_pool_id and client_id:
+            logger.info(f"Cognito metadata loaded from {settings.COGNITO_METADATA_CACHE_FILE}")
+            return user_pool_id, client_id
+        
+        outputs = self._get_stack_outputs()
+        user_pool_id = user_pool_id or outputs.get('UserPoolId') or self._find_user_pool(client)
+        client_id = client_id or outputs.get('UserPoolClientId')
+        if not user_pool_id:
+            raise CognitoConfigurationError(
+                "User Pool not found. Set COGNITO_USER_POOL_ID in .env or use USE_MOCK_AUTH=true"
+            )
+        if not client_id:
+            raise CognitoConfigurationError(
+                "Client ID not found. Set COGNITO_CLIENT_ID in .env or use USE_MOCK_AUTH=true"
+            )
+        
+        self._write_metadata_cache(user_pool_id, client_id)
+        return user_pool_id, client_id
+    
+    def _get_stack_outputs(self) -> Dict[str, str]:
+        """Outputs of the infrastructure CloudFormation stack (empty on failure)."""
         cfn = boto3.client('cloudformation', region_name=settings.AWS_REGION)
         try:
-            response = cfn.describe_stacks(StackName='spinscribe-production')
-            for output in response['Stacks'][0]['Outputs']:
-                if output['OutputKey'] == 'UserPoolId':
-                    return output['OutputValue']
+            response = cfn.describe_stacks(StackName=settings.COGNITO_STACK_NAME)
+            return {
+                output['OutputKey']: output['OutputValue']
+                for output in response['Stacks'][0].get('Outputs', [])
+            }
         except Exception as e:
-            logger.warning(f"Could not get User Pool from CloudFormation: {e}")
-        
-        # Fallback - list user pools
+            logger.warning(f"Could not get Cognito outputs from CloudFormation: {e}")
+            return {}
+    
+    def _find_user_pool(self, client) -> Optional[str]:
+        """Fallback - first user pool with 'spinscribe' in its name."""
         try:
-            pools = self.client.list_user_pools(MaxResults=50)
+            pools = client.list_user_pools(MaxResults=50)
             for pool in pools['UserPools']:
                 if 'spinscribe' in pool['Name'].lower():
                     return pool['Id']
         except Exception as e:
             logger.error(f"Could not list user pools: {e}")
-        
-        raise Exception("User Pool not found. Set COGNITO_USER_POOL_ID in .env or use USE_MOCK_AUTH=true")
+        return None
     
-    def _get_client_id(self) -> str:
-        """Get User Pool Client ID from config or CloudFormation"""
-        # First check if hardcoded in env
-        if settings.COGNITO_CLIENT_ID:
-            return settings.COGNITO_CLIENT_ID
-        
-        # Try CloudFormation
-        cfn = boto3.client('cloudformation', region_name=settings.AWS_REGION)
+    def _read_metadata_cache(self) -> Dict[str, str]:
+        path = settings.COGNITO_METADATA_CACHE_FILE
+        if not path or not os.path.exists(path):
+            return {}
         try:
-            response = cfn.describe_stacks(StackName='spinscribe-production')
-            for output in response['Stacks'][0]['Outputs']:
-                if output['OutputKey'] == 'UserPoolClientId':
-                    return output['OutputValue']
-        except Exception as e:
-            logger.warning(f"Could not get Client ID from CloudFormation: {e}")
-        
-        raise Exception("Client ID not found. Set COGNITO_CLIENT_ID in .env or use USE_MOCK_AUTH=true")
+            with open(path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable Cognito metadata cache {path}: {e}")
+            return {}
+        # A cache written for another region or stack doesn't apply
+        if cached.get('region') != settings.AWS_REGION or cached.get('stack_name') != settings.COGNITO_STACK_NAME:
+            return {}
+        return cached
+    
+    def _write_metadata_cache(self, user_pool_id: str, client_id: str):
+        path = settings.COGNITO_METADATA_CACHE_FILE
+        if not path:
+            return
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'region': settings.AWS_REGION,
+                    'stack_name': settings.COGNITO_STACK_NAME,
+                    'user_pool_id': user_pool_id,
+                    'client_id': client_id,
+                    'resolved_at': datetime.utcnow().isoformat()
+                }, f)
+            os.replace(tmp_path, path)
+            logger.info(f"💾 Cognito metadata cached to {path}")
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write Cognito metadata cache {path}: {e}")
     
     # =============================================================================
     # MOCK AUTH METHODS (Development Only)
@@ -163,13 +277,15 @@ class CognitoService:
     # PUBLIC API (Auto-switches between mock and real)
     # =============================================================================
     
-    def signup(self, email: str, password: str, name: str) -> Dict:
+    async def signup(self, email: str, password: str, name: str) -> Dict:
         """Register a new user"""
         if self.mock_mode:
             return self._mock_signup(email, password, name)
         
+        await self.start()
         try:
-            response = self.client.sign_up(
+            response = await self._call(
+                'sign_up',
                 ClientId=self.client_id,
                 Username=email,
                 Password=password,
@@ -191,13 +307,15 @@ class CognitoService:
             else:
                 raise ValueError(f"Signup failed: {e.response['Error']['Message']}")
     
-    def login(self, email: str, password: str) -> Dict:
+    async def login(self, email: str, password: str) -> Dict:
         """Authenticate user and return tokens"""
         if self.mock_mode:
             return self._mock_login(email, password)
         
+        await self.start()
         try:
-            response = self.client.initiate_auth(
+            response = await self._call(
+                'initiate_auth',
                 ClientId=self.client_id,
                 AuthFlow='USER_PASSWORD_AUTH',
                 AuthParameters={
@@ -222,13 +340,14 @@ class CognitoService:
             else:
                 raise ValueError(f"Login failed: {e.response['Error']['Message']}")
     
-    def get_user_from_token(self, access_token: str) -> Dict:
+    async def get_user_from_token(self, access_token: str) -> Dict:
         """Get user details from access token"""
         if self.mock_mode:
             return self._mock_get_user_from_token(access_token)
         
+        await self.start()
         try:
-            response = self.client.get_user(AccessToken=access_token)
+            response = await self._call('get_user', AccessToken=access_token)
             
             user_data = {
                 'username': response['Username'],
@@ -249,13 +368,15 @@ class CognitoService:
         except ClientError as e:
             raise ValueError(f"Invalid token: {e.response['Error']['Message']}")
     
-    def refresh_token(self, refresh_token: str) -> Dict:
+    async def refresh_token(self, refresh_token: str) -> Dict:
         """Refresh access token"""
         if self.mock_mode:
             return self._mock_refresh_token(refresh_token)
         
+        await self.start()
         try:
-            response = self.client.initiate_auth(
+            response = await self._call(
+                'initiate_auth',
                 ClientId=self.client_id,
                 AuthFlow='REFRESH_TOKEN_AUTH',
                 AuthParameters={
@@ -272,14 +393,16 @@ class CognitoService:
         except ClientError as e:
             raise ValueError(f"Token refresh failed: {e.response['Error']['Message']}")
     
-    def confirm_signup(self, email: str, code: str):
+    async def confirm_signup(self, email: str, code: str):
         """Confirm user signup with verification code"""
         if self.mock_mode:
             logger.info(f"🔧 MOCK: Confirming signup for {email}")
             return
         
+        await self.start()
         try:
-            self.client.confirm_sign_up(
+            await self._call(
+                'confirm_sign_up',
                 ClientId=self.client_id,
                 Username=email,
                 ConfirmationCode=code
@@ -287,16 +410,40 @@ class CognitoService:
         except ClientError as e:
             raise ValueError(f"Confirmation failed: {e.response['Error']['Message']}")
     
-    def admin_delete_user(self, email: str):
+    async def admin_delete_user(self, email: str):
         """Admin: Delete a user (for cleanup)"""
         if self.mock_mode:
             logger.info(f"🔧 MOCK: Deleting user {email}")
             return
         
+        await self.start()
         try:
-            self.client.admin_delete_user(
+            await self._call(
+                'admin_delete_user',
                 UserPoolId=self.user_pool_id,
                 Username=email
             )
         except ClientError as e:
-            raise ValueError(f"User deletion failed: {e.response['Error']['Message']}")
\ No newline at end of file
+            raise ValueError(f"User deletion failed: {e.response['Error']['Message']}")
+
+
+# Application-scoped instance (opened in the lifespan)
+_cognito_service: Optional[CognitoService] = None
+
+
+def get_cognito_service() -> CognitoService:
+    """
+    Get the shared Cognito service instance.
+    
+    Used as FastAPI dependency.
+    """
+    global _cognito_service
+    if _cognito_service is None:
+        _cognito_service = CognitoService()
+    return _cognito_service
+
+
+async def close_cognito_service():
+    """Shut down the shared Cognito service (application shutdown)."""
+    if _cognito_service is not None:
+        await _cognito_service.close()
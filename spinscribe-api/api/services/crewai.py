@@ -13,15 +13,36 @@ CRITICAL IMPLEMENTATION NOTES:
 2. CrewAI does NOT persist webhook configurations between calls
 3. All webhook events use the same authentication token
 
+Connection handling:
+One application-scoped service owns a pooled, keep-alive httpx client
+(optionally HTTP/2). It is opened and closed in the application lifespan;
+every call gets its own timeout budget (CREWAI_TIMEOUT_*).
+
+Resilience:
+- Transient failures are retried with jittered exponential backoff.
+  Status and cancel are idempotent, and kickoff and resume carry an
+  Idempotency-Key (CrewAI runs a repeated key once), so these are retried
+  on any transport error and on 429/502/503/504. A request without a key
+  is only retried when CrewAI cannot have acted on it (connection never
+  established, or 429/503)
+- A circuit breaker opens after CREWAI_BREAKER_FAILURE_THRESHOLD
+  consecutive failures (transport errors, 429 and any 5xx); calls then
+  fail fast with CircuitOpenError.
+  Kickoffs (api/services/scheduler.py) and resumes (api/services/outbox.py)
+  stay queued while it is open
+
 References:
 - HITL Workflows: https://docs.crewai.com/concepts/hitl-workflows
 - Webhook Streaming: https://docs.crewai.com/concepts/webhook-streaming  
 - Kickoff API: https://docs.crewai.com/deployment/kickoff-crew
 """
 
+import asyncio
 import httpx
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, Optional
 from api.config import settings
+from api.services.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
 import logging
 
 logger = logging.getLogger(__name__)
@@ -70,6 +91,28 @@ class CrewAIService:
         "knowledge_query_completed",
     ]
     
+    # Timeout budget per endpoint (seconds)
+    TIMEOUTS = {
+        "kickoff": settings.CREWAI_TIMEOUT_KICKOFF,
+        "resume": settings.CREWAI_TIMEOUT_RESUME,
+        "status": settings.CREWAI_TIMEOUT_STATUS,
+        "cancel": settings.CREWAI_TIMEOUT_CANCEL,
+    }
+    
+    # Responses that mean "CrewAI did not handle this, try again"
+    RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+    
+    # Of those, the ones CrewAI itself returns before acting on a request
+    # (a gateway 502/504 may arrive after the crew already started)
+    NOT_PROCESSED_STATUS_CODES = {429, 503}
+    
+    # Transport errors raised before the request reached CrewAI
+    NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    
+    # Endpoints that are safe to repeat after any transport error
+    # (as is any request carrying an Idempotency-Key)
+    IDEMPOTENT_ENDPOINTS = {"status", "cancel"}
+    
     def __init__(self):
         self.base_url = settings.CREWAI_API_URL
         self.bearer_token = settings.CREWAI_BEARER_TOKEN
@@ -83,6 +126,246 @@ class CrewAIService:
             raise ValueError("CREWAI_BEARER_TOKEN is not configured")
         if not self.webhook_secret or self.webhook_secret == "dev-secret":
             logger.warning("⚠️  Using default webhook secret! Generate a secure token for production.")
+        
+        # Pooled HTTP client (created in start() or on first use)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        
+        # Request metrics
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.endpoint_metrics: Dict[str, Dict[str, float]] = {
+            endpoint: {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            for endpoint in self.TIMEOUTS
+        }
+        self.retries_total = 0
+        
+        # Circuit breaker (per process)
+        self.breaker = CircuitBreaker(
+            "crewai",
+            failure_threshold=settings.CREWAI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.CREWAI_BREAKER_RESET_TIMEOUT
+        )
+    
+    # =========================================================================
+    # HTTP CLIENT LIFECYCLE
+    # =========================================================================
+    
+    async def start(self):
+        """Open the pooled HTTP client (application startup)."""
+        if self._client is None:
+            self._client = self._create_client()
+    
+    async def close(self):
+        """Close the pooled HTTP client (application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("CrewAI HTTP client closed")
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        Build the shared HTTP client.
+        
+        HTTP/2 needs the optional h2 package (httpx[http2]); without it
+        the client falls back to HTTP/1.1 keep-alive.
+        
+        Returns:
+            Configured httpx.AsyncClient
+        """
+        self.http2 = settings.CREWAI_HTTP2
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("⚠️  CREWAI_HTTP2 is set but h2 is not installed - using HTTP/1.1")
+                self.http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.CREWAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CREWAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.CREWAI_KEEPALIVE_EXPIRY
+        )
+        
+        logger.info(
+            f"CrewAI HTTP client initialized "
+            f"(http2={self.http2}, max_connections={limits.max_connections})"
+        )
+        
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self._get_headers(),
+            limits=limits,
+            http2=self.http2,
+            timeout=httpx.Timeout(
+                settings.CREWAI_TIMEOUT_STATUS,
+                connect=settings.CREWAI_CONNECT_TIMEOUT
+            )
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use if start() was not called."""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+    
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        path: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the circuit breaker, retrying transient failures.
+        
+        Args:
+            endpoint: Endpoint name (key of TIMEOUTS)
+            method: HTTP method
+            path: Path relative to CREWAI_API_URL
+            **kwargs: Passed to httpx (json, params, ...)
+        
+        Returns:
+            HTTP response (status not checked; may be the last retryable error)
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+            httpx.RequestError: If the last attempt failed in transport
+        """
+        attempts = max(1, settings.CREWAI_RETRY_ATTEMPTS)
+        idempotent = (
+            endpoint in self.IDEMPOTENT_ENDPOINTS
+            or "Idempotency-Key" in (kwargs.get("headers") or {})
+        )
+        retry_statuses = self.RETRYABLE_STATUS_CODES if idempotent else self.NOT_PROCESSED_STATUS_CODES
+        
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            last_attempt = attempt + 1 >= attempts
+            
+            try:
+                response = await self._send(endpoint, method, path, **kwargs)
+            except httpx.RequestError as e:
+                self.breaker.record_failure()
+                if last_attempt or not (idempotent or isinstance(e, self.NOT_SENT_ERRORS)):
+                    raise
+                delay = self._retry_delay(attempt)
+                reason = type(e).__name__
+            else:
+                if response.status_code < 500 and response.status_code not in self.RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                
+                self.breaker.record_failure()
+                if last_attempt or response.status_code not in retry_statuses:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+            
+            self.retries_total += 1
+            logger.warning(
+                f"⚠️  CrewAI {endpoint} failed ({reason}), "
+                f"retry {attempt + 1}/{attempts - 1} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+        
+        raise AssertionError("unreachable")
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Backoff delay for a retry, honouring a numeric Retry-After header."""
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.CREWAI_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        return backoff_delay(
+            attempt, settings.CREWAI_RETRY_BASE_DELAY, settings.CREWAI_RETRY_MAX_DELAY
+        )
+    
+    async def _send(
+        self,
+        endpoint: str,
+        method: str,
+        path: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send one request through the shared client with the endpoint's budget.
+        
+        Args:
+            endpoint: Endpoint name (key of TIMEOUTS)
+            method: HTTP method
+            path: Path relative to CREWAI_API_URL
+            **kwargs: Passed to httpx (json, params, ...)
+        
+        Returns:
+            HTTP response (status not checked)
+        """
+        budget = self.TIMEOUTS[endpoint]
+        timeout = httpx.Timeout(
+            budget,
+            connect=min(settings.CREWAI_CONNECT_TIMEOUT, budget),
+            pool=min(settings.CREWAI_POOL_TIMEOUT, budget)
+        )
+        metrics = self.endpoint_metrics[endpoint]
+        
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return await self.client.request(method, path, timeout=timeout, **kwargs)
+        except Exception:
+            metrics["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            metrics["requests"] += 1
+            metrics["total_seconds"] += elapsed
+            metrics["max_seconds"] = max(metrics["max_seconds"], elapsed)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Connection pool utilisation and per-endpoint request metrics.
+        
+        Returns:
+            Dict with pool limits, open/idle connections, in-flight requests
+            and per-endpoint counts and latencies
+        """
+        pool = {
+            "max_connections": settings.CREWAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.CREWAI_MAX_KEEPALIVE_CONNECTIONS,
+            "http2": self.http2,
+            "open": self._client is not None,
+        }
+        
+        # httpcore does not expose pool stats publicly; best effort only
+        try:
+            connections = self._client._transport._pool.connections if self._client else []
+            pool["connections"] = len(connections)
+            pool["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        except AttributeError:
+            pass
+        
+        endpoints = {}
+        for endpoint, m in self.endpoint_metrics.items():
+            endpoints[endpoint] = {
+                "timeout_seconds": self.TIMEOUTS[endpoint],
+                "requests": int(m["requests"]),
+                "errors": int(m["errors"]),
+                "avg_ms": round(m["total_seconds"] / m["requests"] * 1000, 1) if m["requests"] else None,
+                "max_ms": round(m["max_seconds"] * 1000, 1)
+            }
+        
+        return {
+            "pool": pool,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "retries_total": self.retries_total,
+            "endpoints": endpoints,
+            "circuit_breaker": self.breaker.get_state()
+        }
     
     def _get_headers(self) -> Dict[str, str]:
         """
@@ -185,20 +468,17 @@ class CrewAIService:
         logger.debug(f"  - Events: {len(payload['webhooks']['events'])} subscribed")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/kickoff",
-                    json=payload,
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                kickoff_id = result.get("kickoff_id")
-                
-                logger.info(f"✅ Crew kickoff successful! kickoff_id: {kickoff_id}")
-                return result
-                
+            # One kickoff per execution, even if the request is repeated
+            headers = {"Idempotency-Key": f"kickoff-{execution_id}"}
+            response = await self._request("kickoff", "POST", "/kickoff", json=payload, headers=headers)
+            response.raise_for_status()
+            
+            result = response.json()
+            kickoff_id = result.get("kickoff_id")
+            
+            logger.info(f"✅ Crew kickoff successful! kickoff_id: {kickoff_id}")
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"❌ CrewAI kickoff failed with status {e.response.status_code}")
             logger.error(f"Response: {e.response.text}")
@@ -206,6 +486,9 @@ class CrewAIService:
         except httpx.RequestError as e:
             logger.error(f"❌ CrewAI request failed: {str(e)}")
             raise
+        except CircuitOpenError as e:
+            logger.warning(f"⚠️  CrewAI kickoff refused: {e}")
+            raise
         except Exception as e:
             logger.error(f"❌ Unexpected error during kickoff: {str(e)}")
             raise
@@ -215,7 +498,8 @@ class CrewAIService:
         crewai_execution_id: str,
         task_id: str,
         human_feedback: str,
-        is_approve: bool
+        is_approve: bool,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Resume a crew execution after HITL checkpoint approval/rejection.
@@ -235,6 +519,8 @@ class CrewAIService:
             task_id: The task ID from the HITL webhook payload
             human_feedback: User's feedback/comments on the checkpoint
             is_approve: True to approve, False to reject and request revision
+            idempotency_key: Sent as Idempotency-Key so repeated deliveries
+                of the same decision can be deduplicated
         
         Returns:
             Dict containing resume confirmation
@@ -263,22 +549,20 @@ class CrewAIService:
         logger.debug("⚠️  Re-providing webhook URLs (required for continued notifications)")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/resume",
-                    json=payload,
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"✅ Crew resume successful!")
-                
-                if not is_approve:
-                    logger.info("   Agent will retry task with feedback")
-                
-                return result
-                
+            headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+            response = await self._request(
+                "resume", "POST", "/resume", json=payload, headers=headers
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"✅ Crew resume successful!")
+            
+            if not is_approve:
+                logger.info("   Agent will retry task with feedback")
+            
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"❌ CrewAI resume failed with status {e.response.status_code}")
             logger.error(f"Response: {e.response.text}")
@@ -286,6 +570,9 @@ class CrewAIService:
         except httpx.RequestError as e:
             logger.error(f"❌ CrewAI request failed: {str(e)}")
             raise
+        except CircuitOpenError as e:
+            logger.warning(f"⚠️  CrewAI resume refused: {e}")
+            raise
         except Exception as e:
             logger.error(f"❌ Unexpected error during resume: {str(e)}")
             raise
@@ -308,18 +595,16 @@ class CrewAIService:
         logger.debug(f"📊 Checking status for execution: {crewai_execution_id}")
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/status/{crewai_execution_id}",
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                
-                status_data = response.json()
-                logger.debug(f"Status: {status_data.get('status')}")
-                
-                return status_data
-                
+            response = await self._request(
+                "status", "GET", f"/status/{crewai_execution_id}"
+            )
+            response.raise_for_status()
+            
+            status_data = response.json()
+            logger.debug(f"Status: {status_data.get('status')}")
+            
+            return status_data
+            
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.error(f"❌ Execution not found: {crewai_execution_id}")
@@ -350,16 +635,14 @@ class CrewAIService:
         logger.info(f"🛑 Attempting to cancel execution: {crewai_execution_id}")
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/cancel/{crewai_execution_id}",
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                
-                logger.info(f"✅ Execution cancelled successfully")
-                return True
-                
+            response = await self._request(
+                "cancel", "POST", f"/cancel/{crewai_execution_id}"
+            )
+            response.raise_for_status()
+            
+            logger.info(f"✅ Execution cancelled successfully")
+            return True
+            
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.warning(f"⚠️  Execution not found: {crewai_execution_id}")
@@ -376,10 +659,15 @@ class CrewAIService:
             return False
 
 
+# Application-scoped instance (created on first use; configuration errors
+# surface when a route needs CrewAI, as before)
+_crewai_service: Optional[CrewAIService] = None
+
+
 # Dependency for FastAPI routes
 def get_crewai_service() -> CrewAIService:
     """
-    FastAPI dependency to get CrewAI service instance.
+    FastAPI dependency to get the shared CrewAI service instance.
     
     Usage in routes:
         @router.post("/executions/start")
@@ -388,4 +676,13 @@ def get_crewai_service() -> CrewAIService:
         ):
             result = await service.kickoff_crew(inputs, execution_id)
     """
-    return CrewAIService()
\ No newline at end of file
+    global _crewai_service
+    if _crewai_service is None:
+        _crewai_service = CrewAIService()
+    return _crewai_service
+
+
+async def close_crewai_service():
+    """Close the shared CrewAI service's HTTP client (application shutdown)."""
+    if _crewai_service is not None:
+        await _crewai_service.close()
\ No newline at end of file
@@ -0,0 +1,298 @@
+# api/services/jwks.py
+"""
+Cognito Token Verification - RS256 against the user pool's JWKS
+
+Cognito signs ID and access tokens with RS256 keys published at
+https://cognito-idp.{region}.amazonaws.com/{pool_id}/.well-known/jwks.json
+
+Key cache (JWKSCache):
+- Keys are cached in process for COGNITO_JWKS_CACHE_TTL seconds
+- A token signed with an unknown kid triggers a refetch (key rotation),
+  at most once per COGNITO_JWKS_MIN_REFRESH_INTERVAL so garbage kids
+  can't hammer Cognito
+- Concurrent refetches share one request (single-flight)
+- If a refetch fails, the keys we already have keep being used (stale);
+  only a token whose key we have never seen is refused
+
+Claims cache (CognitoTokenVerifier):
+- Verified claims are kept in a bounded LRU keyed by the SHA-256 of the
+  token, until the token's exp, so repeated requests with the same bearer
+  token skip the signature check
+
+References:
+- https://docs.aws.amazon.com/cognito/latest/developerguide/amazon-cognito-user-pools-using-tokens-verifying-a-jwt.html
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+import jwt
+from jwt.algorithms import RSAAlgorithm
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSUnavailableError(RuntimeError):
+    """Raised when signing keys can't be fetched and none are cached."""
+
+
+class JWKSCache:
+    """
+    In-process cache of a JWKS endpoint's public keys.
+
+    Keys are parsed once per fetch; lookups are dict reads.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = settings.COGNITO_JWKS_CACHE_TTL,
+        min_refresh_interval: float = settings.COGNITO_JWKS_MIN_REFRESH_INTERVAL,
+        timeout: float = settings.COGNITO_JWKS_TIMEOUT
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None  # last successful fetch (monotonic)
+        self._attempted_at: Optional[float] = None  # last fetch attempt
+        self._refresh: Optional[asyncio.Task] = None
+
+        # Counters
+        self.fetches_total = 0
+        self.fetch_errors_total = 0
+        self.stale_served_total = 0
+
+    def _is_fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    async def get_key(self, kid: str) -> Any:
+        """
+        Public key for a kid.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            RSA public key
+
+        Raises:
+            jwt.InvalidTokenError: If the kid is not in the key set
+            JWKSUnavailableError: If keys can't be fetched and none are cached
+        """
+        if kid in self._keys and self._is_fresh():
+            return self._keys[kid]
+
+        # A fetch is already running: wait for it instead of deciding early
+        if self._refresh is not None and not self._refresh.done():
+            try:
+                await asyncio.shield(self._refresh)
+            except JWKSUnavailableError:
+                pass
+        else:
+            recently_attempted = (
+                self._attempted_at is not None
+                and time.monotonic() - self._attempted_at < self.min_refresh_interval
+            )
+            if not recently_attempted:
+                # Expired cache, or a kid we haven't seen (key rotation)
+                try:
+                    await self._refresh_keys()
+                except JWKSUnavailableError:
+                    if kid not in self._keys:
+                        raise
+
+        if kid not in self._keys:
+            if not self._keys:
+                raise JWKSUnavailableError("No signing keys available")
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+
+        if not self._is_fresh():
+            self.stale_served_total += 1
+            logger.warning(f"⚠️  Serving stale JWKS key {kid} (refresh failed)")
+        return self._keys[kid]
+
+    async def _refresh_keys(self):
+        """Refetch the key set; concurrent callers share one request."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch())
+        # Shield: a cancelled request must not cancel the shared fetch
+        await asyncio.shield(self._refresh)
+
+    async def _fetch(self):
+        self._attempted_at = time.monotonic()
+        self.fetches_total += 1
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                jwks = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self.fetch_errors_total += 1
+            logger.error(f"❌ JWKS fetch from {self.url} failed: {e}")
+            raise JWKSUnavailableError(f"Could not fetch signing keys: {e}") from e
+
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") != "RSA" or "kid" not in jwk:
+                continue
+            try:
+                keys[jwk["kid"]] = RSAAlgorithm.from_jwk(jwk)
+            except (jwt.InvalidKeyError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️  Skipping invalid JWK {jwk.get('kid')}: {e}")
+
+        if not keys:
+            self.fetch_errors_total += 1
+            raise JWKSUnavailableError("JWKS contained no usable RSA keys")
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info(f"🔑 Loaded {len(keys)} signing keys from JWKS")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "fresh": self._is_fresh(),
+            "fetches_total": self.fetches_total,
+            "fetch_errors_total": self.fetch_errors_total,
+            "stale_served_total": self.stale_served_total,
+        }
+
+
+class CognitoTokenVerifier:
+    """
+    Verifies Cognito ID and access tokens.
+
+    Checks: RS256 signature (JWKS), exp, iss (the user pool), token_use,
+    and the app client (aud for ID tokens, client_id for access tokens)
+    when COGNITO_CLIENT_ID is set.
+    """
+
+    ALGORITHMS = ["RS256"]
+
+    def __init__(
+        self,
+        region: str,
+        user_pool_id: str,
+        client_id: Optional[str] = None,
+        cache_size: int = settings.COGNITO_TOKEN_CACHE_SIZE
+    ):
+        self.issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.client_id = client_id
+        self.jwks = JWKSCache(f"{self.issuer}/.well-known/jwks.json")
+
+        self.cache_size = cache_size
+        # sha256(token) -> (claims, exp)
+        self._claims: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+        # Counters
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its claims.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Verified claims (a copy; safe to modify)
+
+        Raises:
+            jwt.PyJWTError: If the token is invalid or expired
+            JWKSUnavailableError: If signing keys can't be fetched
+        """
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+
+        cached = self._claims.get(token_hash)
+        if cached is not None:
+            claims, exp = cached
+            if time.time() < exp:
+                self._claims.move_to_end(token_hash)
+                self.cache_hits += 1
+                return dict(claims)
+            del self._claims[token_hash]
+            raise jwt.ExpiredSignatureError("Signature has expired")
+
+        self.cache_misses += 1
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") not in self.ALGORITHMS:
+            raise jwt.InvalidAlgorithmError(f"Unsupported algorithm: {header.get('alg')}")
+        kid = header.get("kid")
+        if not kid:
+            raise jwt.InvalidTokenError("Token has no kid")
+
+        key = await self.jwks.get_key(kid)
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=self.ALGORITHMS,
+            issuer=self.issuer,
+            options={"require": ["exp", "iss", "sub"], "verify_aud": False}
+        )
+        self._check_client(claims)
+
+        self._claims[token_hash] = (claims, float(claims["exp"]))
+        if len(self._claims) > self.cache_size:
+            self._claims.popitem(last=False)
+
+        return dict(claims)
+
+    def _check_client(self, claims: Dict[str, Any]):
+        """token_use and app client checks (Cognito puts the client in different claims)."""
+        token_use = claims.get("token_use")
+        if token_use not in ("id", "access"):
+            raise jwt.InvalidTokenError(f"Unexpected token_use: {token_use}")
+
+        if self.client_id:
+            client = claims.get("aud") if token_use == "id" else claims.get("client_id")
+            if client != self.client_id:
+                raise jwt.InvalidAudienceError("Token was issued for a different app client")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "cached_tokens": len(self._claims),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "jwks": self.jwks.get_metrics(),
+        }
+
+
+# Application-scoped instance (created on first use)
+_token_verifier: Optional[CognitoTokenVerifier] = None
+
+
+def get_token_verifier() -> CognitoTokenVerifier:
+    """
+    Get the shared Cognito token verifier.
+
+    Uses the pool and client IDs the Cognito service resolved at startup,
+    falling back to COGNITO_USER_POOL_ID / COGNITO_CLIENT_ID.
+
+    Raises:
+        ValueError: If no user pool is configured or resolved
+    """
+    global _token_verifier
+    if _token_verifier is None:
+        from api.services.cognito import get_cognito_service
+
+        cognito = get_cognito_service()
+        user_pool_id = settings.COGNITO_USER_POOL_ID or cognito.user_pool_id
+        if not user_pool_id:
+            raise ValueError("COGNITO_USER_POOL_ID must be set to verify Cognito tokens")
+        _token_verifier = CognitoTokenVerifier(
+            region=settings.AWS_REGION,
+            user_pool_id=user_pool_id,
+            client_id=settings.COGNITO_CLIENT_ID or cognito.client_id
+        )
+    return _token_verifier
@@ -0,0 +1,443 @@
+# api/services/outbox.py
+"""
+CrewAI Outbox - Durable delivery of CrewAI calls triggered by user decisions
+
+Checkpoint approvals/rejections write a crewai_outbox row in the same
+transaction as the decision itself, so "approved" and "resume CrewAI"
+can never get out of step. The endpoint returns as soon as that commit
+succeeds; this dispatcher delivers the call afterwards.
+
+Delivery:
+- Due rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased
+  (next_attempt_at pushed forward), so several API workers can dispatch
+  concurrently without delivering the same row twice at once
+- Failures are retried with jittered exponential backoff up to
+  OUTBOX_MAX_ATTEMPTS; an open CrewAI circuit postpones without using up
+  an attempt
+- Each row's dedup_key is unique and sent to CrewAI as Idempotency-Key,
+  so a redelivery after a crash mid-call can be deduplicated
+- A row that fails permanently re-opens the checkpoint for review (unless
+  the task already has a newer pending checkpoint)
+- No database connection is held while CrewAI is being called
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+import httpx
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from api.config import settings
+from api.database import AsyncSessionLocal
+from api.models.activity import AgentActivity, ActivityType
+from api.models.checkpoint import HITLCheckpoint, CheckpointStatus
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.outbox import CrewAIOutbox, OutboxStatus
+from api.services.crewai import get_crewai_service
+from api.services.resilience import CircuitOpenError, backoff_delay
+from api.services.sse import get_sse_manager
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Background dispatcher for the crewai_outbox table.
+
+    Features:
+    - Transactional enqueue (add_resume runs in the caller's session)
+    - Immediate dispatch on notify(), polling as a fallback
+    - Leased, SKIP LOCKED claims (safe with multiple workers)
+    - Retries with backoff, permanent-failure handling
+    """
+
+    # Operations
+    OPERATION_RESUME = "resume"
+
+    def __init__(
+        self,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        lease_seconds: float = settings.OUTBOX_LEASE_SECONDS
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+        # Counters (per process)
+        self.dispatched_total = 0
+        self.retried_total = 0
+        self.failed_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Start the dispatch loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="crewai-outbox")
+            logger.info("✅ CrewAI outbox dispatcher started")
+
+    async def stop(self):
+        """Stop the dispatch loop. Undelivered rows stay pending."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info("🛑 CrewAI outbox dispatcher stopped")
+
+    def notify(self):
+        """Wake the dispatcher after committing new outbox rows."""
+        self._wake.set()
+
+    # =========================================================================
+    # PRODUCER
+    # =========================================================================
+
+    async def add_resume(
+        self,
+        db: AsyncSession,
+        checkpoint: HITLCheckpoint,
+        execution: CrewExecution,
+        feedback: str,
+        is_approve: bool,
+        reviewer_name: str
+    ) -> CrewAIOutbox:
+        """
+        Stage a resume call in the caller's transaction (not committed here).
+
+        The dedup key counts earlier decisions on the same checkpoint, so a
+        re-review after a failed resume gets a new key while two concurrent
+        decisions on the same review collide on the unique index.
+
+        Args:
+            db: Caller's session (committed by the caller)
+            checkpoint: Checkpoint being decided
+            execution: Checkpoint's execution
+            feedback: Reviewer feedback
+            is_approve: Approval (True) or rejection (False)
+            reviewer_name: Reviewer display name (for the SSE event)
+
+        Returns:
+            The staged outbox row
+        """
+        result = await db.execute(
+            select(func.count()).select_from(CrewAIOutbox).where(
+                CrewAIOutbox.checkpoint_id == checkpoint.checkpoint_id
+            )
+        )
+        decision_number = result.scalar() + 1
+
+        entry = CrewAIOutbox(
+            dedup_key=f"resume:{checkpoint.checkpoint_id}:{decision_number}",
+            operation=self.OPERATION_RESUME,
+            execution_id=execution.execution_id,
+            checkpoint_id=checkpoint.checkpoint_id,
+            payload={
+                "crewai_execution_id": execution.crewai_execution_id,
+                "task_id": checkpoint.task_id,
+                "human_feedback": feedback,
+                "is_approve": is_approve,
+                "reviewer_name": reviewer_name
+            }
+        )
+        db.add(entry)
+        return entry
+
+    # =========================================================================
+    # DISPATCH
+    # =========================================================================
+
+    async def _run(self):
+        """Dispatch due rows; sleep until notified or the poll interval."""
+        while True:
+            self._wake.clear()
+            try:
+                claimed = await self.dispatch_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Outbox dispatch error: {e}")
+                claimed = 0
+
+            if claimed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_due(self) -> int:
+        """
+        Claim and deliver one batch of due rows.
+
+        Returns:
+            Number of rows claimed
+        """
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CrewAIOutbox).where(
+                    CrewAIOutbox.status == OutboxStatus.PENDING,
+                    CrewAIOutbox.next_attempt_at <= now
+                ).order_by(
+                    CrewAIOutbox.next_attempt_at
+                ).limit(self.batch_size).with_for_update(skip_locked=True)
+            )
+            entries = result.scalars().all()
+
+            # Lease: other dispatchers skip these until the lease runs out
+            for entry in entries:
+                entry.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+            await db.commit()
+
+        if entries:
+            await asyncio.gather(*(self._dispatch(entry.outbox_id) for entry in entries))
+
+        return len(entries)
+
+    async def _dispatch(self, outbox_id: UUID):
+        """
+        Deliver one claimed row and record the outcome.
+
+        No session is held across the CrewAI call (it can take the
+        timeout times the retry attempts): the row is read in one short
+        session and the outcome written in another.
+        """
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(CrewAIOutbox, outbox_id)
+            if not entry or entry.status != OutboxStatus.PENDING:
+                return
+
+        error: Optional[Exception] = None
+        try:
+            if entry.operation == self.OPERATION_RESUME:
+                await self._call_resume(entry)
+            else:
+                raise ValueError(f"Unknown outbox operation: {entry.operation}")
+        except Exception as e:
+            error = e
+
+        events = await self._record_outcome(outbox_id, error)
+
+        # Broadcast only after the outcome is committed
+        sse_manager = get_sse_manager()
+        for execution_id, event_type, data in events:
+            await sse_manager.broadcast(execution_id=execution_id, event_type=event_type, data=data)
+
+    async def _record_outcome(self, outbox_id: UUID, error: Optional[Exception]) -> List[tuple]:
+        """Mark a delivered row DISPATCHED, or schedule its retry / fail it."""
+        events: List[tuple] = []
+
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(CrewAIOutbox, outbox_id)
+            if not entry or entry.status != OutboxStatus.PENDING:
+                return []
+
+            if error is None:
+                entry.status = OutboxStatus.DISPATCHED
+                entry.dispatched_at = datetime.now(timezone.utc)
+                events = await self._record_resumed(db, entry)
+                self.dispatched_total += 1
+                logger.info(f"✅ Outbox {entry.dedup_key} dispatched")
+
+            elif isinstance(error, CircuitOpenError):
+                # CrewAI known to be down - postpone without using an attempt
+                entry.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=error.retry_after)
+
+            else:
+                entry.attempts += 1
+                entry.last_error = str(error)[:2000]
+
+                if self._is_permanent(error) or entry.attempts >= self.max_attempts:
+                    logger.error(f"❌ Outbox {entry.dedup_key} failed permanently: {error}")
+                    entry.status = OutboxStatus.FAILED
+                    events = await self._fail_resume(db, entry)
+                    self.failed_total += 1
+                else:
+                    delay = backoff_delay(
+                        entry.attempts - 1,
+                        settings.OUTBOX_RETRY_BASE_DELAY,
+                        settings.OUTBOX_RETRY_MAX_DELAY
+                    )
+                    entry.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                    self.retried_total += 1
+                    logger.warning(
+                        f"⚠️  Outbox {entry.dedup_key} attempt {entry.attempts} failed, "
+                        f"retrying in {delay:.1f}s: {error}"
+                    )
+
+            try:
+                await db.commit()
+            except IntegrityError:
+                # A newer pending checkpoint for the task appeared while the
+                # old one was being re-opened: fail the row without re-opening
+                await db.rollback()
+                logger.warning(f"⚠️  Outbox {outbox_id}: checkpoint not re-opened (task has a newer pending checkpoint)")
+                entry = await db.get(CrewAIOutbox, outbox_id)
+                entry.status = OutboxStatus.FAILED
+                entry.attempts += 1
+                entry.last_error = str(error)[:2000]
+                await db.commit()
+                events = []
+
+        return events
+
+    async def _call_resume(self, entry: CrewAIOutbox):
+        """Call CrewAI resume (no database session is used)."""
+        payload = entry.payload
+
+        await get_crewai_service().resume_crew(
+            crewai_execution_id=payload["crewai_execution_id"],
+            task_id=payload["task_id"],
+            human_feedback=payload["human_feedback"],
+            is_approve=payload["is_approve"],
+            idempotency_key=entry.dedup_key
+        )
+
+    async def _record_resumed(self, db: AsyncSession, entry: CrewAIOutbox) -> List[tuple]:
+        """Mark the execution RUNNING after a successful resume."""
+        execution = await db.get(CrewExecution, entry.execution_id)
+        if execution and execution.status == ExecutionStatus.AWAITING_APPROVAL:
+            execution.status = ExecutionStatus.RUNNING
+
+        return [(
+            entry.execution_id,
+            "status",
+            {
+                "execution_id": str(entry.execution_id),
+                "status": execution.status.value if execution else None,
+                "checkpoint_id": str(entry.checkpoint_id),
+                "crew_resumed": True,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )]
+
+    async def _fail_resume(self, db: AsyncSession, entry: CrewAIOutbox) -> List[tuple]:
+        """Re-open the checkpoint so the reviewer can decide again."""
+        result = await db.execute(
+            select(HITLCheckpoint).where(
+                HITLCheckpoint.checkpoint_id == entry.checkpoint_id
+            ).options(selectinload(HITLCheckpoint.execution))
+        )
+        checkpoint = result.scalars().first()
+
+        if not checkpoint or checkpoint.status not in (CheckpointStatus.APPROVED, CheckpointStatus.REJECTED):
+            return []
+
+        # CrewAI may have raised a newer checkpoint for the task since; only
+        # one may be pending (ix_hitl_checkpoints_pending_task)
+        result = await db.execute(
+            select(HITLCheckpoint.checkpoint_id).where(
+                HITLCheckpoint.execution_id == checkpoint.execution_id,
+                HITLCheckpoint.task_id == checkpoint.task_id,
+                HITLCheckpoint.status == CheckpointStatus.PENDING
+            ).limit(1)
+        )
+        if result.scalar() is not None:
+            logger.warning(
+                f"⚠️  Not re-opening checkpoint {checkpoint.checkpoint_id}: "
+                f"task {checkpoint.task_id} already has a pending checkpoint"
+            )
+            return []
+
+        checkpoint.status = CheckpointStatus.PENDING
+        checkpoint.reviewed_by = None
+        checkpoint.reviewed_at = None
+        checkpoint.execution.status = ExecutionStatus.AWAITING_APPROVAL
+
+        db.add(AgentActivity(
+            execution_id=entry.execution_id,
+            agent_name="System",
+            activity_type=ActivityType.ERROR,
+            message=f"Failed to resume crew execution: {entry.last_error}",
+            activity_metadata={
+                "checkpoint_id": str(entry.checkpoint_id),
+                "outbox_id": str(entry.outbox_id)
+            }
+        ))
+
+        return [(
+            entry.execution_id,
+            "checkpoint",
+            {
+                "checkpoint_id": str(checkpoint.checkpoint_id),
+                "checkpoint_type": checkpoint.checkpoint_type.value,
+                "task_id": checkpoint.task_id,
+                "requires_approval": True,
+                "error": entry.last_error,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )]
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """Client errors (4xx other than 429) will not succeed on retry."""
+        if isinstance(error, httpx.HTTPStatusError):
+            code = error.response.status_code
+            return 400 <= code < 500 and code != 429
+        return isinstance(error, (ValueError, KeyError))
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    async def get_metrics(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Outbox backlog and dispatch counters.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dict with pending/failed row counts, oldest pending age and
+            per-process counters
+        """
+        result = await db.execute(
+            select(CrewAIOutbox.status, func.count(), func.min(CrewAIOutbox.created_at)).where(
+                CrewAIOutbox.status != OutboxStatus.DISPATCHED
+            ).group_by(CrewAIOutbox.status)
+        )
+        rows = {row[0]: (row[1], row[2]) for row in result.all()}
+
+        pending, oldest = rows.get(OutboxStatus.PENDING, (0, None))
+        oldest_pending_seconds = (
+            round((datetime.now(timezone.utc) - oldest).total_seconds(), 1) if oldest else None
+        )
+
+        return {
+            "running": self._task is not None,
+            "pending": pending,
+            "failed": rows.get(OutboxStatus.FAILED, (0, None))[0],
+            "oldest_pending_seconds": oldest_pending_seconds,
+            "dispatched_total": self.dispatched_total,
+            "retried_total": self.retried_total,
+            "failed_total": self.failed_total,
+        }
+
+
+# Global outbox dispatcher instance
+outbox_dispatcher = OutboxDispatcher()
+
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """
+    Get the global outbox dispatcher instance.
+
+    Used as FastAPI dependency.
+    """
+    return outbox_dispatcher
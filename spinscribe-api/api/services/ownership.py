@@ -0,0 +1,337 @@
+# api/services/ownership.py
+"""
+Ownership - Single-lookup access checks for executions and checkpoints
+
+crew_executions and hitl_checkpoints carry a denormalized owner_id
+(clients.owner_id), so "does this user own this execution" is one
+indexed lookup instead of a CrewExecution → Project → Client join.
+
+Consistency:
+- On insert, owner_id is filled from the project's client (or the
+  execution, for checkpoints) when the caller didn't set it
+- When a client's owner_id changes, its executions and checkpoints are
+  re-pointed in the same flush
+- Rows that predate the column are backfilled by SCHEMA_UPGRADES
+
+OwnershipCache remembers (user, execution) pairs that passed the check,
+so routes that only need authorization (message history) skip the
+database. Only positive results are cached. The cache is cleared after
+any commit that changes a client's owner or deletes a client, project
+or execution.
+
+Backends (OWNERSHIP_CACHE_BACKEND):
+- "local": the clear only reaches this process; other workers keep a
+  revoked grant until it expires, so OWNERSHIP_CACHE_TTL_SECONDS (a few
+  seconds) is the staleness bound
+- "redis": the clear is also published on OWNERSHIP_CACHE_REDIS_CHANNEL
+  and every worker drops its entries when it arrives (and whenever its
+  subscription breaks, since a clear may have been missed)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.models.checkpoint import HITLCheckpoint
+from api.models.client import Client
+from api.models.execution import CrewExecution
+from api.models.project import Project
+from api.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class OwnershipCache:
+    """
+    In-process TTL cache of (user_id, execution_id) pairs the user owns.
+
+    With the redis backend, clears are broadcast to every worker.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.OWNERSHIP_CACHE_BACKEND,
+        ttl: float = settings.OWNERSHIP_CACHE_TTL_SECONDS,
+        max_size: int = settings.OWNERSHIP_CACHE_MAX_SIZE,
+        redis_channel: str = settings.OWNERSHIP_CACHE_REDIS_CHANNEL
+    ):
+        if backend not in ("local", "redis"):
+            raise ValueError(f"Unknown OWNERSHIP_CACHE_BACKEND: {backend}")
+        self.backend = backend
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis_channel = redis_channel
+
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+        # (user_id, execution_id) -> expires_at (monotonic)
+        self._entries: "OrderedDict[Tuple[UUID, UUID], float]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.clears = 0
+        self.errors = 0
+
+    async def start(self):
+        """Subscribe to clears from other workers (redis backend)."""
+        if self.backend != "redis" or self._listener is not None:
+            return
+        self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.redis_channel)
+        self._listener = asyncio.create_task(self._listen(), name="ownership-cache-listener")
+        logger.info(f"Ownership cache: redis (channel {self.redis_channel})")
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def _listen(self):
+        """Clear the local entries whenever any worker publishes a clear."""
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    self.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A clear may have been lost while disconnected
+                self.errors += 1
+                self.clear()
+                logger.error(f"❌ Ownership cache listener error: {e}")
+                await asyncio.sleep(1)
+
+    def contains(self, user_id: UUID, execution_id: UUID) -> bool:
+        key = (user_id, execution_id)
+        expires_at = self._entries.get(key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            del self._entries[key]
+        self.misses += 1
+        return False
+
+    def add(self, user_id: UUID, execution_id: UUID):
+        key = (user_id, execution_id)
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop this process's entries."""
+        self.clears += 1
+        self._entries.clear()
+
+    async def invalidate(self):
+        """Drop all entries (every worker with the redis backend)."""
+        self.clear()
+        if self.backend == "redis":
+            try:
+                await get_redis().publish(self.redis_channel, "clear")
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️  Ownership cache invalidation failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "clears": self.clears,
+            "errors": self.errors,
+        }
+
+
+# Global cache instance
+ownership_cache = OwnershipCache()
+
+
+def get_ownership_cache() -> OwnershipCache:
+    """
+    Get the global ownership cache instance.
+
+    Used as FastAPI dependency.
+    """
+    return ownership_cache
+
+
+# =============================================================================
+# OWNERSHIP CHECKS
+# =============================================================================
+
+async def get_owned_execution(
+    db: AsyncSession,
+    execution_id: UUID,
+    user_id: UUID,
+    options: Iterable = ()
+) -> Optional[CrewExecution]:
+    """
+    Load an execution if the user owns it (one primary key lookup).
+
+    Args:
+        db: Database session
+        execution_id: UUID of the execution
+        user_id: UUID of the user
+        options: Loader options for the query (e.g. selectinload)
+
+    Returns:
+        CrewExecution or None if not found or not owned
+    """
+    result = await db.execute(
+        select(CrewExecution).where(
+            CrewExecution.execution_id == execution_id,
+            CrewExecution.owner_id == user_id
+        ).options(*options)
+    )
+    execution = result.scalars().first()
+    if execution is not None:
+        ownership_cache.add(user_id, execution_id)
+    return execution
+
+
+async def user_owns_execution(db: AsyncSession, execution_id: UUID, user_id: UUID) -> bool:
+    """
+    Whether the user owns an execution (cache hit or index-only lookup).
+
+    Args:
+        db: Database session
+        execution_id: UUID of the execution
+        user_id: UUID of the user
+
+    Returns:
+        True if the execution exists and belongs to the user
+    """
+    if ownership_cache.contains(user_id, execution_id):
+        return True
+    owned = await db.scalar(
+        select(CrewExecution.execution_id).where(
+            CrewExecution.execution_id == execution_id,
+            CrewExecution.owner_id == user_id
+        )
+    )
+    if owned is None:
+        return False
+    ownership_cache.add(user_id, execution_id)
+    return True
+
+
+async def owned_execution_ids(db: AsyncSession, user_id: UUID, execution_ids: Iterable[UUID]) -> Set[UUID]:
+    """
+    Filter execution IDs down to those owned by a user.
+
+    Args:
+        db: Database session
+        user_id: UUID of the user
+        execution_ids: Candidate execution IDs
+
+    Returns:
+        Set of owned execution IDs
+    """
+    candidates = set(execution_ids)
+    owned = {execution_id for execution_id in candidates if ownership_cache.contains(user_id, execution_id)}
+    remaining = candidates - owned
+    if remaining:
+        result = await db.execute(
+            select(CrewExecution.execution_id).where(
+                CrewExecution.execution_id.in_(remaining),
+                CrewExecution.owner_id == user_id
+            )
+        )
+        for execution_id in result.scalars().all():
+            ownership_cache.add(user_id, execution_id)
+            owned.add(execution_id)
+    return owned
+
+
+# =============================================================================
+# CONSISTENCY (ORM events)
+# =============================================================================
+
+_CLEAR_KEY = "ownership_cache_clear"
+
+# Strong references to in-flight invalidations
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+@event.listens_for(CrewExecution, "before_insert")
+def _fill_execution_owner(mapper, connection, target: CrewExecution):
+    """Default an execution's owner to its project's client owner."""
+    if target.owner_id is None:
+        target.owner_id = connection.scalar(
+            select(Client.owner_id).join(
+                Project, Project.client_id == Client.client_id
+            ).where(Project.project_id == target.project_id)
+        )
+
+
+@event.listens_for(HITLCheckpoint, "before_insert")
+def _fill_checkpoint_owner(mapper, connection, target: HITLCheckpoint):
+    """Default a checkpoint's owner to its execution's owner."""
+    if target.owner_id is None:
+        target.owner_id = connection.scalar(
+            select(CrewExecution.owner_id).where(CrewExecution.execution_id == target.execution_id)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _propagate_owner_changes(session: Session, flush_context):
+    """Re-point executions and checkpoints when a client changes owner."""
+    for obj in session.dirty:
+        if not isinstance(obj, Client):
+            continue
+        history = inspect(obj).attrs.owner_id.history
+        if not history.deleted:
+            continue
+        project_ids = select(Project.project_id).where(Project.client_id == obj.client_id).scalar_subquery()
+        execution_ids = select(CrewExecution.execution_id).where(CrewExecution.project_id.in_(project_ids)).scalar_subquery()
+        connection = session.connection()
+        connection.execute(
+            update(CrewExecution).where(CrewExecution.project_id.in_(project_ids)).values(owner_id=obj.owner_id)
+        )
+        connection.execute(
+            update(HITLCheckpoint).where(HITLCheckpoint.execution_id.in_(execution_ids)).values(owner_id=obj.owner_id)
+        )
+        session.info[_CLEAR_KEY] = True
+        logger.info(f"🔑 Client {obj.client_id} executions moved to owner {obj.owner_id}")
+
+    if any(isinstance(obj, (Client, Project, CrewExecution)) for obj in session.deleted):
+        session.info[_CLEAR_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_after_ownership_change(session: Session):
+    if not session.info.pop(_CLEAR_KEY, False):
+        return
+    ownership_cache.clear()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync session outside the event loop: local entries only
+        return
+    task = loop.create_task(ownership_cache.invalidate())
+    _invalidation_tasks.add(task)
+    task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ownership_change(session: Session):
+    session.info.pop(_CLEAR_KEY, None)
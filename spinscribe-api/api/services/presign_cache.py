@@ -0,0 +1,226 @@
+# api/services/presign_cache.py
+"""
+Presigned URL Cache - Reuse download URLs instead of signing per request
+
+The dashboard lists the same brand-voice and style-guide documents over
+and over; each listing used to sign every URL again. A presigned GET URL
+stays valid for its whole lifetime, so it can be handed out again as long
+as enough of that lifetime is left for the client to use it.
+
+Entries are keyed by (bucket, key, expires_in): URLs requested with
+different lifetimes never mix. An entry is reused until
+PRESIGN_CACHE_REUSE_FRACTION of its lifetime has passed, so every URL
+handed out has at least (1 - fraction) * expires_in seconds left.
+
+Tiers:
+- In-process LRU (PRESIGN_CACHE_MAX_SIZE entries), always on
+- Redis (PRESIGN_CACHE_REDIS), shared by every worker; one MGET per
+  lookup batch. Redis failures count as misses
+
+Nothing needs invalidating: a presigned GET URL isn't tied to an object
+version (a replaced document is served by the same URL) and a URL for a
+deleted object simply returns 404 from S3.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Any, Iterable, List, Tuple
+
+from api.config import settings
+from api.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+# (bucket, s3_key)
+ObjectRef = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PresignedURL:
+    """A presigned URL and when it stops working."""
+    url: str
+    signed_at: float  # epoch seconds
+    expires_at: float  # epoch seconds
+
+    @property
+    def expires_in(self) -> int:
+        """Seconds of validity left (rounded down)."""
+        return max(int(self.expires_at - time.time()), 0)
+
+    def to_json(self) -> str:
+        return json.dumps({"url": self.url, "signed_at": self.signed_at, "expires_at": self.expires_at})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "PresignedURL":
+        return cls(**json.loads(raw))
+
+
+class PresignedURLCache:
+    """
+    Two-tier cache of presigned download URLs.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.PRESIGN_CACHE_MAX_SIZE,
+        reuse_fraction: float = settings.PRESIGN_CACHE_REUSE_FRACTION,
+        use_redis: bool = settings.PRESIGN_CACHE_REDIS,
+        redis_prefix: str = settings.PRESIGN_CACHE_REDIS_PREFIX
+    ):
+        if not 0 <= reuse_fraction < 1:
+            raise ValueError("PRESIGN_CACHE_REUSE_FRACTION must be in [0, 1)")
+        self.max_size = max_size
+        self.reuse_fraction = reuse_fraction
+        self.use_redis = use_redis
+        self.redis_prefix = redis_prefix
+
+        # (bucket, key, expires_in) -> PresignedURL
+        self._local: "OrderedDict[Tuple[str, str, int], PresignedURL]" = OrderedDict()
+
+        # Counters
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.signed = 0
+        self.errors = 0
+
+    def _reuse_until(self, url: PresignedURL) -> float:
+        return url.signed_at + (url.expires_at - url.signed_at) * self.reuse_fraction
+
+    def _redis_key(self, bucket: str, s3_key: str, expires_in: int) -> str:
+        return f"{self.redis_prefix}:{expires_in}:{bucket}/{s3_key}"
+
+    def _remember(self, key: Tuple[str, str, int], url: PresignedURL):
+        self._local[key] = url
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get_many(
+        self,
+        objects: Iterable[ObjectRef],
+        expires_in: int,
+        sign: Callable[[List[ObjectRef], int], Awaitable[Dict[ObjectRef, str]]]
+    ) -> Dict[ObjectRef, PresignedURL]:
+        """
+        Presigned URLs for several objects, signing only the misses.
+
+        Args:
+            objects: (bucket, key) pairs
+            expires_in: Requested URL lifetime in seconds
+            sign: Signs a batch of objects; returns {(bucket, key): url}
+
+        Returns:
+            Dict of (bucket, key) -> PresignedURL
+        """
+        now = time.time()
+        found: Dict[ObjectRef, PresignedURL] = {}
+        missing: List[ObjectRef] = []
+
+        for bucket, s3_key in dict.fromkeys(objects):
+            key = (bucket, s3_key, expires_in)
+            url = self._local.get(key)
+            if url is not None and self._reuse_until(url) > now:
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                found[(bucket, s3_key)] = url
+            else:
+                if url is not None:
+                    del self._local[key]
+                missing.append((bucket, s3_key))
+
+        if missing and self.use_redis:
+            missing = await self._get_shared(missing, expires_in, now, found)
+
+        if missing:
+            self.misses += len(missing)
+            signed_at = time.time()
+            urls = await sign(missing, expires_in)
+            fresh = {
+                ref: PresignedURL(url=urls[ref], signed_at=signed_at, expires_at=signed_at + expires_in)
+                for ref in missing
+            }
+            self.signed += len(fresh)
+            for (bucket, s3_key), url in fresh.items():
+                self._remember((bucket, s3_key, expires_in), url)
+            found.update(fresh)
+            if self.use_redis:
+                await self._set_shared(fresh, expires_in)
+
+        return found
+
+    async def get(
+        self,
+        bucket: str,
+        s3_key: str,
+        expires_in: int,
+        sign: Callable[[List[ObjectRef], int], Awaitable[Dict[ObjectRef, str]]]
+    ) -> PresignedURL:
+        """Presigned URL for one object (see get_many)."""
+        return (await self.get_many([(bucket, s3_key)], expires_in, sign))[(bucket, s3_key)]
+
+    async def _get_shared(
+        self,
+        missing: List[ObjectRef],
+        expires_in: int,
+        now: float,
+        found: Dict[ObjectRef, PresignedURL]
+    ) -> List[ObjectRef]:
+        """Fill found from Redis; returns what is still missing."""
+        try:
+            raws = await get_redis().mget([self._redis_key(bucket, s3_key, expires_in) for bucket, s3_key in missing])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Presigned URL cache read failed: {e}")
+            return missing
+
+        still_missing = []
+        for (bucket, s3_key), raw in zip(missing, raws):
+            url = PresignedURL.from_json(raw) if raw else None
+            if url is not None and self._reuse_until(url) > now:
+                self.redis_hits += 1
+                self._remember((bucket, s3_key, expires_in), url)
+                found[(bucket, s3_key)] = url
+            else:
+                still_missing.append((bucket, s3_key))
+        return still_missing
+
+    async def _set_shared(self, urls: Dict[ObjectRef, PresignedURL], expires_in: int):
+        """Store freshly signed URLs in Redis until they stop being reusable."""
+        ttl = max(int(expires_in * self.reuse_fraction), 1)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for (bucket, s3_key), url in urls.items():
+                    pipe.set(self._redis_key(bucket, s3_key, expires_in), url.to_json(), ex=ttl)
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Presigned URL cache write failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "redis": self.use_redis,
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "signed": self.signed,
+            "errors": self.errors,
+        }
+
+
+# Global cache instance
+presign_cache = PresignedURLCache()
+
+
+def get_presign_cache() -> PresignedURLCache:
+    """
+    Get the global presigned URL cache instance.
+
+    Used as FastAPI dependency.
+    """
+    return presign_cache
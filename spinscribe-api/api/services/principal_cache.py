@@ -0,0 +1,234 @@
+# api/services/principal_cache.py
+"""
+Principal Cache - Authenticated user lookups without a query per request
+
+get_current_user runs on every authenticated request (each SSE connect,
+each status poll). It resolves the token's cognito_sub to a UserPrincipal:
+an immutable snapshot of the users row, detached from any session, that
+routers read (user_id, email, name...) but never write. Code that needs
+to modify the user loads the ORM row itself.
+
+Backends (PRINCIPAL_CACHE_BACKEND):
+- "local": bounded in-process LRU with TTL (single worker)
+- "redis": shared JSON entries with TTL, so every worker sees an
+  invalidation at once
+
+Invalidation:
+- PATCH /auth/me invalidates explicitly
+- Any committed change to a User row through the ORM (is_active, profile,
+  last_login_at) invalidates that user's entry after commit
+- Changes made outside the ORM are picked up when the TTL expires
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime
+from typing import Dict, Any, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.models.user import User
+from api.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Read-only snapshot of an authenticated user."""
+    user_id: UUID
+    cognito_sub: str
+    email: str
+    name: str
+    company_name: Optional[str]
+    role: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    last_login_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(**{f.name: getattr(user, f.name) for f in fields(cls)})
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["user_id"] = str(self.user_id)
+        for name in ("created_at", "updated_at", "last_login_at"):
+            if data[name] is not None:
+                data[name] = data[name].isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserPrincipal":
+        data = json.loads(raw)
+        data["user_id"] = UUID(data["user_id"])
+        for name in ("created_at", "updated_at", "last_login_at"):
+            if data[name] is not None:
+                data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
+
+class PrincipalCache:
+    """
+    TTL cache of UserPrincipal keyed by cognito_sub.
+
+    Cache failures (Redis down) are treated as misses; the caller falls
+    back to the database.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.PRINCIPAL_CACHE_BACKEND,
+        ttl: float = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        max_size: int = settings.PRINCIPAL_CACHE_MAX_SIZE,
+        redis_prefix: str = settings.PRINCIPAL_CACHE_REDIS_PREFIX
+    ):
+        if backend not in ("local", "redis"):
+            raise ValueError(f"Unknown PRINCIPAL_CACHE_BACKEND: {backend}")
+        self.backend = backend
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis_prefix = redis_prefix
+
+        # cognito_sub -> (principal, expires_at (monotonic))
+        self._local: "OrderedDict[str, Tuple[UserPrincipal, float]]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _key(self, cognito_sub: str) -> str:
+        return f"{self.redis_prefix}:{cognito_sub}"
+
+    async def get(self, cognito_sub: str) -> Optional[UserPrincipal]:
+        """Cached principal, or None on a miss."""
+        principal = None
+        if self.backend == "redis":
+            try:
+                raw = await get_redis().get(self._key(cognito_sub))
+                principal = UserPrincipal.from_json(raw) if raw else None
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️  Principal cache read failed: {e}")
+        else:
+            entry = self._local.get(cognito_sub)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._local.move_to_end(cognito_sub)
+                    principal = entry[0]
+                else:
+                    del self._local[cognito_sub]
+
+        if principal is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return principal
+
+    async def set(self, principal: UserPrincipal):
+        """Cache a principal for TTL seconds."""
+        if self.backend == "redis":
+            try:
+                await get_redis().set(self._key(principal.cognito_sub), principal.to_json(), ex=max(int(self.ttl), 1))
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️  Principal cache write failed: {e}")
+            return
+
+        self._local[principal.cognito_sub] = (principal, time.monotonic() + self.ttl)
+        self._local.move_to_end(principal.cognito_sub)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def invalidate(self, cognito_sub: str):
+        """Drop a user's entry (all workers with the redis backend)."""
+        self.invalidations += 1
+        self._local.pop(cognito_sub, None)
+        if self.backend == "redis":
+            try:
+                await get_redis().delete(self._key(cognito_sub))
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️  Principal cache invalidation failed for {cognito_sub}: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "local_entries": len(self._local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+# Global cache instance
+principal_cache = PrincipalCache()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """
+    Get the global principal cache instance.
+
+    Used as FastAPI dependency.
+    """
+    return principal_cache
+
+
+# =============================================================================
+# ORM INVALIDATION
+# =============================================================================
+
+_PENDING_KEY = "principal_cache_invalidate"
+
+# Strong references to in-flight invalidations
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context):
+    """Remember users modified or deleted in this flush."""
+    changed: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj):
+            changed.add(obj.cognito_sub)
+            # A changed sub also retires the old key
+            changed.update(sub for sub in inspect(obj).attrs.cognito_sub.history.deleted if sub)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.cognito_sub)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    """Invalidate collected users once the change is committed."""
+    changed = session.info.pop(_PENDING_KEY, None)
+    if not changed:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync session outside the event loop: local entries only
+        for cognito_sub in changed:
+            principal_cache._local.pop(cognito_sub, None)
+        return
+    for cognito_sub in changed:
+        principal_cache._local.pop(cognito_sub, None)
+        task = loop.create_task(principal_cache.invalidate(cognito_sub))
+        _invalidation_tasks.add(task)
+        task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,404 @@
+# api/services/reconciler.py
+"""
+Status Reconciler - Repairs executions whose webhooks never arrived
+
+Execution status normally advances through CrewAI webhooks. If a batch is
+lost, an execution can sit in RUNNING or AWAITING_APPROVAL forever. This
+background task finds executions with no activity for
+RECONCILER_STALE_MINUTES, asks CrewAI for their status and applies
+corrections:
+- CrewAI finished (completed / failed / cancelled) -> same terminal status
+- CrewAI running while we wait for an approval that has no pending
+  checkpoint -> RUNNING
+- CrewAI doesn't know the execution (404) -> FAILED
+
+Each correction is recorded as agent activity and broadcast as a
+"status" SSE event with reconciled=true.
+
+Polling:
+- Candidates are polled in batches, at most RECONCILER_CONCURRENCY at once
+- An execution that is still running when checked is checked again after
+  an interval that doubles each time (up to RECONCILER_MAX_BACKOFF_SECONDS)
+- A round is skipped while the CrewAI circuit breaker is open
+
+Only one replica reconciles at a time: each round runs under a Postgres
+session-level advisory lock (pg_try_advisory_lock). Replicas that don't
+get the lock skip the round.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+from sqlalchemy import select, func, text
+
+from api.config import settings
+from api.database import AsyncSessionLocal, async_engine
+from api.models.activity import AgentActivity, ActivityType
+from api.models.checkpoint import HITLCheckpoint, CheckpointStatus
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.services.crewai import get_crewai_service
+from api.services.resilience import CircuitOpenError
+from api.services.sse import get_sse_manager
+
+logger = logging.getLogger(__name__)
+
+
+class StatusReconciler:
+    """
+    Leader-elected background poller for stale executions.
+
+    Features:
+    - Postgres advisory lock (one active replica)
+    - Batched, concurrency-limited CrewAI status polling
+    - Per-execution exponential backoff
+    - DB corrections broadcast over SSE
+    """
+
+    # Advisory lock key (any constant bigint shared by all replicas)
+    ADVISORY_LOCK_KEY = 0x5350494E_5245434F  # "SPINRECO"
+
+    # CrewAI status values -> our status
+    STATUS_MAP = {
+        "completed": ExecutionStatus.COMPLETED,
+        "complete": ExecutionStatus.COMPLETED,
+        "success": ExecutionStatus.COMPLETED,
+        "succeeded": ExecutionStatus.COMPLETED,
+        "failed": ExecutionStatus.FAILED,
+        "failure": ExecutionStatus.FAILED,
+        "error": ExecutionStatus.FAILED,
+        "cancelled": ExecutionStatus.CANCELLED,
+        "canceled": ExecutionStatus.CANCELLED,
+        "revoked": ExecutionStatus.CANCELLED,
+        "running": ExecutionStatus.RUNNING,
+        "started": ExecutionStatus.RUNNING,
+        "in_progress": ExecutionStatus.RUNNING,
+        "pending": ExecutionStatus.RUNNING,
+    }
+
+    TERMINAL_STATUSES = {
+        ExecutionStatus.COMPLETED,
+        ExecutionStatus.FAILED,
+        ExecutionStatus.CANCELLED,
+    }
+
+    def __init__(
+        self,
+        interval: float = settings.RECONCILER_INTERVAL,
+        stale_minutes: float = settings.RECONCILER_STALE_MINUTES,
+        batch_size: int = settings.RECONCILER_BATCH_SIZE,
+        concurrency: int = settings.RECONCILER_CONCURRENCY,
+        max_backoff: float = settings.RECONCILER_MAX_BACKOFF_SECONDS
+    ):
+        self.interval = interval
+        self.stale_minutes = stale_minutes
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+
+        # execution_id -> (next check at (monotonic), current interval)
+        self._backoff: Dict[UUID, Tuple[float, float]] = {}
+
+        self._task: Optional[asyncio.Task] = None
+
+        # State / counters (per process)
+        self.is_leader = False
+        self.last_round_at: Optional[datetime] = None
+        self.rounds_total = 0
+        self.checked_total = 0
+        self.corrected_total = 0
+        self.errors_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Start the reconcile loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="status-reconciler")
+            logger.info(
+                f"✅ Status reconciler started "
+                f"(every {self.interval:.0f}s, stale after {self.stale_minutes:g} min)"
+            )
+
+    async def stop(self):
+        """Stop the reconcile loop (releases the advisory lock)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info("🛑 Status reconciler stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors_total += 1
+                logger.error(f"❌ Status reconciler round failed: {e}")
+
+    # =========================================================================
+    # ROUND
+    # =========================================================================
+
+    async def run_once(self) -> int:
+        """
+        Run one round if this replica gets the advisory lock.
+
+        Returns:
+            Number of executions corrected
+        """
+        async with async_engine.connect() as conn:
+            acquired = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": self.ADVISORY_LOCK_KEY}
+            )).scalar()
+
+            self.is_leader = bool(acquired)
+            if not acquired:
+                logger.debug("Status reconciler lock held by another replica")
+                return 0
+
+            try:
+                return await self._reconcile_round()
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": self.ADVISORY_LOCK_KEY}
+                )
+
+    async def _reconcile_round(self) -> int:
+        """Poll due stale executions and apply corrections."""
+        self.rounds_total += 1
+        self.last_round_at = datetime.now(timezone.utc)
+
+        try:
+            if not get_crewai_service().breaker.allows_requests():
+                logger.info("⏭️  Status reconciler skipped: CrewAI circuit open")
+                return 0
+        except ValueError:
+            # CrewAI not configured - nothing to poll
+            return 0
+
+        candidates = await self._find_stale()
+
+        # Forget backoff state for executions that are no longer stale
+        stale_ids = {execution_id for execution_id, _ in candidates}
+        for execution_id in list(self._backoff):
+            if execution_id not in stale_ids:
+                del self._backoff[execution_id]
+
+        now = time.monotonic()
+        due = [
+            (execution_id, crewai_id) for execution_id, crewai_id in candidates
+            if self._backoff.get(execution_id, (0.0, 0.0))[0] <= now
+        ][:self.batch_size]
+
+        if not due:
+            return 0
+
+        logger.info(f"🔎 Reconciling {len(due)} stale executions")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(execution_id: UUID, crewai_id: str) -> bool:
+            async with semaphore:
+                return await self._check(execution_id, crewai_id)
+
+        results = await asyncio.gather(
+            *(check(execution_id, crewai_id) for execution_id, crewai_id in due),
+            return_exceptions=True
+        )
+
+        corrected = 0
+        for result in results:
+            if isinstance(result, CircuitOpenError):
+                logger.warning("⚠️  CrewAI circuit opened during reconcile round")
+            elif isinstance(result, Exception):
+                self.errors_total += 1
+                logger.error(f"❌ Reconcile check failed: {result}")
+            elif result:
+                corrected += 1
+
+        if corrected:
+            logger.info(f"✅ Reconciled {corrected} executions")
+        return corrected
+
+    async def _find_stale(self) -> List[Tuple[UUID, str]]:
+        """RUNNING / AWAITING_APPROVAL executions with no recent activity."""
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.stale_minutes)
+
+        last_activity = select(
+            func.max(AgentActivity.timestamp)
+        ).where(
+            AgentActivity.execution_id == CrewExecution.execution_id
+        ).correlate(CrewExecution).scalar_subquery()
+
+        last_seen = func.coalesce(last_activity, CrewExecution.started_at)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    CrewExecution.execution_id, CrewExecution.crewai_execution_id
+                ).where(
+                    CrewExecution.status.in_([ExecutionStatus.RUNNING, ExecutionStatus.AWAITING_APPROVAL]),
+                    CrewExecution.crewai_execution_id.isnot(None),
+                    last_seen < cutoff
+                ).order_by(
+                    last_seen
+                ).limit(self.batch_size * 4)  # headroom for executions still backing off
+            )
+            return result.all()
+
+    async def _check(self, execution_id: UUID, crewai_id: str) -> bool:
+        """
+        Poll one execution and correct it if needed.
+
+        Returns:
+            True if the execution was corrected
+        """
+        self.checked_total += 1
+        error_message = None
+
+        try:
+            crewai_status = await get_crewai_service().get_status(crewai_id)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                self._back_off(execution_id)
+                raise
+            target = ExecutionStatus.FAILED
+            error_message = "Execution not found in CrewAI"
+        except httpx.RequestError:
+            self._back_off(execution_id)
+            raise
+        else:
+            raw = str(crewai_status.get("status") or crewai_status.get("state") or "").lower()
+            target = self.STATUS_MAP.get(raw)
+            if target == ExecutionStatus.FAILED:
+                error_message = str(crewai_status.get("error") or "Crew execution failed")
+
+        corrected = await self._apply(execution_id, target, error_message)
+        if corrected:
+            self._backoff.pop(execution_id, None)
+        else:
+            self._back_off(execution_id)
+        return corrected
+
+    def _back_off(self, execution_id: UUID):
+        """Double the interval before this execution is checked again."""
+        _, current = self._backoff.get(execution_id, (0.0, 0.0))
+        interval = min(max(current * 2, self.interval), self.max_backoff)
+        self._backoff[execution_id] = (time.monotonic() + interval, interval)
+
+    async def _apply(
+        self,
+        execution_id: UUID,
+        target: Optional[ExecutionStatus],
+        error_message: Optional[str]
+    ) -> bool:
+        """Write a status correction and broadcast it."""
+        if target is None:
+            return False
+
+        async with AsyncSessionLocal() as db:
+            execution = await db.get(CrewExecution, execution_id)
+            if execution is None:
+                return False
+
+            previous = execution.status
+            if previous in self.TERMINAL_STATUSES or previous == target:
+                return False
+
+            if target == ExecutionStatus.RUNNING:
+                # Only leave AWAITING_APPROVAL if nobody is asked to review
+                if previous != ExecutionStatus.AWAITING_APPROVAL:
+                    return False
+                result = await db.execute(
+                    select(func.count()).select_from(HITLCheckpoint).where(
+                        HITLCheckpoint.execution_id == execution_id,
+                        HITLCheckpoint.status == CheckpointStatus.PENDING
+                    )
+                )
+                if result.scalar():
+                    return False
+            elif target not in self.TERMINAL_STATUSES:
+                return False
+
+            execution.status = target
+            if target in self.TERMINAL_STATUSES:
+                execution.completed_at = datetime.utcnow()
+            if error_message:
+                execution.error_message = error_message
+
+            db.add(AgentActivity(
+                execution_id=execution_id,
+                agent_name="System",
+                activity_type=ActivityType.ERROR if target == ExecutionStatus.FAILED else ActivityType.MESSAGE,
+                message=f"Status reconciled with CrewAI: {previous.value} → {target.value}",
+                activity_metadata={
+                    "reconciled": True,
+                    "previous_status": previous.value,
+                    "status": target.value
+                }
+            ))
+            await db.commit()
+
+        self.corrected_total += 1
+        logger.warning(f"🔧 Execution {execution_id} reconciled: {previous.value} → {target.value}")
+
+        await get_sse_manager().broadcast(
+            execution_id=execution_id,
+            event_type="status",
+            data={
+                "execution_id": str(execution_id),
+                "status": target.value,
+                "previous_status": previous.value,
+                "error_message": error_message,
+                "reconciled": True,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        return True
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Reconciler state for the health endpoint.
+
+        Returns:
+            Dict with leadership, last round time, backoff size and counters
+        """
+        return {
+            "running": self._task is not None,
+            "leader": self.is_leader,
+            "last_round_at": self.last_round_at.isoformat() if self.last_round_at else None,
+            "backing_off": len(self._backoff),
+            "rounds_total": self.rounds_total,
+            "checked_total": self.checked_total,
+            "corrected_total": self.corrected_total,
+            "errors_total": self.errors_total,
+        }
+
+
+# Global reconciler instance
+status_reconciler = StatusReconciler()
+
+
+def get_status_reconciler() -> StatusReconciler:
+    """
+    Get the global status reconciler instance.
+
+    Used as FastAPI dependency.
+    """
+    return status_reconciler
@@ -0,0 +1,44 @@
+# api/services/redis_client.py
+"""
+Redis Client
+
+Shared async Redis connection pool for services that need state across
+API workers (webhook queue, SSE fan-out, caches).
+
+The client is created lazily on first use and closed in the application
+lifespan, so importing this module never opens a connection.
+"""
+
+import logging
+from typing import Optional
+
+import redis.asyncio as redis
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get the process-wide async Redis client.
+
+    Returns:
+        Redis client backed by a shared connection pool
+    """
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        logger.info("Redis client initialized")
+    return _redis
+
+
+async def close_redis():
+    """Close the shared Redis client (application shutdown)."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        logger.info("Redis client closed")
@@ -0,0 +1,165 @@
+# api/services/resilience.py
+"""
+Resilience Primitives - Retry backoff and circuit breaker
+
+Used by the CrewAI client so that a brownout on the CrewAI side turns
+into fast, explicit failures (and deferred work) instead of a pile of
+hung requests on ours.
+
+Circuit breaker states:
+- CLOSED: calls flow normally; consecutive failures are counted
+- OPEN: calls fail fast with CircuitOpenError until reset_timeout elapses
+- HALF_OPEN: a single probe call is let through; success closes the
+  circuit, failure re-opens it
+
+References:
+- Exponential backoff and jitter:
+  https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+"""
+
+import random
+import time
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"{name} is temporarily unavailable (circuit open, retry in {retry_after:.0f}s)"
+        )
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay for the first retry (seconds)
+        cap: Maximum delay (seconds)
+
+    Returns:
+        Random delay in [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Not tied to any transport: callers invoke before_call() before each
+    attempt and report the outcome with record_success()/record_failure().
+    State is per process.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+
+        # Counters
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)."""
+        if self.state != self.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allows_requests(self) -> bool:
+        """Whether a call made now would be let through."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return self.retry_in() == 0
+        return not self._probe_in_flight()
+
+    def before_call(self):
+        """
+        Gate a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                probe already in flight
+        """
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN:
+            if self.retry_in() > 0:
+                self.rejected_total += 1
+                raise CircuitOpenError(self.name, self.retry_in())
+            self.state = self.HALF_OPEN
+            logger.info(f"🟡 Circuit {self.name} half-open, probing")
+
+        if self._probe_in_flight():
+            self.rejected_total += 1
+            raise CircuitOpenError(self.name, self.reset_timeout)
+
+        self._probe_started_at = time.monotonic()
+
+    def record_success(self):
+        """Report a successful call."""
+        if self.state != self.CLOSED:
+            logger.info(f"🟢 Circuit {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self):
+        """Report a failed call (transport error or server-side failure)."""
+        self.consecutive_failures += 1
+        self._probe_started_at = None
+
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.opened_total += 1
+            logger.warning(
+                f"🔴 Circuit {self.name} opened after {self.consecutive_failures} "
+                f"consecutive failures (retry in {self.reset_timeout:.0f}s)"
+            )
+
+    def _probe_in_flight(self) -> bool:
+        """A half-open probe is running (probes older than reset_timeout are abandoned)."""
+        return (
+            self._probe_started_at is not None
+            and time.monotonic() - self._probe_started_at < self.reset_timeout
+        )
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Breaker state for health checks.
+
+        Returns:
+            Dict with state, failure counts and seconds until the next probe
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "opened_total": self.opened_total,
+            "rejected_total": self.rejected_total,
+        }
@@ -1,17 +1,54 @@
 # api/services/s3.py
-import boto3
-from typing import Optional
-from datetime import timedelta
-from botocore.exceptions import ClientError
+"""
+S3 Service - Documents and generated outputs
+
+One process-wide instance (get_s3_service), created without I/O. The
+objects themselves live in the configured storage backend
+(STORAGE_BACKEND, see api/services/storage_backends.py): AWS S3, or the
+local filesystem served through the API. This service maps documents and
+outputs to buckets and keys:
+- Clients are built on first use, not at import, so importing the app
+  (and tests) doesn't resolve AWS credentials
+- Download URLs come from the presigned URL cache
+  (api/services/presign_cache.py); a batch of documents is signed in one
+  backend call
+
+Storage errors are raised as ValueError, as before.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
 from api.config import settings
 from api.models.document import DocumentType
+from api.services.presign_cache import ObjectRef, PresignedURL, presign_cache
+from api.services.storage_backends import StorageBackend, StorageError, create_storage_backend
+
+logger = logging.getLogger(__name__)
+
 
 class S3Service:
-    def __init__(self):
-        self.s3_client = boto3.client('s3', region_name=settings.AWS_REGION)
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or create_storage_backend()
         self.documents_bucket = settings.DOCUMENTS_BUCKET
         self.outputs_bucket = settings.OUTPUTS_BUCKET
     
+    # =============================================================================
+    # LIFECYCLE
+    # =============================================================================
+    
+    async def start(self):
+        """Start the storage backend (first use; safe to call more than once)."""
+        await self.backend.start()
+    
+    async def close(self):
+        """Release the storage backend (application shutdown)."""
+        await self.backend.close()
+    
+    # =============================================================================
+    # DOCUMENTS
+    # =============================================================================
+    
     def _get_document_prefix(self, client_id: str, document_type: DocumentType) -> str:
         """Generate S3 key prefix based on document type"""
         type_mapping = {
@@ -24,8 +61,8 @@ class S3Service:
         folder = type_mapping.get(document_type, "other")
         return f"{client_id}/{folder}"
     
-    def generate_upload_presigned_url(
-        self, 
+    async def generate_upload_presigned_url(
+        self,
         client_id: str,
         document_type: DocumentType,
         file_name: str,
@@ -40,55 +77,63 @@ class S3Service:
         s3_key = f"{prefix}/{file_name}"
         
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.documents_bucket,
-                    'Key': s3_key,
-                    'ContentType': mime_type
-                },
-                ExpiresIn=expires_in
+            presigned_url = await self.backend.presign_upload(
+                self.documents_bucket,
+                s3_key,
+                mime_type,
+                expires_in
             )
             return presigned_url, s3_key
-        except ClientError as e:
+        except StorageError as e:
             raise ValueError(f"Failed to generate upload URL: {str(e)}")
     
-    def generate_download_presigned_url(
+    async def generate_download_presigned_url(
         self,
         s3_key: str,
         bucket: Optional[str] = None,
         expires_in: int = 3600
     ) -> str:
         """Generate presigned URL for downloading a document"""
-        bucket = bucket or self.documents_bucket
-        
+        return (await self.presign_download(s3_key, bucket, expires_in)).url
+    
+    async def presign_download(
+        self,
+        s3_key: str,
+        bucket: Optional[str] = None,
+        expires_in: int = 3600
+    ) -> PresignedURL:
+        """Presigned download URL (possibly cached) with its remaining lifetime"""
+        ref = (bucket or self.documents_bucket, s3_key)
+        return (await self.presign_downloads([ref], expires_in))[ref]
+    
+    async def presign_downloads(
+        self,
+        objects: Iterable[ObjectRef],
+        expires_in: int = 3600
+    ) -> Dict[ObjectRef, PresignedURL]:
+        """
+        Presigned download URLs for many (bucket, key) pairs at once
+        Cache misses are signed together in one backend call
+        """
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': bucket,
-                    'Key': s3_key
-                },
-                ExpiresIn=expires_in
-            )
-            return presigned_url
-        except ClientError as e:
+            return await presign_cache.get_many(objects, expires_in, self._sign_downloads)
+        except StorageError as e:
             raise ValueError(f"Failed to generate download URL: {str(e)}")
     
-    def delete_document(self, s3_key: str, bucket: Optional[str] = None) -> bool:
+    async def _sign_downloads(self, objects: List[ObjectRef], expires_in: int) -> Dict[ObjectRef, str]:
+        return await self.backend.presign_downloads(objects, expires_in)
+    
+    async def delete_document(self, s3_key: str, bucket: Optional[str] = None) -> bool:
         """Delete a document from S3"""
         bucket = bucket or self.documents_bucket
         
         try:
-            self.s3_client.delete_object(
-                Bucket=bucket,
-                Key=s3_key
-            )
+            await self.backend.delete_object(bucket, s3_key)
             return True
-        except ClientError as e:
+        except StorageError as e:
             raise ValueError(f"Failed to delete document: {str(e)}")
     
-    def list_documents(self, client_id: str, document_type: Optional[DocumentType] = None) -> list:
+    async def list_documents(self, client_id: str, document_type: Optional[DocumentType] = None) -> list:
         """List documents for a client"""
         if document_type:
             prefix = self._get_document_prefix(client_id, document_type)
@@ -96,37 +141,125 @@ class S3Service:
             prefix = f"{client_id}/"
         
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.documents_bucket,
-                Prefix=prefix
-            )
-            
-            documents = []
-            for obj in response.get('Contents', []):
-                documents.append({
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified']
-                })
-            
-            return documents
-        except ClientError as e:
+            return await self.backend.list_objects(self.documents_bucket, prefix)
+        except StorageError as e:
             raise ValueError(f"Failed to list documents: {str(e)}")
     
-    def upload_content_output(self, execution_id: str, content: str, file_name: str) -> str:
+    # =============================================================================
+    # MULTIPART DOCUMENT UPLOADS
+    # =============================================================================
+    
+    async def create_multipart_upload(
+        self,
+        client_id: str,
+        document_type: DocumentType,
+        file_name: str,
+        mime_type: str
+    ) -> tuple[str, str]:
+        """
+        Start a multipart upload for a large document
+        Returns: (upload_id, s3_key)
+        """
+        prefix = self._get_document_prefix(client_id, document_type)
+        s3_key = f"{prefix}/{file_name}"
+        
+        try:
+            upload_id = await self.backend.create_multipart_upload(self.documents_bucket, s3_key, mime_type)
+            return upload_id, s3_key
+        except StorageError as e:
+            raise ValueError(f"Failed to start multipart upload: {str(e)}")
+    
+    async def generate_upload_part_presigned_urls(
+        self,
+        s3_key: str,
+        upload_id: str,
+        part_count: int,
+        expires_in: int = 3600
+    ) -> List[str]:
+        """Presigned PUT URLs for parts 1..part_count of a multipart upload"""
+        try:
+            return [
+                await self.backend.presign_upload_part(
+                    self.documents_bucket, s3_key, upload_id, part_number, expires_in
+                )
+                for part_number in range(1, part_count + 1)
+            ]
+        except StorageError as e:
+            raise ValueError(f"Failed to generate part upload URLs: {str(e)}")
+    
+    async def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict[str, Any]]):
+        """Assemble uploaded parts ([{"PartNumber", "ETag"}, ...]) into the document"""
+        try:
+            await self.backend.complete_multipart_upload(self.documents_bucket, s3_key, upload_id, parts)
+        except StorageError as e:
+            raise ValueError(f"Failed to complete multipart upload: {str(e)}")
+    
+    async def abort_multipart_upload(self, s3_key: str, upload_id: str):
+        """Discard a multipart upload and its parts"""
+        try:
+            await self.backend.abort_multipart_upload(self.documents_bucket, s3_key, upload_id)
+        except StorageError as e:
+            raise ValueError(f"Failed to abort multipart upload: {str(e)}")
+    
+    # =============================================================================
+    # OUTPUTS
+    # =============================================================================
+    
+    async def upload_content_output(self, execution_id: str, content: str, file_name: str) -> str:
         """Upload generated content to outputs bucket"""
         s3_key = f"{execution_id}/{file_name}"
         
         try:
-            self.s3_client.put_object(
-                Bucket=self.outputs_bucket,
-                Key=s3_key,
-                Body=content.encode('utf-8'),
-                ContentType='text/markdown'
+            await self.backend.put_object(
+                self.outputs_bucket,
+                s3_key,
+                content.encode('utf-8'),
+                'text/markdown'
             )
             return s3_key
-        except ClientError as e:
+        except StorageError as e:
             raise ValueError(f"Failed to upload content: {str(e)}")
+    
+    async def put_output_object(
+        self,
+        s3_key: str,
+        body: bytes,
+        content_type: str
+    ) -> str:
+        """Store raw bytes in the outputs bucket (archives, exports)"""
+        try:
+            await self.backend.put_object(self.outputs_bucket, s3_key, body, content_type)
+            return s3_key
+        except StorageError as e:
+            raise ValueError(f"Failed to upload object: {str(e)}")
+    
+    async def get_output_object(self, s3_key: str, bucket: Optional[str] = None) -> bytes:
+        """Read an object's bytes from the outputs bucket"""
+        bucket = bucket or self.outputs_bucket
+        
+        try:
+            return await self.backend.get_object(bucket, s3_key)
+        except StorageError as e:
+            raise ValueError(f"Failed to read object: {str(e)}")
+
+
+# Application-scoped instance (created on first use)
+_s3_service: Optional[S3Service] = None
+
+
+def get_s3_service() -> S3Service:
+    """
+    Get the shared S3 service instance.
+
+    Used as FastAPI dependency.
+    """
+    global _s3_service
+    if _s3_service is None:
+        _s3_service = S3Service()
+    return _s3_service
+
 
-# Singleton instance
-s3_service = S3Service()
\ No newline at end of file
+async def close_s3_service():
+    """Shut down the shared S3 service (application shutdown)."""
+    if _s3_service is not None:
+        await _s3_service.close()
@@ -0,0 +1,494 @@
+# api/services/scheduler.py
+"""
+Execution Scheduler - Admission control for CrewAI kickoffs
+
+start_execution only records a PENDING CrewExecution (with its crew inputs)
+and hands it to this scheduler. A pool of kickoff tasks then calls CrewAI
+under two caps:
+- SCHEDULER_MAX_CONCURRENT_KICKOFFS: kickoff calls in flight per process
+- SCHEDULER_MAX_CONCURRENT_PER_CLIENT: kickoff calls in flight per Client
+
+Fairness across clients is weighted fair queuing (self-clocked variant):
+each queued kickoff gets a finish tag
+
+    finish = max(virtual_time, client's last finish) + 1 / weight
+
+and the eligible job with the smallest tag goes next. A client that
+queues 50 executions therefore doesn't delay another client's single
+execution by 50 kickoffs. The weight comes from
+Client.client_metadata["scheduling_weight"] (default 1).
+
+The database is the durable queue: PENDING executions with kickoff_inputs
+and no crewai_execution_id. Before a kickoff the row is claimed with a
+conditional UPDATE on kickoff_claimed_at (a lease), so several API
+replicas can run schedulers without double kickoffs; a periodic rescan
+picks up executions queued by a replica that went away.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Any, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update, or_
+
+from api.config import settings
+from api.database import AsyncSessionLocal
+from api.models.activity import AgentActivity, ActivityType
+from api.models.client import Client
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.project import Project
+from api.services.crewai import get_crewai_service
+from api.services.resilience import CircuitOpenError
+from api.services.sse import get_sse_manager
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionScheduler:
+    """
+    Weighted-fair, concurrency-capped kickoff dispatcher.
+
+    Features:
+    - Global and per-client caps on concurrent kickoff calls
+    - Weighted fair queuing across clients
+    - Queue position and start ETA per execution
+    - Pauses while the CrewAI circuit breaker is open
+    - Lease-based claims (safe with multiple replicas)
+    """
+
+    # Kickoff duration assumed until one has been measured (seconds)
+    DEFAULT_KICKOFF_SECONDS = 5.0
+
+    # Smoothing factor for the kickoff duration average
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        max_concurrent: int = settings.SCHEDULER_MAX_CONCURRENT_KICKOFFS,
+        max_per_client: int = settings.SCHEDULER_MAX_CONCURRENT_PER_CLIENT,
+        rescan_interval: float = settings.SCHEDULER_RESCAN_INTERVAL,
+        lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.rescan_interval = rescan_interval
+        self.lease_seconds = lease_seconds
+
+        # client_id -> deque of (execution_id, finish_tag)
+        self._queues: Dict[UUID, Deque[Tuple[UUID, float]]] = {}
+        self._last_finish: Dict[UUID, float] = {}
+        self._virtual_time = 0.0
+
+        # execution_id -> client_id for everything queued here
+        self._queued: Dict[UUID, UUID] = {}
+
+        # Kickoffs in flight
+        self._running_per_client: Dict[UUID, int] = {}
+        self._kickoff_tasks: Set[asyncio.Task] = set()
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+        self.avg_kickoff_seconds = self.DEFAULT_KICKOFF_SECONDS
+
+        # Counters (per process)
+        self.submitted_total = 0
+        self.started_total = 0
+        self.failed_total = 0
+        self.skipped_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Recover queued executions from the database and start dispatching."""
+        if self._task is None:
+            await self._rescan()
+            self._task = asyncio.create_task(self._run(), name="execution-scheduler")
+            logger.info(
+                f"✅ Execution scheduler started "
+                f"(max_concurrent={self.max_concurrent}, per_client={self.max_per_client})"
+            )
+
+    async def stop(self):
+        """Stop dispatching. Queued executions stay PENDING in the database."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for task in list(self._kickoff_tasks):
+            task.cancel()
+        await asyncio.gather(*self._kickoff_tasks, return_exceptions=True)
+        logger.info("🛑 Execution scheduler stopped")
+
+    # =========================================================================
+    # QUEUE
+    # =========================================================================
+
+    def submit(self, execution_id: UUID, client_id: UUID, weight: float = 1.0):
+        """
+        Queue a committed PENDING execution for kickoff.
+
+        Args:
+            execution_id: Execution to kick off
+            client_id: Client the execution belongs to (fairness unit)
+            weight: Client's share relative to others (> 0)
+        """
+        if execution_id in self._queued:
+            return
+
+        start = max(self._virtual_time, self._last_finish.get(client_id, 0.0))
+        finish = start + 1.0 / max(weight, 0.01)
+        self._last_finish[client_id] = finish
+
+        self._queues.setdefault(client_id, deque()).append((execution_id, finish))
+        self._queued[execution_id] = client_id
+        self.submitted_total += 1
+        self._wake.set()
+
+    def discard(self, execution_id: UUID):
+        """Remove an execution from the queue (e.g. cancelled before kickoff)."""
+        client_id = self._queued.pop(execution_id, None)
+        if client_id is None:
+            return
+
+        queue = self._queues.get(client_id)
+        if queue:
+            self._queues[client_id] = deque(job for job in queue if job[0] != execution_id)
+            if not self._queues[client_id]:
+                del self._queues[client_id]
+
+    def get_queue_info(self, execution_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Queue position and estimated start for a queued execution.
+
+        Position follows dispatch order (finish tags). The ETA assumes
+        kickoffs run max_concurrent at a time at the observed average
+        kickoff duration.
+
+        Args:
+            execution_id: Execution ID
+
+        Returns:
+            Dict with queue_position (1 = next) and estimated_start_seconds,
+            or None if the execution is not queued in this process
+        """
+        client_id = self._queued.get(execution_id)
+        if client_id is None:
+            return None
+
+        tag = next(t for eid, t in self._queues[client_id] if eid == execution_id)
+        position = 1 + sum(
+            1 for queue in self._queues.values() for _, t in queue if t < tag
+        )
+
+        waves = math.ceil(position / max(self.max_concurrent, 1))
+        return {
+            "queue_position": position,
+            "estimated_start_seconds": round(waves * self.avg_kickoff_seconds, 1)
+        }
+
+    def _next(self) -> Optional[Tuple[UUID, UUID, float]]:
+        """Pop the eligible job with the smallest finish tag."""
+        best_client = None
+        best_tag = None
+
+        for client_id, queue in self._queues.items():
+            if self._running_per_client.get(client_id, 0) >= self.max_per_client:
+                continue
+            tag = queue[0][1]
+            if best_tag is None or tag < best_tag:
+                best_client, best_tag = client_id, tag
+
+        if best_client is None:
+            return None
+
+        execution_id, tag = self._queues[best_client].popleft()
+        if not self._queues[best_client]:
+            del self._queues[best_client]
+        del self._queued[execution_id]
+
+        # Self-clocked: virtual time is the tag of the job entering service
+        self._virtual_time = max(self._virtual_time, tag)
+        return execution_id, best_client, tag
+
+    def _requeue(self, execution_id: UUID, client_id: UUID, tag: float):
+        """Put a job back at the head of its client's queue."""
+        self._queues.setdefault(client_id, deque()).appendleft((execution_id, tag))
+        self._queued[execution_id] = client_id
+
+    # =========================================================================
+    # DISPATCH
+    # =========================================================================
+
+    async def _run(self):
+        """Start kickoffs while capacity allows; rescan the database periodically."""
+        last_rescan = time.monotonic()
+
+        while True:
+            self._wake.clear()
+            timeout = self.rescan_interval
+
+            retry_in = self._crewai_retry_in()
+            if retry_in:
+                # CrewAI unavailable - keep everything queued
+                timeout = min(timeout, retry_in)
+            else:
+                while len(self._kickoff_tasks) < self.max_concurrent:
+                    job = self._next()
+                    if job is None:
+                        break
+                    self._spawn(*job)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            if time.monotonic() - last_rescan >= self.rescan_interval:
+                last_rescan = time.monotonic()
+                try:
+                    await self._rescan()
+                except Exception as e:
+                    logger.error(f"❌ Scheduler rescan failed: {e}")
+
+    @staticmethod
+    def _crewai_retry_in() -> float:
+        """Seconds until the CrewAI circuit lets calls through (0 = now)."""
+        try:
+            breaker = get_crewai_service().breaker
+        except ValueError:
+            # Not configured - kickoffs fail with the configuration error
+            return 0.0
+        return 0.0 if breaker.allows_requests() else max(breaker.retry_in(), 1.0)
+
+    def _spawn(self, execution_id: UUID, client_id: UUID, tag: float):
+        """Run one kickoff in the background, counting it against the caps."""
+        self._running_per_client[client_id] = self._running_per_client.get(client_id, 0) + 1
+
+        task = asyncio.create_task(self._kickoff(execution_id, client_id, tag))
+        self._kickoff_tasks.add(task)
+
+        def _done(t: asyncio.Task):
+            self._kickoff_tasks.discard(t)
+            remaining = self._running_per_client.get(client_id, 1) - 1
+            if remaining > 0:
+                self._running_per_client[client_id] = remaining
+            else:
+                self._running_per_client.pop(client_id, None)
+            self._wake.set()
+
+        task.add_done_callback(_done)
+
+    async def _kickoff(self, execution_id: UUID, client_id: UUID, tag: float):
+        """Claim an execution, call CrewAI kickoff and record the outcome."""
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(CrewExecution).where(
+                    CrewExecution.execution_id == execution_id,
+                    CrewExecution.status == ExecutionStatus.PENDING,
+                    CrewExecution.crewai_execution_id.is_(None),
+                    or_(
+                        CrewExecution.kickoff_claimed_at.is_(None),
+                        CrewExecution.kickoff_claimed_at < now - timedelta(seconds=self.lease_seconds)
+                    )
+                ).values(
+                    kickoff_claimed_at=now
+                ).returning(
+                    CrewExecution.kickoff_inputs, CrewExecution.workflow_mode
+                )
+            )
+            claimed = result.first()
+            await db.commit()
+
+        if claimed is None:
+            # Cancelled, already started, or claimed by another replica
+            self.skipped_total += 1
+            return
+
+        crew_inputs, workflow_mode = claimed
+        started = time.monotonic()
+
+        try:
+            kickoff_result = await get_crewai_service().kickoff_crew(
+                inputs=crew_inputs or {},
+                execution_id=str(execution_id)
+            )
+        except CircuitOpenError:
+            await self._release_claim(execution_id)
+            self._requeue(execution_id, client_id, tag)
+            return
+        except Exception as e:
+            logger.error(f"❌ CrewAI kickoff failed for execution {execution_id}: {str(e)}")
+            await self._record_failure(execution_id, e)
+            return
+
+        elapsed = time.monotonic() - started
+        self.avg_kickoff_seconds += self.EWMA_ALPHA * (elapsed - self.avg_kickoff_seconds)
+
+        await self._record_started(execution_id, kickoff_result.get("kickoff_id"), workflow_mode)
+
+    async def _release_claim(self, execution_id: UUID):
+        """Drop the lease so the execution can be claimed again right away."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(CrewExecution).where(
+                    CrewExecution.execution_id == execution_id
+                ).values(kickoff_claimed_at=None)
+            )
+            await db.commit()
+
+    async def _record_started(self, execution_id: UUID, kickoff_id: Optional[str], workflow_mode: str):
+        """Mark the execution RUNNING and notify SSE clients."""
+        async with AsyncSessionLocal() as db:
+            # Locked: cancel_execution locks the row too, so exactly one of
+            # us sees the other's write and cancels the crew
+            execution = await db.get(CrewExecution, execution_id, with_for_update=True)
+            if execution is None:
+                return
+
+            execution.crewai_execution_id = kickoff_id
+            execution.kickoff_inputs = None
+
+            if execution.status != ExecutionStatus.PENDING:
+                # Cancelled while the kickoff was in flight - stop the crew
+                await db.commit()
+                logger.warning(f"⚠️  Execution {execution_id} cancelled during kickoff, cancelling crew")
+                if kickoff_id:
+                    await get_crewai_service().cancel_execution(kickoff_id)
+                return
+
+            execution.status = ExecutionStatus.RUNNING
+            db.add(AgentActivity(
+                execution_id=execution_id,
+                agent_name="System",
+                activity_type=ActivityType.CREW_KICKOFF,
+                message=f"Crew execution started in {workflow_mode} mode"
+            ))
+            await db.commit()
+
+        self.started_total += 1
+        logger.info(f"✅ CrewAI kickoff successful for execution {execution_id}: {kickoff_id}")
+
+        await self._broadcast_status(execution_id, ExecutionStatus.RUNNING, crewai_execution_id=kickoff_id)
+
+    async def _record_failure(self, execution_id: UUID, error: Exception):
+        """Mark the execution FAILED and notify SSE clients."""
+        error_message = f"Failed to start crew: {str(error)}"
+
+        async with AsyncSessionLocal() as db:
+            execution = await db.get(CrewExecution, execution_id, with_for_update=True)
+            if execution is None or execution.status != ExecutionStatus.PENDING:
+                return
+
+            execution.status = ExecutionStatus.FAILED
+            execution.error_message = error_message
+            execution.completed_at = datetime.utcnow()
+            await db.commit()
+
+        self.failed_total += 1
+        await self._broadcast_status(execution_id, ExecutionStatus.FAILED, error_message=error_message)
+
+    @staticmethod
+    async def _broadcast_status(execution_id: UUID, status: ExecutionStatus, **extra):
+        await get_sse_manager().broadcast(
+            execution_id=execution_id,
+            event_type="status",
+            data={
+                "execution_id": str(execution_id),
+                "status": status.value,
+                **extra,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+
+    async def _rescan(self):
+        """Queue unclaimed PENDING executions that aren't queued here yet."""
+        now = datetime.now(timezone.utc)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    CrewExecution.execution_id, Client.client_id, Client.client_metadata
+                ).join(
+                    Project, CrewExecution.project_id == Project.project_id
+                ).join(
+                    Client, Project.client_id == Client.client_id
+                ).where(
+                    CrewExecution.status == ExecutionStatus.PENDING,
+                    CrewExecution.crewai_execution_id.is_(None),
+                    CrewExecution.kickoff_inputs.isnot(None),
+                    or_(
+                        CrewExecution.kickoff_claimed_at.is_(None),
+                        CrewExecution.kickoff_claimed_at < now - timedelta(seconds=self.lease_seconds)
+                    )
+                ).order_by(
+                    CrewExecution.started_at
+                ).limit(settings.SCHEDULER_RESCAN_LIMIT)
+            )
+            rows = result.all()
+
+        recovered = 0
+        for execution_id, client_id, client_metadata in rows:
+            if execution_id in self._queued:
+                continue
+            self.submit(execution_id, client_id, client_weight(client_metadata))
+            recovered += 1
+
+        if recovered:
+            logger.info(f"♻️  Scheduler queued {recovered} pending executions from the database")
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth, kickoffs in flight and counters.
+
+        Returns:
+            Dict for the health endpoint
+        """
+        return {
+            "running": self._task is not None,
+            "queued": len(self._queued),
+            "queued_clients": len(self._queues),
+            "in_flight": len(self._kickoff_tasks),
+            "max_concurrent": self.max_concurrent,
+            "max_per_client": self.max_per_client,
+            "avg_kickoff_seconds": round(self.avg_kickoff_seconds, 2),
+            "submitted_total": self.submitted_total,
+            "started_total": self.started_total,
+            "failed_total": self.failed_total,
+            "skipped_total": self.skipped_total,
+        }
+
+
+def client_weight(client_metadata: Optional[Dict[str, Any]]) -> float:
+    """Scheduling weight from Client.client_metadata (default 1)."""
+    try:
+        return float((client_metadata or {}).get("scheduling_weight", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+# Global scheduler instance
+execution_scheduler = ExecutionScheduler()
+
+
+def get_execution_scheduler() -> ExecutionScheduler:
+    """
+    Get the global execution scheduler instance.
+
+    Used as FastAPI dependency.
+    """
+    return execution_scheduler
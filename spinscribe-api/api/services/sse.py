@@ -14,15 +14,51 @@ SSE is chosen over WebSockets for simplicity:
 References:
 - MDN SSE Guide: https://developer.mozilla.org/en-US/docs/Web/API/Server-sent_events
 - FastAPI SSE: https://fastapi.tiangolo.com/advanced/custom-response/#streamingresponse
+
+Cross-worker delivery and connection limits are handled by a pluggable
+backend (see api/services/sse_backends.py).
+
+Slow consumers:
+Each connection has a bounded queue and broadcasts never wait on it. When
+a queue is full the overflow policy decides what happens:
+- drop_oldest: discard the oldest queued event
+- coalesce: collapse the backlog into one "resync" event (the client
+  refetches /messages)
+- disconnect: end the stream; the browser reconnects with Last-Event-ID
+
+Encoding and heartbeats:
+Each broadcast is serialized to bytes once and the same buffer is queued
+for every subscriber. A single heartbeat task per process writes one
+pre-encoded frame to every idle connection, and streams end on the ASGI
+http.disconnect event (EventStreamResponse) instead of polling.
+
+User streams:
+Besides per-execution streams, a user can open one multiplexed stream that
+follows many executions. Its subscription set can be changed at runtime
+(routed through the backend, so the change reaches whichever worker holds
+the stream), and every event on it is tagged with its execution_id.
+
+Reconnects:
+Every broadcast carries a per-execution, monotonically increasing SSE id.
+Recent events are kept in a bounded ring buffer per execution so a client
+reconnecting with Last-Event-ID gets the events it missed replayed.
 """
 
 import asyncio
 import json
 import logging
-from typing import Dict, Set, Optional, Any
-from uuid import UUID
+import time
+from typing import Dict, Set, Optional, Any, List
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from uuid import UUID, uuid4
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
+
+from api.config import settings
+from api.services.sse_backends import SSEBackend, create_sse_backend
 
 logger = logging.getLogger(__name__)
 
@@ -33,30 +69,104 @@ class SSEConnectionManager:
     
     Features:
     - Per-execution connection pools
-    - Connection limit per user (prevents abuse)
+    - Connection limit per user (prevents abuse, enforced cluster-wide
+      by the backend)
+    - Pluggable fan-out backend (in-process or Redis pub/sub)
     - Automatic cleanup on disconnect
     - Heartbeat to detect dead connections
     - Broadcast to all clients watching an execution
+    - Last-Event-ID replay from a per-execution ring buffer
+    - Bounded per-connection queues with non-blocking fan-out and
+      per-connection lag counters
+    - Encode-once fan-out and one shared heartbeat scheduler
+    - Multiplexed per-user streams with runtime subscription changes
     """
     
     # Maximum concurrent connections per user
-    MAX_CONNECTIONS_PER_USER = 3
+    MAX_CONNECTIONS_PER_USER = settings.SSE_MAX_CONNECTIONS_PER_USER
     
     # Heartbeat interval (seconds)
     HEARTBEAT_INTERVAL = 30
     
-    def __init__(self):
-        # execution_id -> set of queues
+    # Overflow policies for full connection queues
+    OVERFLOW_DROP_OLDEST = "drop_oldest"
+    OVERFLOW_COALESCE = "coalesce"
+    OVERFLOW_DISCONNECT = "disconnect"
+    OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+    
+    # Queued to tell a stream to close (disconnect policy)
+    CLOSE = None
+    
+    def __init__(self, backend: Optional[SSEBackend] = None):
+        # execution_id -> set of queues (connections on this worker)
         self.connections: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
         
-        # user_id -> count of connections
+        # user_id -> count of connections on this worker
         self.user_connections: Dict[str, int] = defaultdict(int)
         
-        # queue -> (execution_id, user_id) for cleanup
+        # queue -> (subscribed execution_ids, user_id, connection_id) for cleanup
         self.queue_metadata: Dict[asyncio.Queue, tuple] = {}
         
+        # stream_id -> queue for multiplexed user streams (tagged events)
+        self.user_streams: Dict[str, asyncio.Queue] = {}
+        self.max_stream_subscriptions = settings.SSE_MAX_STREAM_SUBSCRIPTIONS
+        
+        # Slow-consumer handling
+        if settings.SSE_OVERFLOW_POLICY not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown SSE overflow policy: {settings.SSE_OVERFLOW_POLICY}")
+        self.overflow_policy = settings.SSE_OVERFLOW_POLICY
+        # Coalescing needs room for the resync marker plus the new event
+        self.queue_maxsize = max(settings.SSE_QUEUE_MAXSIZE, 2)
+        
+        # queue -> lag counters for that connection
+        self.connection_stats: Dict[asyncio.Queue, Dict[str, int]] = {}
+        
+        # queue -> monotonic time of the last event queued (heartbeat idleness)
+        self.last_enqueued: Dict[asyncio.Queue, float] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        
+        # Totals for this worker
+        self.dropped_total = 0
+        self.coalesced_total = 0
+        self.slow_disconnects_total = 0
+        
+        # execution_id -> recent (event_id, message) pairs, LRU-bounded by
+        # execution. Filled for every event this worker receives, so a
+        # reconnect can land on any worker.
+        self.replay_buffers: OrderedDict[str, deque] = OrderedDict()
+        self.replay_buffer_size = settings.SSE_REPLAY_BUFFER_SIZE
+        self.replay_max_executions = settings.SSE_REPLAY_MAX_EXECUTIONS
+        
+        # Transport for broadcasts and cluster-wide connection limits
+        self.backend = backend or create_sse_backend()
+        self.backend.bind(self._deliver_local, self._apply_control)
+        
         logger.info("SSE Connection Manager initialized")
     
+    async def start(self):
+        """Start the fan-out backend and heartbeat scheduler (application startup)."""
+        await self.backend.start()
+        self._heartbeat_task = asyncio.create_task(
+            self._heartbeat_loop(), name="sse-heartbeat"
+        )
+    
+    async def stop(self):
+        """Stop the heartbeat scheduler and fan-out backend (application shutdown)."""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        await self.backend.stop()
+    
+    def create_queue(self) -> asyncio.Queue:
+        """
+        Create a bounded queue for a new connection.
+        
+        Returns:
+            AsyncIO queue sized by SSE_QUEUE_MAXSIZE
+        """
+        return asyncio.Queue(maxsize=self.queue_maxsize)
+    
     async def connect(
         self,
         execution_id: UUID,
@@ -69,7 +179,7 @@ class SSEConnectionManager:
         Args:
             execution_id: UUID of the execution to stream
             user_id: UUID of the user connecting
-            queue: AsyncIO queue for this connection
+            queue: AsyncIO queue for this connection (see create_queue)
         
         Returns:
             True if connection accepted, False if limit exceeded
@@ -77,18 +187,23 @@ class SSEConnectionManager:
         user_id_str = str(user_id)
         execution_id_str = str(execution_id)
         
-        # Check connection limit
-        if self.user_connections[user_id_str] >= self.MAX_CONNECTIONS_PER_USER:
+        connection_id = str(uuid4())
+        
+        # Check connection limit (across all workers)
+        acquired = await self.backend.acquire_user_slot(
+            user_id_str,
+            connection_id,
+            self.MAX_CONNECTIONS_PER_USER
+        )
+        if not acquired:
             logger.warning(
                 f"⚠️  Connection limit reached for user {user_id_str}: "
-                f"{self.user_connections[user_id_str]}/{self.MAX_CONNECTIONS_PER_USER}"
+                f"{self.MAX_CONNECTIONS_PER_USER} max"
             )
             return False
         
         # Add connection
-        self.connections[execution_id_str].add(queue)
-        self.user_connections[user_id_str] += 1
-        self.queue_metadata[queue] = (execution_id_str, user_id_str)
+        self._register(queue, user_id_str, connection_id, {execution_id_str})
         
         logger.info(
             f"✅ SSE connected: execution={execution_id_str[:8]}..., "
@@ -98,6 +213,95 @@ class SSEConnectionManager:
         
         return True
     
+    async def connect_user_stream(
+        self,
+        user_id: UUID,
+        queue: asyncio.Queue,
+        execution_ids: List[UUID]
+    ) -> Optional[str]:
+        """
+        Register a multiplexed stream that follows several executions.
+        
+        Counts as one connection towards the per-user limit. Callers must
+        only pass executions the user owns.
+        
+        Args:
+            user_id: UUID of the user connecting
+            queue: AsyncIO queue for this connection (see create_queue)
+            execution_ids: Executions to subscribe to initially
+        
+        Returns:
+            Stream ID (used to change subscriptions), or None if the
+            connection limit is reached
+        """
+        user_id_str = str(user_id)
+        stream_id = str(uuid4())
+        
+        acquired = await self.backend.acquire_user_slot(
+            user_id_str,
+            stream_id,
+            self.MAX_CONNECTIONS_PER_USER
+        )
+        if not acquired:
+            logger.warning(
+                f"⚠️  Connection limit reached for user {user_id_str}: "
+                f"{self.MAX_CONNECTIONS_PER_USER} max"
+            )
+            return None
+        
+        subscriptions = {str(e) for e in execution_ids[:self.max_stream_subscriptions]}
+        self.user_streams[stream_id] = queue
+        self._register(queue, user_id_str, stream_id, set())
+        self._subscribe(queue, subscriptions)
+        
+        logger.info(
+            f"✅ SSE user stream connected: stream={stream_id[:8]}..., "
+            f"user={user_id_str[:8]}..., executions={len(subscriptions)}"
+        )
+        
+        return stream_id
+    
+    def _register(
+        self,
+        queue: asyncio.Queue,
+        user_id_str: str,
+        connection_id: str,
+        execution_ids: Set[str]
+    ):
+        """Add connection bookkeeping for a queue."""
+        for execution_id_str in execution_ids:
+            self.connections[execution_id_str].add(queue)
+        self.user_connections[user_id_str] += 1
+        self.queue_metadata[queue] = (execution_ids, user_id_str, connection_id)
+        self.connection_stats[queue] = {
+            "delivered": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "max_lag": 0
+        }
+        self.last_enqueued[queue] = time.monotonic()
+    
+    def _subscribe(self, queue: asyncio.Queue, execution_ids: Set[str]):
+        """Add a queue to execution pools."""
+        subscriptions = self.queue_metadata[queue][0]
+        for execution_id_str in execution_ids:
+            subscriptions.add(execution_id_str)
+            self.connections[execution_id_str].add(queue)
+    
+    def _unsubscribe(self, queue: asyncio.Queue, execution_ids: Set[str]):
+        """Remove a queue from execution pools."""
+        subscriptions = self.queue_metadata[queue][0]
+        for execution_id_str in execution_ids:
+            subscriptions.discard(execution_id_str)
+            pool = self.connections.get(execution_id_str)
+            if pool is None:
+                continue
+            pool.discard(queue)
+            
+            # Clean up empty execution pools
+            if not pool:
+                del self.connections[execution_id_str]
+    
     def disconnect(self, queue: asyncio.Queue):
         """
         Unregister an SSE connection.
@@ -108,26 +312,25 @@ class SSEConnectionManager:
         if queue not in self.queue_metadata:
             return
         
-        execution_id_str, user_id_str = self.queue_metadata[queue]
+        execution_ids, user_id_str, connection_id = self.queue_metadata[queue]
         
         # Remove from connections
-        if execution_id_str in self.connections:
-            self.connections[execution_id_str].discard(queue)
-            
-            # Clean up empty execution pools
-            if not self.connections[execution_id_str]:
-                del self.connections[execution_id_str]
+        self._unsubscribe(queue, set(execution_ids))
+        self.user_streams.pop(connection_id, None)
         
         # Update user connection count
         self.user_connections[user_id_str] -= 1
         if self.user_connections[user_id_str] <= 0:
             del self.user_connections[user_id_str]
+        self.backend.release_user_slot(user_id_str, connection_id)
         
         # Clean up metadata
         del self.queue_metadata[queue]
+        self.connection_stats.pop(queue, None)
+        self.last_enqueued.pop(queue, None)
         
         logger.info(
-            f"🔌 SSE disconnected: execution={execution_id_str[:8]}..., "
+            f"🔌 SSE disconnected: connection={connection_id[:8]}..., "
             f"user={user_id_str[:8]}..."
         )
     
@@ -140,61 +343,356 @@ class SSEConnectionManager:
         """
         Broadcast an event to all clients watching an execution.
         
+        The event is handed to the backend, which delivers it to every
+        worker holding connections for the execution (including this one).
+        
         Args:
             execution_id: UUID of the execution
             event_type: Type of event (e.g., "message", "status", "checkpoint")
             data: Event data to send
         """
         execution_id_str = str(execution_id)
+        try:
+            event_id = await self.backend.next_event_id(execution_id_str)
+            await self.backend.publish(execution_id_str, event_id, event_type, data)
+        except Exception as e:
+            # Live updates are best-effort; clients can refetch /messages
+            logger.error(f"Failed to publish {event_type} event: {e}")
+    
+    async def _deliver_local(
+        self,
+        execution_id_str: str,
+        event_id: int,
+        event_type: str,
+        data: Dict[str, Any]
+    ):
+        """
+        Deliver an event to the connections on this worker.
+        
+        Args:
+            execution_id_str: Execution ID
+            event_id: Per-execution event ID
+            event_type: Type of event
+            data: Event data to send
+        """
+        # Encode once; every subscriber gets the same bytes
+        message = self._format_sse_message(event_type, data, event_id)
+        
+        # Remember it for Last-Event-ID replay
+        self._buffer_event(execution_id_str, event_id, message)
         
         if execution_id_str not in self.connections:
             logger.debug(f"No SSE connections for execution {execution_id_str[:8]}...")
             return
         
-        # Format SSE message
-        message = self._format_sse_message(event_type, data)
-        
-        # Send to all connected clients
-        dead_queues = []
-        for queue in self.connections[execution_id_str]:
-            try:
-                await queue.put(message)
-            except Exception as e:
-                logger.error(f"Failed to send to queue: {e}")
-                dead_queues.append(queue)
-        
-        # Clean up dead connections
-        for queue in dead_queues:
-            self.disconnect(queue)
+        # Send to all connected clients without waiting on any of them.
+        # User streams get a variant tagged with the execution, also
+        # encoded once.
+        tagged = None
+        for queue in list(self.connections[execution_id_str]):
+            if queue in self.queue_metadata and self.queue_metadata[queue][2] in self.user_streams:
+                if tagged is None:
+                    tagged = self._format_sse_message(
+                        event_type,
+                        {**data, "execution_id": execution_id_str}
+                    )
+                self._enqueue(queue, tagged)
+            else:
+                self._enqueue(queue, message)
         
         logger.debug(
-            f"📡 Broadcast {event_type} to {len(self.connections[execution_id_str])} clients"
+            f"📡 Broadcast {event_type} to {len(self.connections.get(execution_id_str, ()))} clients"
         )
     
+    # =========================================================================
+    # USER STREAM SUBSCRIPTIONS
+    # =========================================================================
+    
+    async def update_subscriptions(
+        self,
+        stream_id: str,
+        user_id: UUID,
+        add: List[UUID],
+        remove: List[UUID]
+    ):
+        """
+        Change the executions a user stream follows.
+        
+        The change is routed through the backend so it reaches the worker
+        holding the stream. The stream receives a "subscriptions" event
+        with its resulting set. Callers must only add executions the user
+        owns.
+        
+        Args:
+            stream_id: Stream ID from connect_user_stream
+            user_id: UUID of the user (must own the stream)
+            add: Executions to subscribe to
+            remove: Executions to unsubscribe from
+        """
+        await self.backend.publish_control({
+            "stream_id": stream_id,
+            "user_id": str(user_id),
+            "add": [str(e) for e in add],
+            "remove": [str(e) for e in remove]
+        })
+    
+    async def _apply_control(self, message: Dict[str, Any]):
+        """
+        Apply a subscription change if the stream lives on this worker.
+        
+        Args:
+            message: Control message from update_subscriptions
+        """
+        queue = self.user_streams.get(message["stream_id"])
+        if queue is None or queue not in self.queue_metadata:
+            return
+        
+        subscriptions, user_id_str, _ = self.queue_metadata[queue]
+        if user_id_str != message["user_id"]:
+            logger.warning("⚠️  Ignoring subscription change for another user's stream")
+            return
+        
+        self._unsubscribe(queue, set(message["remove"]))
+        
+        room = self.max_stream_subscriptions - len(subscriptions)
+        new = [e for e in dict.fromkeys(message["add"]) if e not in subscriptions]
+        self._subscribe(queue, set(new[:max(room, 0)]))
+        
+        self._enqueue(queue, self._format_sse_message(
+            "subscriptions",
+            {
+                "stream_id": message["stream_id"],
+                "execution_ids": sorted(subscriptions),
+                "rejected": new[max(room, 0):]
+            }
+        ))
+    
+    def get_stream_subscriptions(self, stream_id: str) -> Optional[List[str]]:
+        """
+        Get the executions a user stream on this worker follows.
+        
+        Args:
+            stream_id: Stream ID
+        
+        Returns:
+            Sorted execution IDs, or None if the stream is not on this worker
+        """
+        queue = self.user_streams.get(stream_id)
+        if queue is None or queue not in self.queue_metadata:
+            return None
+        return sorted(self.queue_metadata[queue][0])
+    
+    def _enqueue(self, queue: asyncio.Queue, message: bytes) -> bool:
+        """
+        Put a message on a connection queue without blocking.
+        
+        Applies the overflow policy when the queue is full.
+        
+        Args:
+            queue: Connection queue
+            message: Encoded SSE message
+        
+        Returns:
+            False if the connection was closed as a slow consumer
+        """
+        stats = self.connection_stats.get(queue)
+        
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if self.overflow_policy == self.OVERFLOW_DISCONNECT:
+                self._clear_queue(queue)
+                queue.put_nowait(self.CLOSE)
+                self.slow_disconnects_total += 1
+                logger.warning("🐢 SSE slow consumer disconnected (queue full)")
+                self.disconnect(queue)
+                return False
+            
+            if self.overflow_policy == self.OVERFLOW_COALESCE:
+                # Earlier resync markers are not counted as skipped events
+                skipped = sum(
+                    1 for item in self._clear_queue(queue)
+                    if not item.startswith(b"event: resync")
+                )
+                queue.put_nowait(self._format_sse_message(
+                    "resync",
+                    {
+                        "reason": "slow_consumer",
+                        "skipped_events": skipped,
+                        "message": "Events were skipped; refetch /messages"
+                    }
+                ))
+                queue.put_nowait(message)
+                self.coalesced_total += skipped
+                if stats:
+                    stats["coalesced"] += skipped
+            else:
+                queue.get_nowait()
+                queue.put_nowait(message)
+                self.dropped_total += 1
+                if stats:
+                    stats["dropped"] += 1
+        
+        if stats:
+            stats["delivered"] += 1
+            stats["max_lag"] = max(stats["max_lag"], queue.qsize())
+        self.last_enqueued[queue] = time.monotonic()
+        return True
+    
+    @staticmethod
+    def _clear_queue(queue: asyncio.Queue) -> List[bytes]:
+        """Discard everything queued; returns the discarded messages."""
+        cleared = []
+        while not queue.empty():
+            cleared.append(queue.get_nowait())
+        return cleared
+    
+    # =========================================================================
+    # LAST-EVENT-ID REPLAY
+    # =========================================================================
+    
+    def _buffer_event(self, execution_id_str: str, event_id: int, message: bytes):
+        """Append an event to the execution's replay ring buffer."""
+        buffer = self.replay_buffers.get(execution_id_str)
+        if buffer is None:
+            buffer = deque(maxlen=self.replay_buffer_size)
+            self.replay_buffers[execution_id_str] = buffer
+            if len(self.replay_buffers) > self.replay_max_executions:
+                self.replay_buffers.popitem(last=False)
+        else:
+            self.replay_buffers.move_to_end(execution_id_str)
+        buffer.append((event_id, message))
+    
+    def get_replay(
+        self,
+        execution_id: UUID,
+        last_event_id: int
+    ) -> Optional[List[bytes]]:
+        """
+        Get buffered events newer than a client's Last-Event-ID.
+        
+        Call right after connect() (with no await in between) so that
+        every event is either replayed here or delivered to the queue.
+        
+        Args:
+            execution_id: UUID of the execution
+            last_event_id: Last event ID the client received
+        
+        Returns:
+            Encoded SSE messages to replay (possibly empty), or None if
+            the buffer does not reach back to last_event_id and the caller
+            must fall back to the database
+        """
+        buffer = self.replay_buffers.get(str(execution_id))
+        if not buffer:
+            return None
+        
+        # Events may arrive slightly out of ID order from different workers
+        events = sorted(buffer, key=lambda item: item[0])
+        
+        # The buffer starts after the client's position: events were evicted
+        # or arrived before this worker started buffering
+        if events[0][0] > last_event_id:
+            return None
+        
+        return [message for event_id, message in events if event_id > last_event_id]
+    
+    @staticmethod
+    def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+        """
+        Parse a Last-Event-ID header.
+        
+        Args:
+            value: Header value
+        
+        Returns:
+            Event ID, or None if missing or not one of ours
+        """
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    
     def _format_sse_message(
         self,
         event_type: str,
-        data: Dict[str, Any]
-    ) -> str:
+        data: Dict[str, Any],
+        event_id: Optional[int] = None
+    ) -> bytes:
         """
         Format data as SSE message.
         
         SSE format:
         event: <event_type>
         data: <json_data>
-        id: <message_id>
+        id: <event_id>
+        
+        Events without an ID (connected, heartbeat, replayed history) leave
+        the browser's Last-Event-ID unchanged.
         
         Args:
             event_type: Event type
             data: Event data
+            event_id: Per-execution event ID
         
         Returns:
-            Formatted SSE message string
+            Encoded SSE message
         """
-        message_id = datetime.utcnow().isoformat()
         json_data = json.dumps(data)
         
-        return f"event: {event_type}\ndata: {json_data}\nid: {message_id}\n\n"
+        if event_id is None:
+            return f"event: {event_type}\ndata: {json_data}\n\n".encode()
+        return f"event: {event_type}\ndata: {json_data}\nid: {event_id}\n\n".encode()
+    
+    # =========================================================================
+    # HEARTBEATS
+    # =========================================================================
+    
+    def _heartbeat_frame(self) -> bytes:
+        """Encode a heartbeat event."""
+        return self._format_sse_message(
+            "heartbeat",
+            {"timestamp": datetime.utcnow().isoformat()}
+        )
+    
+    async def _heartbeat_loop(self):
+        """
+        Shared heartbeat scheduler.
+        
+        Runs once per process instead of one timer per connection. Each tick
+        encodes a single frame and queues it for every connection that has
+        not received anything for HEARTBEAT_INTERVAL seconds.
+        """
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                self.send_heartbeats()
+            except Exception as e:
+                logger.error(f"Failed to send heartbeats: {e}")
+    
+    def send_heartbeats(self) -> int:
+        """
+        Queue one pre-encoded heartbeat for every idle connection.
+        
+        Returns:
+            Number of connections that were sent a heartbeat
+        """
+        idle_since = time.monotonic() - self.HEARTBEAT_INTERVAL
+        idle = [
+            queue for queue, last in self.last_enqueued.items()
+            if last <= idle_since and queue.empty()
+        ]
+        if not idle:
+            return 0
+        
+        heartbeat = self._heartbeat_frame()
+        for queue in idle:
+            self._enqueue(queue, heartbeat)
+        
+        logger.debug(f"💓 Heartbeat sent to {len(idle)} idle connections")
+        return len(idle)
     
     async def send_heartbeat(self, queue: asyncio.Queue):
         """
@@ -204,11 +702,7 @@ class SSEConnectionManager:
             queue: Queue to send heartbeat to
         """
         try:
-            heartbeat = self._format_sse_message(
-                "heartbeat",
-                {"timestamp": datetime.utcnow().isoformat()}
-            )
-            await queue.put(heartbeat)
+            self._enqueue(queue, self._heartbeat_frame())
         except Exception as e:
             logger.error(f"Failed to send heartbeat: {e}")
     
@@ -227,7 +721,7 @@ class SSEConnectionManager:
     
     def get_user_connection_count(self, user_id: UUID) -> int:
         """
-        Get number of active connections for a user.
+        Get number of active connections for a user on this worker.
         
         Args:
             user_id: UUID of the user
@@ -236,6 +730,83 @@ class SSEConnectionManager:
             Number of active connections
         """
         return self.user_connections.get(str(user_id), 0)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Connection and slow-consumer statistics for this worker.
+        
+        Lag is the number of events queued for a connection but not yet
+        written to it.
+        
+        Returns:
+            Dict with connection count, lag and overflow counters
+        """
+        lags = [queue.qsize() for queue in self.queue_metadata]
+        return {
+            "backend": self.backend.name,
+            "connections": len(self.queue_metadata),
+            "user_streams": len(self.user_streams),
+            "executions": len(self.connections),
+            "queue_maxsize": self.queue_maxsize,
+            "overflow_policy": self.overflow_policy,
+            "queued_events": sum(lags),
+            "max_lag": max(lags, default=0),
+            "dropped_total": self.dropped_total,
+            "coalesced_total": self.coalesced_total,
+            "slow_disconnects_total": self.slow_disconnects_total
+        }
+    
+    def get_connection_stats(self, queue: asyncio.Queue) -> Optional[Dict[str, int]]:
+        """
+        Lag counters for one connection.
+        
+        Args:
+            queue: Connection queue
+        
+        Returns:
+            Dict with delivered/dropped/coalesced counts, current and max
+            lag, or None if the connection is not registered
+        """
+        stats = self.connection_stats.get(queue)
+        if stats is None:
+            return None
+        return {**stats, "lag": queue.qsize()}
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Streaming response for SSE.
+    
+    Always listens for the ASGI http.disconnect event and ends the stream
+    as soon as it arrives. Starlette only does this for ASGI spec < 2.4;
+    otherwise a dead client is noticed on the next failed write.
+    The body generator is closed afterwards so its cleanup runs immediately.
+    """
+    
+    media_type = "text/event-stream"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            async with anyio.create_task_group() as task_group:
+                
+                async def stream():
+                    try:
+                        await self.stream_response(send)
+                    except OSError:
+                        # Client went away mid-write
+                        pass
+                    task_group.cancel_scope.cancel()
+                
+                task_group.start_soon(stream)
+                await self.listen_for_disconnect(receive)
+                task_group.cancel_scope.cancel()
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        
+        if self.background is not None:
+            await self.background()
 
 
 # Global SSE manager instance
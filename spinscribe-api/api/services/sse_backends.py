@@ -0,0 +1,464 @@
+# api/services/sse_backends.py
+"""
+SSE Transport Backends
+
+Pluggable fan-out transport for SSEConnectionManager.
+
+A backend is responsible for four things:
+1. Getting a broadcast from the process that produced it to every process
+   that holds SSE connections (publish / deliver)
+2. Counting connections per user across those processes, so the
+   per-user connection limit holds cluster-wide
+3. Routing subscription changes to the process that holds a user stream
+4. Assigning per-execution event IDs that increase monotonically across
+   processes and restarts (used for Last-Event-ID replay)
+
+Event IDs are anchored to wall-clock milliseconds: each ID is
+max(now_ms, previous_id + 1). They stay monotonic across restarts and
+double as a time position for replay from the database.
+
+Backends:
+- LocalSSEBackend: In-process only (single uvicorn worker, development)
+- RedisSSEBackend: Redis pub/sub; each event is published once and every
+  worker's subscriber fans it out to its local queues
+
+Selected with SSE_BACKEND ("local" or "redis").
+
+References:
+- Redis Pub/Sub: https://redis.io/docs/latest/develop/interact/pubsub/
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, OrderedDict
+from typing import Awaitable, Callable, Dict, Any, Optional, Set
+
+from api.config import settings
+from api.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Called with (execution_id, event_id, event_type, data) for every event
+# that should reach this process's connections
+DeliverCallback = Callable[[str, int, str, Dict[str, Any]], Awaitable[None]]
+
+# Called with a subscription change for a multiplexed user stream
+ControlCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Executions whose last event ID is remembered by the local backend
+LOCAL_EVENT_ID_CAPACITY = 10000
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class SSEBackend:
+    """
+    Base class for SSE transport backends.
+
+    Subclasses implement publish and the per-user connection slot methods.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+        self._control: Optional[ControlCallback] = None
+
+    def bind(self, deliver: DeliverCallback, control: ControlCallback):
+        """
+        Attach the SSEConnectionManager callbacks.
+
+        Args:
+            deliver: Fans an event out to local connections
+            control: Applies a subscription change to a local user stream
+        """
+        self._deliver = deliver
+        self._control = control
+
+    async def start(self):
+        """Start background work (subscriptions, refresh loops)."""
+
+    async def stop(self):
+        """Stop background work and release resources."""
+
+    async def publish(
+        self,
+        execution_id: str,
+        event_id: int,
+        event_type: str,
+        data: Dict[str, Any]
+    ):
+        """
+        Publish an event to every process with connections for the execution.
+
+        Args:
+            execution_id: Execution the event belongs to
+            event_id: Event ID from next_event_id
+            event_type: SSE event type
+            data: JSON-serializable event data
+        """
+        raise NotImplementedError
+
+    async def publish_control(self, message: Dict[str, Any]):
+        """
+        Send a subscription change to every process.
+
+        Args:
+            message: JSON-serializable control message
+        """
+        raise NotImplementedError
+
+    async def next_event_id(self, execution_id: str) -> int:
+        """
+        Allocate the next event ID for an execution.
+
+        Args:
+            execution_id: Execution ID
+
+        Returns:
+            Event ID greater than every ID previously issued for the execution
+        """
+        raise NotImplementedError
+
+    async def acquire_user_slot(self, user_id: str, connection_id: str, limit: int) -> bool:
+        """
+        Reserve a connection slot for a user.
+
+        Args:
+            user_id: User opening the connection
+            connection_id: Unique ID of the new connection
+            limit: Maximum concurrent connections per user
+
+        Returns:
+            True if the slot was reserved, False if the limit is reached
+        """
+        raise NotImplementedError
+
+    def release_user_slot(self, user_id: str, connection_id: str):
+        """
+        Release a connection slot previously reserved for a user.
+
+        Args:
+            user_id: User owning the connection
+            connection_id: Connection being closed
+        """
+        raise NotImplementedError
+
+    async def get_user_connection_count(self, user_id: str) -> int:
+        """
+        Get number of connections a user holds across all processes.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Number of active connections
+        """
+        raise NotImplementedError
+
+
+# =============================================================================
+# LOCAL BACKEND
+# =============================================================================
+
+class LocalSSEBackend(SSEBackend):
+    """
+    In-process backend.
+
+    Events are delivered directly to this process's connections and limits
+    are counted per process. Only correct with a single API worker.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        super().__init__()
+        # user_id -> connection IDs
+        self.user_slots: Dict[str, Set[str]] = defaultdict(set)
+
+        # execution_id -> last issued event ID (LRU-bounded)
+        self.last_event_ids: OrderedDict[str, int] = OrderedDict()
+
+    async def start(self):
+        logger.info("SSE backend: local (single process)")
+
+    async def publish(
+        self,
+        execution_id: str,
+        event_id: int,
+        event_type: str,
+        data: Dict[str, Any]
+    ):
+        if self._deliver:
+            await self._deliver(execution_id, event_id, event_type, data)
+
+    async def publish_control(self, message: Dict[str, Any]):
+        if self._control:
+            await self._control(message)
+
+    async def next_event_id(self, execution_id: str) -> int:
+        event_id = max(_now_ms(), self.last_event_ids.get(execution_id, 0) + 1)
+        self.last_event_ids[execution_id] = event_id
+        self.last_event_ids.move_to_end(execution_id)
+        if len(self.last_event_ids) > LOCAL_EVENT_ID_CAPACITY:
+            self.last_event_ids.popitem(last=False)
+        return event_id
+
+    async def acquire_user_slot(self, user_id: str, connection_id: str, limit: int) -> bool:
+        if len(self.user_slots[user_id]) >= limit:
+            return False
+        self.user_slots[user_id].add(connection_id)
+        return True
+
+    def release_user_slot(self, user_id: str, connection_id: str):
+        slots = self.user_slots.get(user_id)
+        if slots is None:
+            return
+        slots.discard(connection_id)
+        if not slots:
+            del self.user_slots[user_id]
+
+    async def get_user_connection_count(self, user_id: str) -> int:
+        return len(self.user_slots.get(user_id, ()))
+
+
+# =============================================================================
+# REDIS BACKEND
+# =============================================================================
+
+# Atomically drop expired slots, check the limit and reserve a slot.
+# KEYS[1] = user slot set, ARGV = now, expiry, limit, connection_id
+_ACQUIRE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+redis.call('PEXPIRE', KEYS[1], math.ceil((tonumber(ARGV[2]) - tonumber(ARGV[1])) * 1000))
+return 1
+"""
+
+# Allocate max(now_ms, previous + 1) as the next event ID.
+# KEYS[1] = execution event ID key, ARGV = now_ms, ttl_ms
+_NEXT_EVENT_ID_SCRIPT = """
+local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+local event_id = math.max(tonumber(ARGV[1]), previous + 1)
+redis.call('SET', KEYS[1], event_id, 'PX', ARGV[2])
+return event_id
+"""
+
+# Keep per-execution event ID counters for a day after the last event
+EVENT_ID_TTL_MS = 24 * 60 * 60 * 1000
+
+
+class RedisSSEBackend(SSEBackend):
+    """
+    Redis pub/sub backend for multi-worker deployments.
+
+    Features:
+    - One PUBLISH per broadcast, regardless of the number of workers
+    - One pattern subscription per worker that fans out locally
+    - Cluster-wide per-user connection limits
+
+    Connection slots are stored per user in a sorted set scored by expiry
+    time. Each worker refreshes the slots it holds, so slots held by a
+    crashed worker expire after SSE_SLOT_TTL_SECONDS instead of leaking.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        channel_prefix: str = settings.SSE_REDIS_CHANNEL_PREFIX,
+        slot_ttl_seconds: int = settings.SSE_SLOT_TTL_SECONDS
+    ):
+        super().__init__()
+        self.channel_prefix = channel_prefix
+        self.slot_ttl_seconds = slot_ttl_seconds
+
+        # Slots held by this process: connection_id -> user_id
+        self.local_slots: Dict[str, str] = {}
+
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._pending_releases: Set[asyncio.Task] = set()
+        self._acquire_slot = None
+        self._next_event_id = None
+
+    def _channel(self, execution_id: str) -> str:
+        return f"{self.channel_prefix}:exec:{execution_id}"
+
+    def _slot_key(self, user_id: str) -> str:
+        return f"{self.channel_prefix}:user:{user_id}"
+
+    def _control_channel(self) -> str:
+        return f"{self.channel_prefix}:control"
+
+    def _event_id_key(self, execution_id: str) -> str:
+        return f"{self.channel_prefix}:seq:{execution_id}"
+
+    async def start(self):
+        redis = get_redis()
+
+        self._acquire_slot = redis.register_script(_ACQUIRE_SLOT_SCRIPT)
+        self._next_event_id = redis.register_script(_NEXT_EVENT_ID_SCRIPT)
+
+        self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(self._channel("*"))
+        await self._pubsub.subscribe(self._control_channel())
+
+        self._listener = asyncio.create_task(self._listen(), name="sse-redis-listener")
+        self._refresher = asyncio.create_task(self._refresh_slots(), name="sse-slot-refresher")
+
+        logger.info(f"SSE backend: redis (channel prefix {self.channel_prefix})")
+
+    async def stop(self):
+        for task in (self._listener, self._refresher):
+            if task:
+                task.cancel()
+        await asyncio.gather(
+            *(t for t in (self._listener, self._refresher) if t),
+            return_exceptions=True
+        )
+        self._listener = self._refresher = None
+
+        # Give back slots held by this process
+        if self.local_slots:
+            redis = get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for connection_id, user_id in self.local_slots.items():
+                    pipe.zrem(self._slot_key(user_id), connection_id)
+                await pipe.execute()
+            self.local_slots.clear()
+
+        if self._pending_releases:
+            await asyncio.gather(*self._pending_releases, return_exceptions=True)
+
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def publish(
+        self,
+        execution_id: str,
+        event_id: int,
+        event_type: str,
+        data: Dict[str, Any]
+    ):
+        message = json.dumps({
+            "execution_id": execution_id,
+            "event_id": event_id,
+            "event_type": event_type,
+            "data": data
+        })
+        await get_redis().publish(self._channel(execution_id), message)
+
+    async def publish_control(self, message: Dict[str, Any]):
+        await get_redis().publish(self._control_channel(), json.dumps(message))
+
+    async def next_event_id(self, execution_id: str) -> int:
+        event_id = await self._next_event_id(
+            keys=[self._event_id_key(execution_id)],
+            args=[_now_ms(), EVENT_ID_TTL_MS]
+        )
+        return int(event_id)
+
+    async def _listen(self):
+        """Fan out messages from Redis to local connections."""
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+
+                if message["type"] == "message":
+                    # Control channel
+                    if self._control:
+                        await self._control(json.loads(message["data"]))
+                    continue
+
+                if message["type"] != "pmessage":
+                    continue
+
+                event = json.loads(message["data"])
+                if self._deliver:
+                    await self._deliver(
+                        event["execution_id"],
+                        event["event_id"],
+                        event["event_type"],
+                        event["data"]
+                    )
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ SSE Redis listener error: {e}")
+                await asyncio.sleep(1)
+
+    async def acquire_user_slot(self, user_id: str, connection_id: str, limit: int) -> bool:
+        now = time.time()
+        acquired = await self._acquire_slot(
+            keys=[self._slot_key(user_id)],
+            args=[now, now + self.slot_ttl_seconds, limit, connection_id]
+        )
+        if acquired:
+            self.local_slots[connection_id] = user_id
+        return bool(acquired)
+
+    def release_user_slot(self, user_id: str, connection_id: str):
+        self.local_slots.pop(connection_id, None)
+
+        # Called from synchronous cleanup paths; the slot TTL covers a
+        # release that never completes
+        task = asyncio.create_task(
+            get_redis().zrem(self._slot_key(user_id), connection_id)
+        )
+        self._pending_releases.add(task)
+        task.add_done_callback(self._pending_releases.discard)
+
+    async def get_user_connection_count(self, user_id: str) -> int:
+        return await get_redis().zcount(self._slot_key(user_id), time.time(), "+inf")
+
+    async def _refresh_slots(self):
+        """Extend the expiry of slots held by this process."""
+        interval = max(self.slot_ttl_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            if not self.local_slots:
+                continue
+            try:
+                expiry = time.time() + self.slot_ttl_seconds
+                redis = get_redis()
+                async with redis.pipeline(transaction=False) as pipe:
+                    for connection_id, user_id in list(self.local_slots.items()):
+                        key = self._slot_key(user_id)
+                        pipe.zadd(key, {connection_id: expiry}, xx=True)
+                        pipe.expire(key, self.slot_ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"❌ Failed to refresh SSE connection slots: {e}")
+
+
+def create_sse_backend(name: str = settings.SSE_BACKEND) -> SSEBackend:
+    """
+    Create the configured SSE backend.
+
+    Args:
+        name: Backend name ("local" or "redis")
+
+    Returns:
+        SSE backend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "local":
+        return LocalSSEBackend()
+    if name == "redis":
+        return RedisSSEBackend()
+    raise ValueError(f"Unknown SSE backend: {name}")
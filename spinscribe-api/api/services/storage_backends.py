@@ -0,0 +1,597 @@
+# api/services/storage_backends.py
+"""
+Storage Backends
+
+Pluggable object storage for S3Service (documents, generated outputs,
+activity archives).
+
+A backend implements:
+1. Presigned URLs: uploads (PUT), downloads (GET) and multipart parts
+2. Object operations: put, get, delete, list
+3. Multipart uploads: create, complete, abort
+
+Backends:
+- S3StorageBackend: AWS S3 through boto3, every call in a bounded
+  thread pool (S3_THREAD_POOL_SIZE)
+- LocalStorageBackend: Files under LOCAL_STORAGE_ROOT ({bucket}/{key}).
+  Presigned URLs point at the API itself (api/routers/storage.py) and
+  carry an HMAC signature and expiry, so clients upload and download the
+  same way they do against S3. Runs the whole API on one box (offline
+  development, load tests) without AWS
+
+Selected with STORAGE_BACKEND ("s3" or "local").
+"""
+
+import abc
+import asyncio
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (bucket, key)
+ObjectRef = Tuple[str, str]
+
+
+class StorageError(ValueError):
+    """Raised when a storage operation fails."""
+
+
+class StorageObjectNotFound(StorageError):
+    """Raised when an object doesn't exist."""
+
+
+class StorageBackend(abc.ABC):
+    """
+    Base class for storage backends.
+
+    All methods are async; blocking I/O stays off the event loop. Every
+    operation is abstract, so an incomplete backend fails at construction.
+    """
+
+    name = "base"
+
+    async def start(self):
+        """Create clients / pools (first use)."""
+
+    async def close(self):
+        """Release clients / pools (application shutdown)."""
+
+    # =========================================================================
+    # PRESIGNED URLS
+    # =========================================================================
+
+    @abc.abstractmethod
+    async def presign_upload(self, bucket: str, key: str, content_type: str, expires_in: int) -> str:
+        """
+        URL a client can PUT an object to.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            content_type: Content-Type the upload must send
+            expires_in: URL lifetime in seconds
+
+        Returns:
+            Presigned URL
+        """
+
+    @abc.abstractmethod
+    async def presign_downloads(self, objects: List[ObjectRef], expires_in: int) -> Dict[ObjectRef, str]:
+        """
+        URLs a client can GET objects from (signed as one batch).
+
+        Args:
+            objects: (bucket, key) pairs
+            expires_in: URL lifetime in seconds
+
+        Returns:
+            Dict of (bucket, key) -> presigned URL
+        """
+
+    @abc.abstractmethod
+    async def presign_upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        expires_in: int
+    ) -> str:
+        """
+        URL a client can PUT one part of a multipart upload to.
+
+        The response's ETag header must be passed to complete_multipart_upload.
+        """
+
+    # =========================================================================
+    # OBJECTS
+    # =========================================================================
+
+    @abc.abstractmethod
+    async def put_object(self, bucket: str, key: str, body: bytes, content_type: str):
+        """Store an object (replacing any existing one)."""
+
+    @abc.abstractmethod
+    async def get_object(self, bucket: str, key: str) -> bytes:
+        """
+        Read an object's bytes.
+
+        Raises:
+            StorageObjectNotFound: If the object doesn't exist
+        """
+
+    @abc.abstractmethod
+    async def delete_object(self, bucket: str, key: str):
+        """Delete an object (no error if it doesn't exist)."""
+
+    @abc.abstractmethod
+    async def list_objects(self, bucket: str, prefix: str) -> List[Dict[str, Any]]:
+        """
+        Objects whose key starts with prefix.
+
+        Returns:
+            List of {"key", "size", "last_modified"} dicts
+        """
+
+    # =========================================================================
+    # MULTIPART
+    # =========================================================================
+
+    @abc.abstractmethod
+    async def create_multipart_upload(self, bucket: str, key: str, content_type: str) -> str:
+        """
+        Start a multipart upload.
+
+        Returns:
+            Upload ID
+        """
+
+    @abc.abstractmethod
+    async def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, parts: List[Dict[str, Any]]):
+        """
+        Assemble uploaded parts into the object.
+
+        Args:
+            parts: [{"PartNumber": int, "ETag": str}, ...] in part order
+        """
+
+    @abc.abstractmethod
+    async def abort_multipart_upload(self, bucket: str, key: str, upload_id: str):
+        """Discard a multipart upload and its uploaded parts."""
+
+
+# =============================================================================
+# S3
+# =============================================================================
+
+class S3StorageBackend(StorageBackend):
+    """
+    AWS S3 through boto3.
+
+    boto3 is blocking, so every call - including presigning, which may
+    refresh credentials - runs in a bounded thread pool. The client's
+    HTTP pool (S3_MAX_POOL_CONNECTIONS), timeouts and retries are set
+    explicitly.
+    """
+
+    name = "s3"
+
+    def __init__(self):
+        self.client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """
+        Create the thread pool and boto3 client (first use).
+
+        Safe to call more than once; later calls return immediately.
+        """
+        if self.client is not None:
+            return
+        async with self._start_lock:
+            if self.client is not None:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.S3_THREAD_POOL_SIZE,
+                    thread_name_prefix="s3"
+                )
+            config = Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=settings.S3_CONNECT_TIMEOUT,
+                read_timeout=settings.S3_READ_TIMEOUT,
+                retries={'total_max_attempts': settings.S3_MAX_ATTEMPTS, 'mode': 'standard'}
+            )
+            self.client = await self._run(boto3.client, 's3', region_name=settings.AWS_REGION, config=config)
+            logger.info(f"✅ S3 client ready ({settings.S3_THREAD_POOL_SIZE} threads)")
+
+    async def close(self):
+        """Shut down the boto3 thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.client = None
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking boto3 call in the S3 thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _call(self, func: Callable[[Any], Any]) -> Any:
+        """Run func(client) off the event loop; S3 errors become StorageError."""
+        await self.start()
+        try:
+            return await self._run(func, self.client)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                raise StorageObjectNotFound(str(e)) from e
+            raise StorageError(str(e)) from e
+
+    async def presign_upload(self, bucket: str, key: str, content_type: str, expires_in: int) -> str:
+        return await self._call(lambda client: client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': bucket, 'Key': key, 'ContentType': content_type},
+            ExpiresIn=expires_in
+        ))
+
+    async def presign_downloads(self, objects: List[ObjectRef], expires_in: int) -> Dict[ObjectRef, str]:
+        return await self._call(lambda client: {
+            (bucket, key): client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': bucket, 'Key': key},
+                ExpiresIn=expires_in
+            )
+            for bucket, key in objects
+        })
+
+    async def presign_upload_part(self, bucket, key, upload_id, part_number, expires_in) -> str:
+        return await self._call(lambda client: client.generate_presigned_url(
+            'upload_part',
+            Params={'Bucket': bucket, 'Key': key, 'UploadId': upload_id, 'PartNumber': part_number},
+            ExpiresIn=expires_in
+        ))
+
+    async def put_object(self, bucket: str, key: str, body: bytes, content_type: str):
+        await self._call(lambda client: client.put_object(
+            Bucket=bucket, Key=key, Body=body, ContentType=content_type
+        ))
+
+    async def get_object(self, bucket: str, key: str) -> bytes:
+        # Read the body in the same worker thread: it streams from the socket
+        return await self._call(lambda client: client.get_object(Bucket=bucket, Key=key)['Body'].read())
+
+    async def delete_object(self, bucket: str, key: str):
+        await self._call(lambda client: client.delete_object(Bucket=bucket, Key=key))
+
+    async def list_objects(self, bucket: str, prefix: str) -> List[Dict[str, Any]]:
+        response = await self._call(lambda client: client.list_objects_v2(Bucket=bucket, Prefix=prefix))
+        return [
+            {'key': obj['Key'], 'size': obj['Size'], 'last_modified': obj['LastModified']}
+            for obj in response.get('Contents', [])
+        ]
+
+    async def create_multipart_upload(self, bucket: str, key: str, content_type: str) -> str:
+        response = await self._call(lambda client: client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        ))
+        return response['UploadId']
+
+    async def complete_multipart_upload(self, bucket, key, upload_id, parts):
+        await self._call(lambda client: client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': p['PartNumber'], 'ETag': p['ETag']} for p in parts]}
+        ))
+
+    async def abort_multipart_upload(self, bucket, key, upload_id):
+        await self._call(lambda client: client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id))
+
+
+# =============================================================================
+# LOCAL FILESYSTEM
+# =============================================================================
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Objects as files under a root directory, served by the API.
+
+    Layout:
+        {root}/{bucket}/{key}                   objects
+        {root}/.multipart/{upload_id}/          in-progress multipart uploads
+
+    Presigned URLs are {API_BASE_URL}/api/v1/storage/{bucket}/{key} with
+    expires and an HMAC-SHA256 signature over the method, object, expiry
+    and (uploads) content type or part. File I/O runs in worker threads.
+    """
+
+    name = "local"
+
+    URL_PATH = "/api/v1/storage"
+    MULTIPART_DIR = ".multipart"
+    WRITE_BUFFER_SIZE = 1024 * 1024  # bytes per thread hop when receiving uploads
+
+    _BUCKET_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9.\-_]{0,254}$")
+
+    def __init__(
+        self,
+        root: str = settings.LOCAL_STORAGE_ROOT,
+        secret: Optional[str] = settings.LOCAL_STORAGE_SIGNING_SECRET,
+        base_url: str = settings.API_BASE_URL
+    ):
+        self.root = Path(root).resolve()
+        self.secret = (secret or settings.JWT_SECRET).encode()
+        self.base_url = base_url.rstrip("/")
+
+    async def start(self):
+        await asyncio.to_thread(self.root.mkdir, parents=True, exist_ok=True)
+
+    # =========================================================================
+    # PATHS AND SIGNATURES
+    # =========================================================================
+
+    def path_for(self, bucket: str, key: str) -> Path:
+        """
+        File path of an object.
+
+        Raises:
+            StorageError: If the bucket or key would escape the root
+        """
+        if not self._BUCKET_NAME.match(bucket) or bucket == self.MULTIPART_DIR:
+            raise StorageError(f"Invalid bucket name: {bucket}")
+        parts = key.split("/")
+        if not key or key.startswith("/") or any(part in ("", ".", "..") for part in parts) or "\\" in key or "\0" in key:
+            raise StorageError(f"Invalid object key: {key}")
+        return self.root / bucket / key
+
+    def _upload_dir(self, upload_id: str) -> Path:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+            raise StorageError("Invalid upload ID")
+        return self.root / self.MULTIPART_DIR / upload_id
+
+    def _signature(self, method: str, bucket: str, key: str, expires: int, extra: str) -> str:
+        message = "\n".join((method, bucket, key, str(expires), extra))
+        return hmac.new(self.secret, message.encode(), hashlib.sha256).hexdigest()
+
+    def _signed_url(self, method: str, bucket: str, key: str, expires_in: int, extra: str, params: Dict[str, Any]) -> str:
+        expires = int(time.time()) + expires_in
+        query = {**params, "expires": expires, "signature": self._signature(method, bucket, key, expires, extra)}
+        return f"{self.base_url}{self.URL_PATH}/{quote(bucket)}/{quote(key)}?{urlencode(query)}"
+
+    @staticmethod
+    def _part_extra(upload_id: str, part_number: int) -> str:
+        return f"part:{upload_id}:{part_number}"
+
+    def verify(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        expires: int,
+        signature: str,
+        content_type: str = "",
+        upload_id: Optional[str] = None,
+        part_number: Optional[int] = None
+    ) -> bool:
+        """Whether a presigned request is authentic and unexpired."""
+        if expires < time.time():
+            return False
+        if upload_id is not None:
+            extra = self._part_extra(upload_id, part_number or 0)
+        else:
+            extra = content_type if method == "PUT" else ""
+        return hmac.compare_digest(self._signature(method, bucket, key, expires, extra), signature)
+
+    # =========================================================================
+    # PRESIGNED URLS
+    # =========================================================================
+
+    async def presign_upload(self, bucket: str, key: str, content_type: str, expires_in: int) -> str:
+        self.path_for(bucket, key)
+        return self._signed_url("PUT", bucket, key, expires_in, content_type, {})
+
+    async def presign_downloads(self, objects: List[ObjectRef], expires_in: int) -> Dict[ObjectRef, str]:
+        urls = {}
+        for bucket, key in objects:
+            self.path_for(bucket, key)
+            urls[(bucket, key)] = self._signed_url("GET", bucket, key, expires_in, "", {})
+        return urls
+
+    async def presign_upload_part(self, bucket, key, upload_id, part_number, expires_in) -> str:
+        self.path_for(bucket, key)
+        self._upload_dir(upload_id)
+        return self._signed_url(
+            "PUT", bucket, key, expires_in, self._part_extra(upload_id, part_number),
+            {"upload_id": upload_id, "part_number": part_number}
+        )
+
+    # =========================================================================
+    # OBJECTS
+    # =========================================================================
+
+    @staticmethod
+    def _write_atomic(path: Path, body: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+
+    async def put_object(self, bucket: str, key: str, body: bytes, content_type: str):
+        await asyncio.to_thread(self._write_atomic, self.path_for(bucket, key), body)
+
+    async def get_object(self, bucket: str, key: str) -> bytes:
+        path = self.path_for(bucket, key)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise StorageObjectNotFound(f"No such object: {bucket}/{key}") from e
+
+    async def delete_object(self, bucket: str, key: str):
+        path = self.path_for(bucket, key)
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    async def list_objects(self, bucket: str, prefix: str) -> List[Dict[str, Any]]:
+        bucket_dir = self.path_for(bucket, "_").parent
+        return await asyncio.to_thread(self._list, bucket_dir, prefix)
+
+    @staticmethod
+    def _list(bucket_dir: Path, prefix: str) -> List[Dict[str, Any]]:
+        # Only walk the directory the prefix points into
+        start = bucket_dir / prefix.rsplit("/", 1)[0] if "/" in prefix else bucket_dir
+        objects = []
+        for dirpath, _, filenames in os.walk(start):
+            for filename in filenames:
+                if filename.startswith(".") and filename.endswith(".tmp"):
+                    continue
+                path = Path(dirpath) / filename
+                key = path.relative_to(bucket_dir).as_posix()
+                if not key.startswith(prefix):
+                    continue
+                stat = path.stat()
+                objects.append({
+                    'key': key,
+                    'size': stat.st_size,
+                    'last_modified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+                })
+        return sorted(objects, key=lambda obj: obj['key'])
+
+    async def receive(
+        self,
+        bucket: str,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        upload_id: Optional[str] = None,
+        part_number: Optional[int] = None
+    ) -> str:
+        """
+        Store an uploaded request body (whole object or one part).
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            chunks: Request body stream
+            upload_id: Multipart upload ID (part uploads)
+            part_number: Part number (part uploads)
+
+        Returns:
+            ETag (MD5 hex of the body)
+        """
+        if upload_id is not None:
+            upload_dir = self._upload_dir(upload_id)
+            if not await asyncio.to_thread(upload_dir.is_dir):
+                raise StorageObjectNotFound(f"No such upload: {upload_id}")
+            path = upload_dir / f"part-{part_number:05d}"
+        else:
+            path = self.path_for(bucket, key)
+
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        digest = hashlib.md5()
+        handle = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            buffer = bytearray()
+            async for chunk in chunks:
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= self.WRITE_BUFFER_SIZE:
+                    await asyncio.to_thread(handle.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(handle.write, bytes(buffer))
+        except BaseException:
+            await asyncio.to_thread(handle.close)
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(handle.close)
+        await asyncio.to_thread(os.replace, tmp_path, path)
+        return digest.hexdigest()
+
+    # =========================================================================
+    # MULTIPART
+    # =========================================================================
+
+    async def create_multipart_upload(self, bucket: str, key: str, content_type: str) -> str:
+        self.path_for(bucket, key)
+        upload_id = uuid.uuid4().hex
+        meta = json.dumps({"bucket": bucket, "key": key, "content_type": content_type}).encode()
+        await asyncio.to_thread(self._write_atomic, self._upload_dir(upload_id) / "upload.json", meta)
+        return upload_id
+
+    async def complete_multipart_upload(self, bucket, key, upload_id, parts):
+        await asyncio.to_thread(self._complete, self.path_for(bucket, key), bucket, key, self._upload_dir(upload_id), parts)
+
+    def _complete(self, path: Path, bucket: str, key: str, upload_dir: Path, parts: List[Dict[str, Any]]):
+        try:
+            meta = json.loads((upload_dir / "upload.json").read_bytes())
+        except FileNotFoundError as e:
+            raise StorageObjectNotFound(f"No such upload: {upload_dir.name}") from e
+        if (meta["bucket"], meta["key"]) != (bucket, key):
+            raise StorageError("Upload ID belongs to a different object")
+
+        part_paths = []
+        for part in parts:
+            part_path = upload_dir / f"part-{int(part['PartNumber']):05d}"
+            if not part_path.exists():
+                raise StorageError(f"Part {part['PartNumber']} was not uploaded")
+            if self._md5(part_path) != str(part["ETag"]).strip('"'):
+                raise StorageError(f"ETag mismatch for part {part['PartNumber']}")
+            part_paths.append(part_path)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as out:
+            for part_path in part_paths:
+                with open(part_path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp_path, path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    @staticmethod
+    def _md5(path: Path) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    async def abort_multipart_upload(self, bucket, key, upload_id):
+        await asyncio.to_thread(shutil.rmtree, self._upload_dir(upload_id), ignore_errors=True)
+
+
+def create_storage_backend(name: str = settings.STORAGE_BACKEND) -> StorageBackend:
+    """
+    Create the configured storage backend.
+
+    Args:
+        name: Backend name ("s3" or "local")
+
+    Returns:
+        Storage backend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "s3":
+        return S3StorageBackend()
+    if name == "local":
+        return LocalStorageBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
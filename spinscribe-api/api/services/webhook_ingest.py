@@ -0,0 +1,433 @@
+# api/services/webhook_ingest.py
+"""
+Webhook Ingestion - Persist CrewAI webhook payloads
+
+Shared by the webhook endpoints (synchronous mode) and the webhook queue
+workers (queue mode), so both paths write the same rows and broadcast
+the same SSE events.
+
+Both operations are idempotent:
+- Event batches dedupe on the unique AgentActivity (event_id, timestamp) index
+- HITL checkpoints dedupe on (execution, task_id, PENDING)
+
+That makes them safe to run more than once for the same payload, which
+the queue relies on for at-least-once delivery.
+"""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.schemas.webhook import HITLWebhookPayload, WebhookEventsPayload, WebhookEvent
+from api.models.execution import CrewExecution, ExecutionStatus
+from api.models.checkpoint import HITLCheckpoint, CheckpointStatus, CheckpointType
+from api.models.activity import AgentActivity, ActivityType
+from api.services.sse import SSEConnectionManager
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT (keeps bind parameters well under Postgres' limit)
+INSERT_BATCH_SIZE = 1000
+
+
+class ExecutionNotFoundError(LookupError):
+    """Raised when a webhook references an unknown CrewAI execution."""
+
+
+# =============================================================================
+# HITL CHECKPOINTS
+# =============================================================================
+
+async def _pending_checkpoint(db: AsyncSession, execution_id: uuid.UUID, task_id: str) -> Optional[HITLCheckpoint]:
+    result = await db.execute(
+        select(HITLCheckpoint).where(
+            HITLCheckpoint.execution_id == execution_id,
+            HITLCheckpoint.task_id == task_id,
+            HITLCheckpoint.status == CheckpointStatus.PENDING
+        )
+    )
+    return result.scalars().first()
+
+
+def _duplicate_checkpoint(checkpoint: HITLCheckpoint) -> Dict[str, Any]:
+    return {
+        "status": "received",
+        "checkpoint_id": str(checkpoint.checkpoint_id),
+        "message": "Checkpoint already exists (idempotency)"
+    }
+
+
+async def process_hitl_checkpoint(
+    db: AsyncSession,
+    payload: HITLWebhookPayload,
+    sse_manager: SSEConnectionManager
+) -> Dict[str, Any]:
+    """
+    Store a HITL checkpoint and notify SSE clients.
+
+    Args:
+        db: Database session
+        payload: HITL webhook payload from CrewAI
+        sse_manager: SSE manager for broadcasting
+
+    Returns:
+        Result summary with checkpoint_id
+
+    Raises:
+        ExecutionNotFoundError: If no execution matches payload.execution_id
+    """
+    # Find our execution record by crewai_execution_id
+    result = await db.execute(
+        select(CrewExecution).where(
+            CrewExecution.crewai_execution_id == payload.execution_id
+        )
+    )
+    execution = result.scalars().first()
+
+    if not execution:
+        raise ExecutionNotFoundError(f"Execution not found: {payload.execution_id}")
+
+    logger.info(f"✅ Found execution: {execution.execution_id}")
+
+    # Check for duplicate checkpoint (idempotency)
+    existing_checkpoint = await _pending_checkpoint(db, execution.execution_id, payload.task_id)
+
+    if existing_checkpoint:
+        logger.warning("⚠️  Duplicate checkpoint detected, returning existing")
+        return _duplicate_checkpoint(existing_checkpoint)
+
+    # Infer checkpoint type from task_id
+    checkpoint_type = infer_checkpoint_type(payload.task_id)
+
+    # Create HITL checkpoint record. Two workers (or a reclaimed queue
+    # entry) can both pass the check above: the unique index on pending
+    # (execution_id, task_id) lets exactly one insert win
+    result = await db.execute(
+        pg_insert(HITLCheckpoint)
+        .values(
+            checkpoint_id=uuid.uuid4(),
+            execution_id=execution.execution_id,
+            owner_id=execution.owner_id,
+            checkpoint_type=checkpoint_type,
+            task_id=payload.task_id,
+            content=payload.task_output,
+            status=CheckpointStatus.PENDING,
+            checkpoint_metadata={
+                "agent_name": payload.agent_name,
+                "received_at": datetime.utcnow().isoformat()
+            }
+        )
+        .on_conflict_do_nothing(
+            index_elements=[HITLCheckpoint.execution_id, HITLCheckpoint.task_id],
+            index_where=text("status = 'PENDING'")
+        )
+        .returning(HITLCheckpoint.checkpoint_id)
+    )
+    checkpoint_id = result.scalar()
+
+    if checkpoint_id is None:
+        execution_id = execution.execution_id
+        await db.rollback()
+        logger.warning("⚠️  Concurrent duplicate checkpoint, returning existing")
+        existing_checkpoint = await _pending_checkpoint(db, execution_id, payload.task_id)
+        return _duplicate_checkpoint(existing_checkpoint)
+
+    # Create agent activity message for chat history
+    activity = AgentActivity(
+        execution_id=execution.execution_id,
+        agent_name=payload.agent_name or "Agent",
+        activity_type=ActivityType.MESSAGE,
+        message=f"Checkpoint reached: {checkpoint_type.value}\n\n{payload.task_output}",
+        activity_metadata={
+            "checkpoint_id": str(checkpoint_id),
+            "checkpoint_type": checkpoint_type.value,
+            "task_id": payload.task_id,
+            "requires_approval": True
+        }
+    )
+
+    db.add(activity)
+
+    # Update execution status
+    execution.status = ExecutionStatus.AWAITING_APPROVAL
+
+    # Commit all changes
+    await db.commit()
+
+    logger.info(f"✅ Checkpoint created: {checkpoint_id}")
+    logger.info(f"   Type: {checkpoint_type.value}")
+    logger.info(f"   Status: {execution.status.value}")
+
+    # Broadcast checkpoint to SSE clients
+    await sse_manager.broadcast(
+        execution_id=execution.execution_id,
+        event_type="checkpoint",
+        data={
+            "checkpoint_id": str(checkpoint_id),
+            "checkpoint_type": checkpoint_type.value,
+            "task_id": payload.task_id,
+            "requires_approval": True,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    )
+
+    return {
+        "status": "received",
+        "checkpoint_id": str(checkpoint_id),
+        "message": "Checkpoint created successfully"
+    }
+
+
+# =============================================================================
+# EVENT STREAM BATCHES
+# =============================================================================
+
+async def process_event_batch(
+    db: AsyncSession,
+    payload: WebhookEventsPayload,
+    sse_manager: SSEConnectionManager
+) -> Dict[str, Any]:
+    """
+    Store a batch of CrewAI events as agent activity and notify SSE clients.
+
+    Args:
+        db: Database session
+        payload: Event stream payload containing array of events
+        sse_manager: SSE manager for broadcasting
+
+    Returns:
+        Processing summary with event counts
+    """
+    processed_count = 0
+    skipped_count = 0
+    error_count = 0
+
+    # Sort events by timestamp to maintain chronological order
+    # Citation: "If you need ordering, use the timestamp field"
+    sorted_events = sorted(payload.events, key=lambda e: e.timestamp)
+
+    # Resolve every execution referenced by the batch in one IN query
+    crewai_execution_ids = {event.execution_id for event in sorted_events}
+    result = await db.execute(
+        select(CrewExecution.crewai_execution_id, CrewExecution.execution_id).where(
+            CrewExecution.crewai_execution_id.in_(crewai_execution_ids)
+        )
+    )
+    execution_map = dict(result.all())
+
+    # Build activity rows
+    rows = []
+    for event in sorted_events:
+        try:
+            execution_id = execution_map.get(event.execution_id)
+
+            if not execution_id:
+                logger.warning(f"⚠️  Execution not found for event: {event.execution_id}")
+                skipped_count += 1
+                continue
+
+            # Transform event into human-readable message and activity type
+            message, activity_type = transform_event_to_message(event)
+
+            rows.append({
+                "activity_id": uuid.uuid4(),
+                "execution_id": execution_id,
+                "event_id": event.id,
+                "agent_name": extract_agent_name(event),
+                "activity_type": activity_type,
+                "message": message,
+                "timestamp": event.timestamp,
+                "activity_metadata": {
+                    "event_id": event.id,
+                    "event_type": event.type,
+                    "event_data": event.data
+                }
+            })
+
+        except Exception as e:
+            logger.error(f"❌ Error processing event {event.id}: {str(e)}")
+            error_count += 1
+            continue
+
+    # Insert in multi-row statements; the unique (event_id, timestamp) index
+    # makes redelivered events (idempotency) a no-op instead of a lookup per
+    # event. A redelivery carries the same timestamp, so it hits the same
+    # monthly partition.
+    inserted_ids = set()
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = pg_insert(AgentActivity).values(
+            rows[i:i + INSERT_BATCH_SIZE]
+        ).on_conflict_do_nothing(
+            index_elements=[AgentActivity.event_id, AgentActivity.timestamp]
+        ).returning(AgentActivity.activity_id)
+        result = await db.execute(stmt)
+        inserted_ids.update(result.scalars().all())
+
+    # Commit all processed events
+    await db.commit()
+
+    processed_count = len(inserted_ids)
+    duplicate_count = len(rows) - processed_count
+    skipped_count += duplicate_count
+    if duplicate_count:
+        logger.debug(f"⏭️  Skipped {duplicate_count} duplicate events")
+
+    # Broadcast newly stored messages to SSE clients
+    for row in rows:
+        if row["activity_id"] not in inserted_ids:
+            continue
+
+        await sse_manager.broadcast(
+            execution_id=row["execution_id"],
+            event_type="message",
+            data={
+                "message_id": str(row["activity_id"]),
+                "sender_type": "agent",
+                "sender_name": row["agent_name"],
+                "content": row["message"],
+                "activity_type": row["activity_type"].value,
+                "timestamp": row["timestamp"].isoformat()
+            }
+        )
+
+    logger.info("✅ Event stream processed:")
+    logger.info(f"   Processed: {processed_count}")
+    logger.info(f"   Skipped (duplicates): {skipped_count}")
+    logger.info(f"   Errors: {error_count}")
+
+    return {
+        "status": "received",
+        "events_processed": processed_count,
+        "events_skipped": skipped_count,
+        "events_error": error_count,
+        "total_events": len(payload.events)
+    }
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def infer_checkpoint_type(task_id: str) -> CheckpointType:
+    """
+    Infer checkpoint type from task ID.
+
+    Maps task identifiers to checkpoint types based on naming conventions.
+
+    Args:
+        task_id: Task identifier from CrewAI
+
+    Returns:
+        Inferred checkpoint type
+    """
+    task_lower = task_id.lower()
+
+    if "brand" in task_lower or "voice" in task_lower:
+        return CheckpointType.BRAND_VOICE
+    elif "style" in task_lower or "compliance" in task_lower:
+        return CheckpointType.STYLE_COMPLIANCE
+    elif "qa" in task_lower or "final" in task_lower or "review" in task_lower:
+        return CheckpointType.FINAL_QA
+    else:
+        # Default to final QA if can't determine
+        return CheckpointType.FINAL_QA
+
+
+def transform_event_to_message(event: WebhookEvent) -> tuple[str, ActivityType]:
+    """
+    Transform CrewAI event into human-readable message.
+
+    Converts technical event types into user-friendly chat messages.
+
+    Args:
+        event: Webhook event from CrewAI
+
+    Returns:
+        Tuple of (message_text, activity_type)
+    """
+    event_type = event.type
+    data = event.data
+
+    # Task events
+    if event_type == "task_started":
+        task_name = data.get("task_name", data.get("task_id", "unknown"))
+        return f"Started task: {task_name}", ActivityType.TASK_START
+
+    elif event_type == "task_completed":
+        task_name = data.get("task_name", data.get("task_id", "unknown"))
+        return f"Completed task: {task_name}", ActivityType.TASK_COMPLETE
+
+    elif event_type == "task_failed":
+        task_name = data.get("task_name", data.get("task_id", "unknown"))
+        error = data.get("error", "Unknown error")
+        return f"Task failed: {task_name} - {error}", ActivityType.ERROR
+
+    # Agent events
+    elif event_type == "agent_execution_started":
+        agent_name = data.get("agent_name", "Agent")
+        return f"{agent_name} started working", ActivityType.AGENT_THINKING
+
+    elif event_type == "agent_execution_completed":
+        agent_name = data.get("agent_name", "Agent")
+        return f"{agent_name} finished", ActivityType.AGENT_THINKING
+
+    # LLM events
+    elif event_type == "llm_call_started":
+        model = data.get("model", "AI model")
+        return f"Calling {model}", ActivityType.LLM_CALL
+
+    elif event_type == "llm_call_completed":
+        model = data.get("model", "AI model")
+        return f"{model} responded", ActivityType.LLM_CALL
+
+    # Tool events
+    elif event_type == "tool_usage_started":
+        tool_name = data.get("tool_name", "tool")
+        return f"Using tool: {tool_name}", ActivityType.TOOL_USAGE
+
+    elif event_type == "tool_usage_finished":
+        tool_name = data.get("tool_name", "tool")
+        return f"Finished using: {tool_name}", ActivityType.TOOL_USAGE
+
+    # Crew events
+    elif event_type == "crew_kickoff_started":
+        return "Crew execution started", ActivityType.CREW_KICKOFF
+
+    elif event_type == "crew_kickoff_completed":
+        return "Crew execution completed", ActivityType.MESSAGE
+
+    elif event_type == "crew_kickoff_failed":
+        error = data.get("error", "Unknown error")
+        return f"Crew execution failed: {error}", ActivityType.ERROR
+
+    # Default for unknown event types
+    else:
+        return f"Event: {event_type}", ActivityType.MESSAGE
+
+
+def extract_agent_name(event: WebhookEvent) -> str:
+    """
+    Extract agent name from event data.
+
+    Args:
+        event: Webhook event from CrewAI
+
+    Returns:
+        Agent name or default
+    """
+    data = event.data
+
+    # Try various fields where agent name might be
+    agent_name = (
+        data.get("agent_name") or
+        data.get("agent") or
+        data.get("actor") or
+        "System"
+    )
+
+    return agent_name
@@ -0,0 +1,314 @@
+# api/services/webhook_queue.py
+"""
+Webhook Queue - Ack-first ingestion for CrewAI webhooks
+
+In queue mode (WEBHOOK_INGEST_MODE=queue) the webhook endpoints append the
+raw payload to a Redis stream and return 202 immediately. A pool of async
+workers drains the stream into the database and SSE clients.
+
+Delivery is at-least-once:
+- Workers read through a consumer group (XREADGROUP)
+- An entry is acknowledged (XACK + XDEL) only after it was processed
+- Entries left pending by a crashed or stuck worker are reclaimed with
+  XAUTOCLAIM once they have been idle for WEBHOOK_QUEUE_CLAIM_IDLE_MS
+- Entries that keep failing are moved to a dead-letter stream after
+  WEBHOOK_QUEUE_MAX_DELIVERIES attempts
+
+Replays are harmless because ingestion is idempotent, also when two
+workers process the same entry at once: events are inserted with
+ON CONFLICT (event_id, timestamp) DO NOTHING, and a unique index allows a
+single pending checkpoint per (execution, task) (see
+api/services/webhook_ingest.py).
+
+References:
+- Redis Streams: https://redis.io/docs/latest/develop/data-types/streams/
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Dict, Any, List, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from api.config import settings
+from api.database import AsyncSessionLocal
+from api.schemas.webhook import HITLWebhookPayload, WebhookEventsPayload
+from api.services.redis_client import get_redis
+from api.services.sse import get_sse_manager
+from api.services.webhook_ingest import (
+    process_event_batch,
+    process_hitl_checkpoint,
+    ExecutionNotFoundError
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookQueue:
+    """
+    Durable Redis-stream queue for webhook payloads.
+
+    Features:
+    - Ack-first enqueue (one XADD per webhook call)
+    - Configurable number of drain workers per process
+    - At-least-once processing with pending-entry reclaim
+    - Dead-letter stream for poison payloads
+    - Queue depth / lag metrics
+    """
+
+    # Payload kinds
+    KIND_EVENTS = "events"
+    KIND_HITL = "hitl"
+
+    def __init__(
+        self,
+        stream: str = settings.WEBHOOK_QUEUE_STREAM,
+        group: str = settings.WEBHOOK_QUEUE_GROUP,
+        workers: int = settings.WEBHOOK_QUEUE_WORKERS,
+        read_count: int = settings.WEBHOOK_QUEUE_READ_COUNT,
+        claim_idle_ms: int = settings.WEBHOOK_QUEUE_CLAIM_IDLE_MS,
+        max_deliveries: int = settings.WEBHOOK_QUEUE_MAX_DELIVERIES
+    ):
+        self.stream = stream
+        self.dead_letter_stream = f"{stream}:dead"
+        self.group = group
+        self.workers = workers
+        self.read_count = read_count
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+
+        # Unique per process so each worker process has its own pending list
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+        # Counters (per process)
+        self.enqueued_total = 0
+        self.processed_total = 0
+        self.failed_total = 0
+        self.dead_lettered_total = 0
+        self.reclaimed_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Create the consumer group (if needed) and start drain workers."""
+        redis = get_redis()
+
+        try:
+            await redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+            logger.info(f"Created consumer group {self.group} on {self.stream}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._stopping.clear()
+        for i in range(self.workers):
+            self._tasks.append(
+                asyncio.create_task(self._worker(i), name=f"webhook-queue-{i}")
+            )
+
+        logger.info(
+            f"✅ Webhook queue started: stream={self.stream}, "
+            f"workers={self.workers}, consumer={self.consumer}"
+        )
+
+    async def stop(self):
+        """Stop drain workers. Unacknowledged entries stay pending for reclaim."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("🛑 Webhook queue stopped")
+
+    # =========================================================================
+    # PRODUCER
+    # =========================================================================
+
+    async def enqueue(self, kind: str, payload_json: str) -> str:
+        """
+        Append a raw webhook payload to the stream.
+
+        Args:
+            kind: Payload kind (KIND_EVENTS or KIND_HITL)
+            payload_json: JSON-encoded payload
+
+        Returns:
+            Stream entry ID
+        """
+        entry_id = await get_redis().xadd(
+            self.stream,
+            {"kind": kind, "payload": payload_json}
+        )
+        self.enqueued_total += 1
+        return entry_id
+
+    # =========================================================================
+    # CONSUMERS
+    # =========================================================================
+
+    async def _worker(self, worker_index: int):
+        """Drain loop: reclaim stale entries, then read new ones."""
+        redis = get_redis()
+        claim_cursor = "0-0"
+
+        while not self._stopping.is_set():
+            try:
+                # Reclaim entries abandoned by crashed or stuck consumers
+                claim_cursor, claimed = await self._reclaim(claim_cursor)
+                for entry_id, fields in claimed:
+                    await self._handle(entry_id, fields, reclaimed=True)
+
+                response = await redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {self.stream: ">"},
+                    count=self.read_count,
+                    block=5000
+                )
+
+                for _stream, entries in response or []:
+                    for entry_id, fields in entries:
+                        await self._handle(entry_id, fields)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Webhook queue worker {worker_index} error: {e}")
+                await asyncio.sleep(1)
+
+    async def _reclaim(self, cursor: str) -> Tuple[str, list]:
+        """Claim entries pending longer than claim_idle_ms."""
+        result = await get_redis().xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id=cursor,
+            count=self.read_count
+        )
+        next_cursor, claimed = result[0], result[1]
+        claimed = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        if claimed:
+            self.reclaimed_total += len(claimed)
+            logger.warning(f"♻️  Reclaimed {len(claimed)} pending webhook entries")
+        return next_cursor, claimed
+
+    async def _handle(self, entry_id: str, fields: Dict[str, str], reclaimed: bool = False):
+        """Process one stream entry and acknowledge it on success."""
+        redis = get_redis()
+
+        if reclaimed and await self._delivery_count(entry_id) > self.max_deliveries:
+            await redis.xadd(self.dead_letter_stream, fields)
+            await self._ack(entry_id)
+            self.dead_lettered_total += 1
+            logger.error(f"☠️  Webhook entry {entry_id} moved to {self.dead_letter_stream}")
+            return
+
+        try:
+            await self._process(fields)
+        except ExecutionNotFoundError as e:
+            # Same outcome as the synchronous endpoint's 404 - drop it
+            logger.warning(f"⚠️  Dropping webhook entry {entry_id}: {e}")
+        except Exception as e:
+            # Leave pending; it will be reclaimed and retried
+            self.failed_total += 1
+            logger.error(f"❌ Failed to process webhook entry {entry_id}: {e}")
+            return
+
+        await self._ack(entry_id)
+        self.processed_total += 1
+
+    async def _process(self, fields: Dict[str, str]):
+        """Write one payload to the database and broadcast it."""
+        kind = fields.get("kind")
+        payload = json.loads(fields["payload"])
+        sse_manager = get_sse_manager()
+
+        async with AsyncSessionLocal() as db:
+            if kind == self.KIND_EVENTS:
+                await process_event_batch(db, WebhookEventsPayload(**payload), sse_manager)
+            elif kind == self.KIND_HITL:
+                await process_hitl_checkpoint(db, HITLWebhookPayload(**payload), sse_manager)
+            else:
+                raise ValueError(f"Unknown webhook payload kind: {kind}")
+
+    async def _ack(self, entry_id: str):
+        """Acknowledge and delete an entry so the stream length is the backlog."""
+        redis = get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+
+    async def _delivery_count(self, entry_id: str) -> int:
+        """Number of times an entry has been delivered to a consumer."""
+        pending = await get_redis().xpending_range(
+            self.stream, self.group, min=entry_id, max=entry_id, count=1
+        )
+        return pending[0]["times_delivered"] if pending else 0
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and processing counters.
+
+        Returns:
+            Dict with depth (entries not yet acknowledged), pending (delivered
+            but unacknowledged), dead-letter depth and per-process counters
+        """
+        redis = get_redis()
+        depth = await redis.xlen(self.stream)
+        dead_letter_depth = await redis.xlen(self.dead_letter_stream)
+
+        pending = 0
+        oldest_pending_ms: Optional[int] = None
+        try:
+            summary = await redis.xpending(self.stream, self.group)
+            pending = summary["pending"]
+            if pending:
+                oldest = await redis.xpending_range(
+                    self.stream, self.group, min="-", max="+", count=1
+                )
+                if oldest:
+                    oldest_pending_ms = oldest[0]["time_since_delivered"]
+        except ResponseError:
+            # Group not created yet
+            pass
+
+        return {
+            "stream": self.stream,
+            "depth": depth,
+            "pending": pending,
+            "oldest_pending_ms": oldest_pending_ms,
+            "dead_letter_depth": dead_letter_depth,
+            "workers": len(self._tasks),
+            "enqueued_total": self.enqueued_total,
+            "processed_total": self.processed_total,
+            "failed_total": self.failed_total,
+            "reclaimed_total": self.reclaimed_total,
+            "dead_lettered_total": self.dead_lettered_total,
+        }
+
+
+# Global webhook queue instance
+webhook_queue = WebhookQueue()
+
+
+def get_webhook_queue() -> WebhookQueue:
+    """
+    Get the global webhook queue instance.
+
+    Used as FastAPI dependency.
+    """
+    return webhook_queue
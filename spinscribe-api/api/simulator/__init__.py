@@ -0,0 +1,7 @@
+# api/simulator/__init__.py
+"""
+CrewAI AMP simulator for load and latency testing.
+
+Stands in for the deployed SpinscribeCrew so the API can be driven with
+synthetic crews without the CrewAI platform. See server.py.
+"""
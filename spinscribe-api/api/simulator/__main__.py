@@ -0,0 +1,38 @@
+# api/simulator/__main__.py
+"""
+Run the CrewAI simulator.
+
+Usage:
+    python -m api.simulator [--host 0.0.0.0] [--port 9000]
+
+Behaviour is configured with CREWAI_SIM_* environment variables.
+"""
+
+import argparse
+import logging
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local CrewAI AMP simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    uvicorn.run(
+        "api.simulator.server:app",
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        access_log=False
+    )
+
+
+if __name__ == "__main__":
+    main()
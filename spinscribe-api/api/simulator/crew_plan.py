@@ -0,0 +1,205 @@
+# api/simulator/crew_plan.py
+"""
+Crew Plan - The SpinscribeCrew task sequence, read from source
+
+The simulator replays the same tasks, agents and HITL checkpoints as the
+deployed crew. Rather than importing src/spinscribe/crew.py (which needs
+crewai, API keys and exits on missing env), the plan is read statically:
+- crew.py: @task methods in definition order, which tasks_config entry
+  each one uses, and whether it sets human_input=True; @agent methods
+  that attach tools
+- config/tasks.yaml: the agent assigned to each task
+- config/agents.yaml: each agent's role (display name)
+
+The YAML files are scanned with regular expressions for the few keys
+needed, so the simulator has no YAML dependency.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# src/spinscribe (sibling of the api package)
+CREW_DIR = Path(__file__).resolve().parents[2] / "src" / "spinscribe"
+
+# Tool name reported in tool_usage events for agents with SerperDevTool
+SEARCH_TOOL_NAME = "Search the internet with Serper"
+
+
+@dataclass(frozen=True)
+class PlannedTask:
+    """One task of the crew, in execution order."""
+    task_id: str  # tasks.yaml key, e.g. "brand_voice_analysis_task"
+    agent_key: str
+    agent_role: str  # may contain {client_name}
+    human_input: bool
+    uses_tools: bool
+
+    @property
+    def task_name(self) -> str:
+        """Human-readable name ("Brand Voice Analysis")."""
+        name = self.task_id[:-len("_task")] if self.task_id.endswith("_task") else self.task_id
+        return name.replace("_", " ").title()
+
+    def agent_name(self, inputs: Dict[str, str]) -> str:
+        """Agent role with crew inputs filled in."""
+        try:
+            return self.agent_role.format(**inputs)
+        except (KeyError, IndexError, ValueError):
+            return self.agent_role
+
+
+def _decorator_names(node: ast.FunctionDef) -> List[str]:
+    names = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        if isinstance(decorator, ast.Name):
+            names.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            names.append(decorator.attr)
+    return names
+
+
+def _config_key(node: ast.FunctionDef, config_name: str) -> Optional[str]:
+    """First self.<config_name>['key'] subscript in a method body."""
+    for child in ast.walk(node):
+        if (
+            isinstance(child, ast.Subscript)
+            and isinstance(child.value, ast.Attribute)
+            and child.value.attr == config_name
+            and isinstance(child.slice, ast.Constant)
+            and isinstance(child.slice.value, str)
+        ):
+            return child.slice.value
+    return None
+
+
+def _sets_human_input(node: ast.FunctionDef) -> bool:
+    """Whether the method sets human_input=True (subscript or keyword)."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Assign):
+            for target in child.targets:
+                if (
+                    isinstance(target, ast.Subscript)
+                    and isinstance(target.slice, ast.Constant)
+                    and target.slice.value == "human_input"
+                    and isinstance(child.value, ast.Constant)
+                    and child.value.value is True
+                ):
+                    return True
+        elif isinstance(child, ast.keyword):
+            if child.arg == "human_input" and isinstance(child.value, ast.Constant) and child.value.value is True:
+                return True
+    return False
+
+
+def _passes_tools(node: ast.FunctionDef) -> bool:
+    """Whether an @agent method passes a non-empty tools list."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.keyword) and child.arg == "tools":
+            return not (isinstance(child.value, ast.List) and not child.value.elts)
+    return False
+
+
+def _parse_crew(source: str) -> Tuple[List[Tuple[str, bool]], Dict[str, bool]]:
+    """
+    Extract (tasks_config key, human_input) per @task and tool usage per @agent.
+    """
+    tree = ast.parse(source)
+    tasks: List[Tuple[str, bool]] = []
+    agent_tools: Dict[str, bool] = {}
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for item in node.body:
+            if not isinstance(item, ast.FunctionDef):
+                continue
+            decorators = _decorator_names(item)
+            if "task" in decorators:
+                key = _config_key(item, "tasks_config") or item.name
+                tasks.append((key, _sets_human_input(item)))
+            elif "agent" in decorators:
+                key = _config_key(item, "agents_config") or item.name
+                agent_tools[key] = _passes_tools(item)
+
+    return tasks, agent_tools
+
+
+def _parse_task_agents(text: str) -> Dict[str, str]:
+    """tasks.yaml: top-level task key -> agent."""
+    agents: Dict[str, str] = {}
+    current = None
+    for line in text.splitlines():
+        top = re.match(r"^([A-Za-z_][\w]*):\s*$", line)
+        if top:
+            current = top.group(1)
+            continue
+        agent = re.match(r"^\s+agent:\s*([\w]+)\s*$", line)
+        if agent and current:
+            agents[current] = agent.group(1)
+    return agents
+
+
+def _parse_agent_roles(text: str) -> Dict[str, str]:
+    """agents.yaml: top-level agent key -> role (first line of a folded block)."""
+    roles: Dict[str, str] = {}
+    current = None
+    in_role = False
+    for line in text.splitlines():
+        top = re.match(r"^([A-Za-z_][\w]*):\s*$", line)
+        if top:
+            current, in_role = top.group(1), False
+            continue
+        role = re.match(r"^\s+role:\s*(.*)$", line)
+        if role and current:
+            value = role.group(1).strip()
+            if value and value not in (">", "|", ">-", "|-"):
+                roles[current] = value.strip("'\"")
+            else:
+                in_role = True
+            continue
+        if in_role and line.strip():
+            roles[current] = line.strip()
+            in_role = False
+    return roles
+
+
+@lru_cache(maxsize=1)
+def load_crew_plan(crew_dir: Path = CREW_DIR) -> Tuple[PlannedTask, ...]:
+    """
+    Load the SpinscribeCrew task sequence.
+
+    Args:
+        crew_dir: Directory containing crew.py and config/
+
+    Returns:
+        Tasks in execution order (Process.sequential)
+
+    Raises:
+        FileNotFoundError: If crew.py is missing
+        ValueError: If crew.py defines no @task methods
+    """
+    tasks, agent_tools = _parse_crew((crew_dir / "crew.py").read_text())
+    if not tasks:
+        raise ValueError(f"No @task methods found in {crew_dir / 'crew.py'}")
+
+    config_dir = crew_dir / "config"
+    task_agents = _parse_task_agents((config_dir / "tasks.yaml").read_text())
+    agent_roles = _parse_agent_roles((config_dir / "agents.yaml").read_text())
+
+    plan = []
+    for task_id, human_input in tasks:
+        agent_key = task_agents.get(task_id, "agent")
+        plan.append(PlannedTask(
+            task_id=task_id,
+            agent_key=agent_key,
+            agent_role=agent_roles.get(agent_key, agent_key.replace("_", " ").title()),
+            human_input=human_input,
+            uses_tools=agent_tools.get(agent_key, False)
+        ))
+    return tuple(plan)
@@ -0,0 +1,662 @@
+# api/simulator/server.py
+"""
+CrewAI AMP Simulator - Local stand-in for the deployed crew
+
+Implements the CrewAI endpoints called by CrewAIService:
+- POST /kickoff          -> {"kickoff_id", "status"}
+- POST /resume           -> continue (or retry) a task paused for human input
+- GET  /status/{id}      -> execution state and progress
+- POST /cancel/{id}      -> stop a running execution
+
+Each kickoff replays the SpinscribeCrew task sequence (see crew_plan.py):
+events are emitted as WebhookEventsPayload batches to the "webhooks" URL
+from the request, and at every human_input task the crew posts a
+HITLWebhookPayload to the "humanInputWebhook" URL and pauses until
+/resume. A rejected checkpoint re-runs the task with the feedback, like
+the real crew.
+
+Everything that matters for load testing is configurable through
+CREWAI_SIM_* environment variables (see SimulatorSettings): endpoint
+latency, event rate and batch size, and failure injection (failed API
+calls, failed crews, dropped webhook batches).
+
+Run:
+    python -m api.simulator --port 9000
+    CREWAI_API_URL=http://localhost:9000 uvicorn api.main:app
+
+GET /stats reports simulator counters.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, status
+from pydantic_settings import BaseSettings
+
+from api.schemas.webhook import HITLWebhookPayload, WebhookEvent
+from api.services.resilience import backoff_delay
+from api.simulator.crew_plan import PlannedTask, SEARCH_TOOL_NAME, load_crew_plan
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+
+class SimulatorSettings(BaseSettings):
+    # Auth: require this bearer token on incoming calls (None = accept any)
+    BEARER_TOKEN: Optional[str] = None
+
+    # Endpoint latency (added to every /kickoff, /resume, /status, /cancel)
+    RESPONSE_LATENCY_MS: float = 50.0
+    RESPONSE_JITTER_MS: float = 25.0
+
+    # Crew pacing
+    EVENTS_PER_SECOND: float = 5.0  # per crew; 0 = as fast as possible
+    LLM_CALLS_PER_TASK: int = 3
+    STREAM_CHUNKS_PER_LLM_CALL: int = 0  # llm_stream_chunk events
+    TOOL_CALLS_PER_TASK: int = 1  # only agents with tools
+    TASK_OUTPUT_CHARS: int = 2000
+    MODEL_NAME: str = "gpt-4o"
+
+    # Webhook batching ("realtime": true in the kickoff sends one event per call)
+    BATCH_SIZE: int = 10
+    BATCH_MAX_WAIT_SECONDS: float = 1.0
+
+    # Failure injection (probabilities, 0.0 - 1.0)
+    KICKOFF_FAILURE_RATE: float = 0.0
+    RESUME_FAILURE_RATE: float = 0.0
+    STATUS_FAILURE_RATE: float = 0.0
+    FAILURE_STATUS_CODE: int = 503
+    TASK_FAILURE_RATE: float = 0.0  # per task; fails the crew
+    WEBHOOK_DROP_RATE: float = 0.0  # batch silently not delivered
+
+    # Webhook delivery
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_MAX_CONNECTIONS: int = 200
+    WEBHOOK_RETRIES: int = 2
+
+    # Finished executions are forgotten after this long
+    RETENTION_SECONDS: float = 900.0
+
+    SEED: Optional[int] = None
+
+    class Config:
+        env_prefix = "CREWAI_SIM_"
+        env_file = ".env"
+        case_sensitive = True
+        extra = "ignore"
+
+
+# =============================================================================
+# EXECUTION STATE
+# =============================================================================
+
+RUNNING = "running"
+PENDING_HUMAN_INPUT = "pending_human_input"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = {COMPLETED, FAILED, CANCELLED}
+
+
+@dataclass
+class SimulatedExecution:
+    """One simulated crew run."""
+    kickoff_id: str
+    inputs: Dict[str, Any]
+    stream_config: Dict[str, Any]
+    hitl_config: Dict[str, Any]
+
+    status: str = RUNNING
+    task_index: int = 0
+    awaiting_task_id: Optional[str] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[float] = None  # monotonic
+
+    # Human input handshake
+    resume_event: asyncio.Event = field(default_factory=asyncio.Event)
+    decision: Optional[Tuple[bool, str]] = None  # (is_approve, feedback)
+
+    # Pending stream batch
+    buffer: List[Dict[str, Any]] = field(default_factory=list)
+    buffer_started_at: float = 0.0
+
+    runner: Optional[asyncio.Task] = None
+    events_emitted: int = 0
+
+
+class CrewSimulator:
+    """
+    Runs simulated crews and delivers their webhooks.
+
+    Features:
+    - Task sequence, agents and checkpoints from SpinscribeCrew
+    - Paced event emission with size/time-bounded batches
+    - HITL pause/resume with retry on rejection
+    - Idempotency-Key replay on /kickoff and /resume
+    - Failure injection for API calls, crews and webhook batches
+    """
+
+    def __init__(self, config: Optional[SimulatorSettings] = None):
+        self.config = config or SimulatorSettings()
+        self.plan: Tuple[PlannedTask, ...] = load_crew_plan()
+        self.random = random.Random(self.config.SEED)
+
+        self.executions: Dict[str, SimulatedExecution] = {}
+        self._kickoff_responses: Dict[str, Dict[str, Any]] = {}
+        self._resume_responses: Dict[str, Dict[str, Any]] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Counters
+        self.kickoffs_total = 0
+        self.resumes_total = 0
+        self.events_emitted_total = 0
+        self.batches_sent_total = 0
+        self.batches_dropped_total = 0
+        self.webhook_errors_total = 0
+        self.hitl_sent_total = 0
+        self.injected_failures_total = 0
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def start(self):
+        """Open the shared webhook client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.config.WEBHOOK_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.config.WEBHOOK_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.WEBHOOK_MAX_CONNECTIONS
+                )
+            )
+        logger.info(
+            f"✅ CrewAI simulator ready: {len(self.plan)} tasks, "
+            f"{sum(task.human_input for task in self.plan)} HITL checkpoints"
+        )
+
+    async def stop(self):
+        """Cancel running crews and close the webhook client."""
+        runners = [e.runner for e in self.executions.values() if e.runner and not e.runner.done()]
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info("🛑 CrewAI simulator stopped")
+
+    # =========================================================================
+    # API OPERATIONS
+    # =========================================================================
+
+    def inject_failure(self, rate: float) -> bool:
+        """Roll for an injected failure."""
+        if rate > 0 and self.random.random() < rate:
+            self.injected_failures_total += 1
+            return True
+        return False
+
+    async def respond_latency(self):
+        """Simulated API latency."""
+        latency = self.config.RESPONSE_LATENCY_MS + self.random.uniform(0, self.config.RESPONSE_JITTER_MS)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def kickoff(self, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Start a simulated crew."""
+        self._prune()
+
+        if idempotency_key and idempotency_key in self._kickoff_responses:
+            return self._kickoff_responses[idempotency_key]
+
+        execution = SimulatedExecution(
+            kickoff_id=str(uuid.uuid4()),
+            inputs=dict(payload.get("inputs") or {}),
+            stream_config=payload.get("webhooks") or {},
+            hitl_config=payload.get("humanInputWebhook") or {}
+        )
+        self.executions[execution.kickoff_id] = execution
+        execution.runner = asyncio.create_task(
+            self._run(execution), name=f"sim-crew-{execution.kickoff_id}"
+        )
+        self.kickoffs_total += 1
+
+        response = {"kickoff_id": execution.kickoff_id, "status": RUNNING}
+        if idempotency_key:
+            self._kickoff_responses[idempotency_key] = response
+        return response
+
+    def resume(self, payload: Dict[str, Any], idempotency_key: Optional[str]) -> Dict[str, Any]:
+        """
+        Deliver a human decision to a paused crew.
+
+        Raises:
+            HTTPException: 404 for unknown executions, 409 if the crew is not
+                waiting on the given task
+        """
+        if idempotency_key and idempotency_key in self._resume_responses:
+            return self._resume_responses[idempotency_key]
+
+        execution = self.executions.get(str(payload.get("execution_id")))
+        if execution is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
+
+        task_id = payload.get("task_id")
+        if execution.status != PENDING_HUMAN_INPUT or execution.awaiting_task_id != task_id:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Execution is not waiting for input on task {task_id} (status: {execution.status})"
+            )
+
+        # Resume calls re-provide webhook configuration (it isn't persisted)
+        execution.stream_config = payload.get("webhooks") or execution.stream_config
+        execution.hitl_config = payload.get("humanInputWebhook") or execution.hitl_config
+
+        is_approve = bool(payload.get("is_approve"))
+        execution.decision = (is_approve, str(payload.get("human_feedback") or ""))
+        execution.status = RUNNING
+        execution.awaiting_task_id = None
+        execution.resume_event.set()
+        self.resumes_total += 1
+
+        response = {"status": "resumed", "execution_id": execution.kickoff_id, "task_id": task_id}
+        if idempotency_key:
+            self._resume_responses[idempotency_key] = response
+        return response
+
+    def get_status(self, kickoff_id: str) -> Dict[str, Any]:
+        """
+        Execution state.
+
+        Raises:
+            HTTPException: 404 for unknown executions
+        """
+        execution = self._get(kickoff_id)
+        current = self.plan[min(execution.task_index, len(self.plan) - 1)]
+        return {
+            "status": execution.status,
+            "current_task": None if execution.status in FINISHED else current.task_id,
+            "awaiting_task_id": execution.awaiting_task_id,
+            "progress": {
+                "completed_tasks": execution.task_index,
+                "total_tasks": len(self.plan)
+            },
+            "result": execution.result,
+            "error": execution.error,
+            "events_emitted": execution.events_emitted,
+            "created_at": execution.created_at.isoformat()
+        }
+
+    def cancel(self, kickoff_id: str) -> Dict[str, Any]:
+        """
+        Stop a crew.
+
+        Raises:
+            HTTPException: 404 for unknown executions
+        """
+        execution = self._get(kickoff_id)
+        if execution.status not in FINISHED:
+            if execution.runner and not execution.runner.done():
+                execution.runner.cancel()
+            self._finish(execution, CANCELLED)
+        return {"status": execution.status, "execution_id": kickoff_id}
+
+    def _get(self, kickoff_id: str) -> SimulatedExecution:
+        execution = self.executions.get(kickoff_id)
+        if execution is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
+        return execution
+
+    def _finish(self, execution: SimulatedExecution, final_status: str):
+        execution.status = final_status
+        execution.awaiting_task_id = None
+        execution.finished_at = time.monotonic()
+
+    def _prune(self):
+        """Forget executions that finished more than RETENTION_SECONDS ago."""
+        cutoff = time.monotonic() - self.config.RETENTION_SECONDS
+        expired = [
+            kickoff_id for kickoff_id, execution in self.executions.items()
+            if execution.finished_at is not None and execution.finished_at < cutoff
+        ]
+        for kickoff_id in expired:
+            del self.executions[kickoff_id]
+
+        # Idempotency replies only matter while a call can be redelivered
+        for responses in (self._kickoff_responses, self._resume_responses):
+            if len(responses) > 10 * max(len(self.executions), 1000):
+                responses.clear()
+
+    # =========================================================================
+    # CREW REPLAY
+    # =========================================================================
+
+    async def _run(self, execution: SimulatedExecution):
+        """Replay the crew from kickoff to completion."""
+        try:
+            await self._emit(execution, "crew_kickoff_started", {
+                "crew_name": "SpinscribeCrew",
+                "inputs": execution.inputs
+            })
+
+            while execution.task_index < len(self.plan):
+                task = self.plan[execution.task_index]
+                feedback = None
+
+                while True:
+                    output = await self._run_task(execution, task, feedback)
+                    if output is None:
+                        return  # crew failed
+
+                    if not task.human_input:
+                        break
+
+                    is_approve, feedback = await self._wait_for_human(execution, task, output)
+                    if is_approve:
+                        break
+                    logger.debug(f"Task {task.task_id} rejected, retrying with feedback")
+
+                execution.task_index += 1
+
+            execution.result = output
+            await self._emit(execution, "crew_kickoff_completed", {
+                "crew_name": "SpinscribeCrew",
+                "output": output[:500]
+            })
+            await self._flush(execution)
+            self._finish(execution, COMPLETED)
+
+        except asyncio.CancelledError:
+            if execution.status not in FINISHED:
+                self._finish(execution, CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"❌ Simulated crew {execution.kickoff_id} crashed: {e}")
+            execution.error = str(e)
+            self._finish(execution, FAILED)
+
+    async def _run_task(
+        self,
+        execution: SimulatedExecution,
+        task: PlannedTask,
+        feedback: Optional[str]
+    ) -> Optional[str]:
+        """
+        Emit one task's events.
+
+        Returns:
+            Task output, or None if an injected failure failed the crew
+        """
+        agent_name = task.agent_name(execution.inputs)
+        task_data = {"task_id": task.task_id, "task_name": task.task_name, "agent_name": agent_name}
+
+        await self._emit(execution, "task_started", task_data)
+        await self._emit(execution, "agent_execution_started", {**task_data, "agent_role": agent_name})
+
+        tool_calls = self.config.TOOL_CALLS_PER_TASK if task.uses_tools else 0
+        for call in range(max(self.config.LLM_CALLS_PER_TASK, 1)):
+            llm_data = {**task_data, "model": self.config.MODEL_NAME, "call_index": call}
+            await self._emit(execution, "llm_call_started", llm_data)
+            for chunk in range(self.config.STREAM_CHUNKS_PER_LLM_CALL):
+                await self._emit(execution, "llm_stream_chunk", {**llm_data, "chunk_index": chunk})
+            await self._emit(execution, "llm_call_completed", {
+                **llm_data,
+                "prompt_tokens": self.random.randint(800, 4000),
+                "completion_tokens": self.random.randint(200, 1500)
+            })
+
+            if call < tool_calls:
+                tool_data = {**task_data, "tool_name": SEARCH_TOOL_NAME, "tool_args": {"search_query": execution.inputs.get("topic", "")}}
+                await self._emit(execution, "tool_usage_started", tool_data)
+                await self._emit(execution, "tool_usage_finished", tool_data)
+
+        if self.inject_failure(self.config.TASK_FAILURE_RATE):
+            error = f"Simulated failure in {task.task_name}"
+            await self._emit(execution, "agent_execution_error", {**task_data, "error": error})
+            await self._emit(execution, "task_failed", {**task_data, "error": error})
+            await self._emit(execution, "crew_kickoff_failed", {"crew_name": "SpinscribeCrew", "error": error})
+            await self._flush(execution)
+            execution.error = error
+            self._finish(execution, FAILED)
+            return None
+
+        output = self._task_output(execution, task, feedback)
+        await self._emit(execution, "agent_execution_completed", {**task_data, "output": output[:200]})
+        await self._emit(execution, "task_completed", {**task_data, "output": output[:500]})
+        return output
+
+    async def _wait_for_human(
+        self,
+        execution: SimulatedExecution,
+        task: PlannedTask,
+        output: str
+    ) -> Tuple[bool, str]:
+        """Send the HITL webhook and pause until /resume."""
+        # Events before the checkpoint are delivered first
+        await self._flush(execution)
+
+        execution.resume_event.clear()
+        execution.decision = None
+        execution.status = PENDING_HUMAN_INPUT
+        execution.awaiting_task_id = task.task_id
+
+        payload = HITLWebhookPayload(
+            execution_id=execution.kickoff_id,
+            task_id=task.task_id,
+            task_output=output,
+            agent_name=task.agent_name(execution.inputs),
+            timestamp=datetime.now(timezone.utc)
+        )
+        if await self._post(execution.hitl_config, payload.model_dump(mode="json")):
+            self.hitl_sent_total += 1
+
+        await execution.resume_event.wait()
+        return execution.decision
+
+    def _task_output(self, execution: SimulatedExecution, task: PlannedTask, feedback: Optional[str]) -> str:
+        """Synthetic task output of roughly TASK_OUTPUT_CHARS characters."""
+        inputs = execution.inputs
+        header = (
+            f"# {task.task_name}\n\n"
+            f"Client: {inputs.get('client_name', 'N/A')}\n"
+            f"Topic: {inputs.get('topic', 'N/A')}\n"
+            f"Content type: {inputs.get('content_type', 'N/A')}\n\n"
+        )
+        if feedback:
+            header += f"Revised per reviewer feedback: {feedback}\n\n"
+
+        sentence = (
+            f"The {task.agent_key.replace('_', ' ')} reviewed the material for "
+            f"{inputs.get('topic', 'the topic')} and recorded its findings. "
+        )
+        body_length = max(self.config.TASK_OUTPUT_CHARS - len(header), 0)
+        body = (sentence * (body_length // len(sentence) + 1))[:body_length]
+        return header + body
+
+    # =========================================================================
+    # EVENT STREAM
+    # =========================================================================
+
+    async def _emit(self, execution: SimulatedExecution, event_type: str, data: Dict[str, Any]):
+        """Pace, buffer and (when the batch is full or old) flush one event."""
+        if self.config.EVENTS_PER_SECOND > 0:
+            await asyncio.sleep(1 / self.config.EVENTS_PER_SECOND)
+
+        event = WebhookEvent(
+            id=f"evt-{uuid.uuid4()}",
+            execution_id=execution.kickoff_id,
+            timestamp=datetime.now(timezone.utc),
+            type=event_type,
+            data=data
+        )
+
+        subscribed = execution.stream_config.get("events")
+        if subscribed and event_type not in subscribed:
+            return
+
+        if not execution.buffer:
+            execution.buffer_started_at = time.monotonic()
+        execution.buffer.append(event.model_dump(mode="json"))
+        execution.events_emitted += 1
+        self.events_emitted_total += 1
+
+        batch_size = 1 if execution.stream_config.get("realtime") else self.config.BATCH_SIZE
+        if (
+            len(execution.buffer) >= batch_size
+            or time.monotonic() - execution.buffer_started_at >= self.config.BATCH_MAX_WAIT_SECONDS
+        ):
+            await self._flush(execution)
+
+    async def _flush(self, execution: SimulatedExecution):
+        """Deliver the pending batch to the stream webhook."""
+        if not execution.buffer:
+            return
+        events, execution.buffer = execution.buffer, []
+
+        if self.inject_failure(self.config.WEBHOOK_DROP_RATE):
+            self.batches_dropped_total += 1
+            return
+
+        if await self._post(execution.stream_config, {"events": events}):
+            self.batches_sent_total += 1
+
+    async def _post(self, webhook_config: Dict[str, Any], body: Dict[str, Any]) -> bool:
+        """
+        POST a webhook with bearer auth, retrying 5xx and transport errors.
+
+        Returns:
+            True if delivered
+        """
+        url = webhook_config.get("url")
+        if not url or self._client is None:
+            return False
+
+        headers = {}
+        token = (webhook_config.get("authentication") or {}).get("token")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        for attempt in range(self.config.WEBHOOK_RETRIES + 1):
+            try:
+                response = await self._client.post(url, json=body, headers=headers)
+                if response.status_code < 500:
+                    if response.status_code >= 400:
+                        self.webhook_errors_total += 1
+                        logger.warning(f"⚠️  Webhook {url} rejected: {response.status_code}")
+                        return False
+                    return True
+            except httpx.RequestError as e:
+                logger.debug(f"Webhook {url} failed: {e}")
+
+            if attempt < self.config.WEBHOOK_RETRIES:
+                await asyncio.sleep(backoff_delay(attempt, 0.5, 5.0))
+
+        self.webhook_errors_total += 1
+        logger.warning(f"⚠️  Webhook {url} undeliverable after {self.config.WEBHOOK_RETRIES + 1} attempts")
+        return False
+
+    # =========================================================================
+    # STATS
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Simulator counters and execution states."""
+        by_status: Dict[str, int] = {}
+        for execution in self.executions.values():
+            by_status[execution.status] = by_status.get(execution.status, 0) + 1
+
+        return {
+            "tasks": [task.task_id for task in self.plan],
+            "executions": by_status,
+            "kickoffs_total": self.kickoffs_total,
+            "resumes_total": self.resumes_total,
+            "events_emitted_total": self.events_emitted_total,
+            "batches_sent_total": self.batches_sent_total,
+            "batches_dropped_total": self.batches_dropped_total,
+            "hitl_sent_total": self.hitl_sent_total,
+            "webhook_errors_total": self.webhook_errors_total,
+            "injected_failures_total": self.injected_failures_total,
+        }
+
+
+# =============================================================================
+# APP
+# =============================================================================
+
+simulator = CrewSimulator()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await simulator.start()
+    yield
+    await simulator.stop()
+
+
+app = FastAPI(
+    title="CrewAI AMP Simulator",
+    description="Local stand-in for the deployed SpinscribeCrew (load and latency testing)",
+    lifespan=lifespan
+)
+
+
+async def verify_bearer(authorization: Optional[str] = Header(None)):
+    """Check the bearer token when CREWAI_SIM_BEARER_TOKEN is set."""
+    expected = simulator.config.BEARER_TOKEN
+    if expected and authorization != f"Bearer {expected}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid bearer token")
+
+
+async def simulate_call(rate: float):
+    """Apply endpoint latency and injected failures."""
+    await simulator.respond_latency()
+    if simulator.inject_failure(rate):
+        raise HTTPException(
+            status_code=simulator.config.FAILURE_STATUS_CODE,
+            detail="Simulated CrewAI failure"
+        )
+
+
+@app.post("/kickoff", dependencies=[Depends(verify_bearer)])
+async def kickoff(request: Request, idempotency_key: Optional[str] = Header(None)):
+    await simulate_call(simulator.config.KICKOFF_FAILURE_RATE)
+    return simulator.kickoff(await request.json(), idempotency_key)
+
+
+@app.post("/resume", dependencies=[Depends(verify_bearer)])
+async def resume(request: Request, idempotency_key: Optional[str] = Header(None)):
+    await simulate_call(simulator.config.RESUME_FAILURE_RATE)
+    return simulator.resume(await request.json(), idempotency_key)
+
+
+@app.get("/status/{kickoff_id}", dependencies=[Depends(verify_bearer)])
+async def get_status(kickoff_id: str):
+    await simulate_call(simulator.config.STATUS_FAILURE_RATE)
+    return simulator.get_status(kickoff_id)
+
+
+@app.post("/cancel/{kickoff_id}", dependencies=[Depends(verify_bearer)])
+async def cancel(kickoff_id: str):
+    await simulate_call(0.0)
+    return simulator.cancel(kickoff_id)
+
+
+@app.get("/stats")
+async def stats():
+    return simulator.get_stats()
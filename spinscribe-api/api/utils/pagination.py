@@ -0,0 +1,258 @@
+# api/utils/pagination.py
+"""
+Keyset Pagination - Opaque (timestamp, id) cursors
+
+OFFSET pagination makes the database walk and discard every skipped row,
+so late pages of a long chat history get slower as it grows. Keyset
+pagination continues from the last row seen instead:
+
+    WHERE (created_at, id) > (:last_created_at, :last_id)
+    ORDER BY created_at, id
+    LIMIT :limit + 1
+
+which is a range scan on a (..., created_at, id) index whatever the
+page. The extra row tells whether another page exists, so no count is
+needed to page through a list.
+
+Cursors are URL-safe base64 of {"t": timestamp, "i": id, "d": direction}.
+Clients treat them as opaque: pass next_cursor to move forward, or
+prev_cursor to move back. A page is always returned in the list's own
+order, whichever direction it was fetched in.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+NEXT = "next"
+PREV = "prev"
+
+
+class CursorError(ValueError):
+    """Raised for a malformed or tampered pagination cursor."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Decoded position in a keyset-paginated list."""
+    timestamp: datetime
+    id: UUID
+    direction: str = NEXT
+
+    def encode(self) -> str:
+        raw = json.dumps({"t": self.timestamp.isoformat(), "i": str(self.id), "d": self.direction})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "Cursor":
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction = data.get("d", NEXT)
+            if direction not in (NEXT, PREV):
+                raise CursorError(f"Unknown cursor direction: {direction}")
+            return cls(datetime.fromisoformat(data["t"]), UUID(data["i"]), direction)
+        except CursorError:
+            raise
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise CursorError("Invalid pagination cursor") from e
+
+
+@dataclass
+class Page:
+    """One page of results plus cursors for its neighbours."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+    @property
+    def has_more(self) -> bool:
+        """Whether rows exist after this page (in list order)."""
+        return self.next_cursor is not None
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[Cursor] = None,
+    offset: int = 0,
+    descending: bool = False
+) -> Page:
+    """
+    Fetch one page of a query ordered by (sort_column, id_column).
+
+    With a cursor the page continues from it (offset is ignored);
+    without one, offset is applied for compatibility with page/offset
+    clients. Either way the returned cursors are keyset cursors.
+
+    Args:
+        db: Database session
+        query: Filtered select of one entity (no ORDER BY / LIMIT)
+        sort_column: Timestamp column to order by
+        id_column: Primary key column (tie-breaker)
+        limit: Page size
+        cursor: Decoded cursor from the previous page
+        offset: Rows to skip when no cursor is given
+        descending: List order (newest first when True)
+
+    Returns:
+        Page with items in list order
+    """
+    backwards = cursor is not None and cursor.direction == PREV
+    # Walk towards the cursor's side: list order, or reversed for "prev"
+    walk_descending = descending != backwards
+
+    key = tuple_(sort_column, id_column)
+    if cursor is not None:
+        position = tuple_(cursor.timestamp, cursor.id)
+        query = query.where(key < position if walk_descending else key > position)
+    elif offset:
+        query = query.offset(offset)
+
+    if walk_descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = list(result.scalars().all())
+    return _build_page(rows, limit, cursor, offset, sort_column.key, id_column.key)
+
+
+def _build_page(
+    rows: List[Any],
+    limit: int,
+    cursor: Optional[Cursor],
+    offset: int,
+    sort_attr: str,
+    id_attr: str
+) -> Page:
+    """Page from up to limit + 1 rows fetched in walk order."""
+    backwards = cursor is not None and cursor.direction == PREV
+    more_this_way = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return Page(items=[], next_cursor=None, prev_cursor=None)
+
+    first = Cursor(getattr(rows[0], sort_attr), getattr(rows[0], id_attr), PREV).encode()
+    last = Cursor(getattr(rows[-1], sort_attr), getattr(rows[-1], id_attr), NEXT).encode()
+
+    if backwards:
+        # We came from a later page, so there is always a next one
+        return Page(items=rows, next_cursor=last, prev_cursor=first if more_this_way else None)
+    has_previous = cursor is not None or offset > 0
+    return Page(items=rows, next_cursor=last if more_this_way else None, prev_cursor=first if has_previous else None)
+
+
+async def count_total(db: AsyncSession, query: Select) -> int:
+    """Exact row count of a (filtered, unpaginated) query."""
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+@dataclass(frozen=True)
+class RowSource:
+    """
+    Rows of a list kept outside the database (e.g. one archive file).
+
+    Only loaded when its [first, last] sort range can reach the page.
+    """
+    first: datetime
+    last: datetime
+    load: Callable[[], Awaitable[Sequence[Any]]]
+
+
+async def paginate_with_sources(
+    db: AsyncSession,
+    query: Select,
+    sort_column,
+    id_column,
+    sources: Sequence[RowSource],
+    limit: int,
+    cursor: Optional[Cursor] = None,
+    offset: int = 0,
+    descending: bool = False
+) -> Page:
+    """
+    paginate() over a query merged with rows from other sources.
+
+    The query is read with the same keyset condition as paginate(). A
+    source is loaded only if it may hold rows between the cursor and the
+    end of the page, nearest first, so a page costs one bounded query
+    plus the sources that overlap it (not the whole list).
+
+    Args:
+        db: Database session
+        query: Filtered select of one entity (no ORDER BY / LIMIT)
+        sort_column: Timestamp column to order by
+        id_column: Primary key column (tie-breaker)
+        sources: Out-of-database rows (same sort/id attributes)
+        limit: Page size
+        cursor: Decoded cursor from the previous page
+        offset: Rows to skip when no cursor is given
+        descending: List order (newest first when True)
+
+    Returns:
+        Page with items in list order
+    """
+    backwards = cursor is not None and cursor.direction == PREV
+    walk_descending = descending != backwards
+    sort_attr, id_attr = sort_column.key, id_column.key
+    wanted = limit + 1 + (offset if cursor is None else 0)
+
+    def key(row):
+        return (getattr(row, sort_attr), getattr(row, id_attr))
+
+    key_column = tuple_(sort_column, id_column)
+    if cursor is not None:
+        position = (cursor.timestamp, cursor.id)
+        query = query.where(key_column < tuple_(*position) if walk_descending else key_column > tuple_(*position))
+    if walk_descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    rows = list((await db.execute(query.limit(wanted))).scalars().all())
+
+    def ahead(row) -> bool:
+        if cursor is None:
+            return True
+        return key(row) < position if walk_descending else key(row) > position
+
+    # Sources in walk order, skipping those entirely behind the cursor
+    if walk_descending:
+        pending = sorted(
+            (source for source in sources if cursor is None or source.first <= cursor.timestamp),
+            key=lambda source: source.last, reverse=True
+        )
+    else:
+        pending = sorted(
+            (source for source in sources if cursor is None or source.last >= cursor.timestamp),
+            key=lambda source: source.first
+        )
+
+    for source in pending:
+        if len(rows) >= wanted:
+            # The page is full once the next source starts past its last row
+            boundary = getattr(rows[wanted - 1], sort_attr)
+            if (source.last < boundary) if walk_descending else (source.first > boundary):
+                break
+        rows.extend(row for row in await source.load() if ahead(row))
+        rows.sort(key=key, reverse=walk_descending)
+        del rows[wanted:]
+
+    if cursor is None:
+        rows = rows[offset:]
+    return _build_page(rows, limit, cursor, offset, sort_attr, id_attr)